@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import metrics
+import settings
+from exceptions import CircuitOpenError, FetchTimeoutError
+
+
+@settings.register
+def read_env():
+    """Читает окно подавления и интервал сводок из окружения."""
+    global ALERT_WINDOW, ALERT_DIGEST_INTERVAL
+    ALERT_WINDOW = float(os.getenv('ALERT_WINDOW', 3600))
+    ALERT_DIGEST_INTERVAL = float(os.getenv('ALERT_DIGEST_INTERVAL', 3600))
+
+
+def fingerprint(error):
+    """Возвращает класс сбоя без изменчивых подробностей.
+    Коды ответа, адреса и тексты исключений в класс не входят,
+    поэтому сбои одного рода дают один и тот же отпечаток.
+    """
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    if isinstance(error, FetchTimeoutError):
+        return 'timeout'
+    return metrics.practicum_outcome(error)
+
+
+class AlertGate:
+    """Подавление повторяющихся сообщений о сбоях.
+    Сбой каждого класса сообщается подписчику не чаще раза в window
+    секунд, остальные только подсчитываются. Через digest_interval
+    секунд после первого подавленного сбоя подписчик получает сводку
+    с числом повторов по классам.
+    """
+
+    def __init__(self, window=None, digest_interval=None,
+                 clock=time.monotonic):
+        """Задаёт окно подавления, интервал сводок и часы."""
+        window = ALERT_WINDOW if window is None else window
+        if digest_interval is None:
+            digest_interval = ALERT_DIGEST_INTERVAL
+        self.window = window
+        self.digest_interval = digest_interval
+        self.clock = clock
+        self._sent = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key, error):
+        """Решает, сообщать ли подписчику key о сбое error."""
+        name = fingerprint(error)
+        now = self.clock()
+        with self._lock:
+            sent = self._sent.setdefault(key, {})
+            last = sent.get(name)
+            if last is None or now - last >= self.window:
+                sent[name] = now
+                metrics.record_alert('sent')
+                return True
+            started, counts = self._suppressed.setdefault(key, (now, {}))
+            counts[name] = counts.get(name, 0) + 1
+        metrics.record_alert('suppressed')
+        return False
+
+    def digest(self, key, renderer):
+        """Возвращает сводку подавленных сбоев, если подошёл её срок.
+        После выдачи сводки счётчики подписчика обнуляются.
+        """
+        now = self.clock()
+        with self._lock:
+            started, counts = self._suppressed.get(key, (None, None))
+            if started is None or now - started < self.digest_interval:
+                return None
+            del self._suppressed[key]
+        metrics.record_alert('digest')
+        return renderer.digest(counts, now - started)
+
+    def forget(self, key):
+        """Забывает сбои подписчика, например после его удаления."""
+        with self._lock:
+            self._sent.pop(key, None)
+            self._suppressed.pop(key, None)
+
+
+gate = AlertGate()
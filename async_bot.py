@@ -0,0 +1,331 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from http import HTTPStatus
+
+import requests
+
+import history
+import homework
+import http_pool
+import metrics
+import settings
+import state
+import transport
+from breaker import get_breaker
+from exceptions import CircuitOpenError, EndpointError
+from homework import (ENDPOINT, HEADERS, RETRY_TIME, describe_poll,
+                      gate_alert, handle_response, logger,
+                      request_raw_answer, send_message_to)
+from lifecycle import Lifecycle
+from polling import AdaptiveInterval
+from tenants import load_registry, reload_registry, start_metrics
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+@settings.register
+def read_env():
+    """Читает ограничения параллельности из окружения."""
+    global PRACTICUM_CONCURRENCY, TELEGRAM_CONCURRENCY
+    PRACTICUM_CONCURRENCY = int(os.getenv('PRACTICUM_CONCURRENCY', 100))
+    TELEGRAM_CONCURRENCY = int(os.getenv('TELEGRAM_CONCURRENCY', 10))
+
+
+def client_timeout():
+    """Таймауты запросов aiohttp, те же, что у http_pool."""
+    connect, read = http_pool.timeout
+    return aiohttp.ClientTimeout(connect=connect, sock_read=read)
+
+
+class AsyncBot:
+    """Асинхронный режим опроса API и отправки сообщений.
+    Число одновременных запросов к Практикуму и к Telegram
+    ограничивается двумя независимыми семафорами. Если установлен
+    aiohttp и транспорт обращается к API напрямую, запросы
+    выполняются без потоков, иначе — в пуле потоков через
+    request_raw_answer и получатель транспорта.
+    """
+
+    def __init__(self, bot, practicum_concurrency=None,
+                 telegram_concurrency=None, session=None, store=None,
+                 outbox=None):
+        """Запоминает отправителя, ограничения параллельности и сессию."""
+        if practicum_concurrency is None:
+            practicum_concurrency = PRACTICUM_CONCURRENCY
+        if telegram_concurrency is None:
+            telegram_concurrency = TELEGRAM_CONCURRENCY
+        self.bot = bot
+        self.store = store
+        self.outbox = outbox
+        self.session = session
+        self.practicum_concurrency = practicum_concurrency
+        self.practicum_semaphore = asyncio.Semaphore(practicum_concurrency)
+        self.telegram_semaphore = asyncio.Semaphore(telegram_concurrency)
+        self._own_session = False
+
+    async def __aenter__(self):
+        """Открывает сессию aiohttp, если она не передана.
+        Для подменённого или записывающего получателя сессия не
+        открывается: запросы идут через транспорт.
+        """
+        if (
+            self.session is None and aiohttp is not None
+            and transport.over_http()
+        ):
+            connector = aiohttp.TCPConnector(limit=self.practicum_concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=client_timeout()
+            )
+            self._own_session = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Закрывает сессию, открытую в __aenter__."""
+        if self._own_session:
+            await self.session.close()
+            self.session = None
+            self._own_session = False
+
+    async def get_api_answer(self, current_timestamp, headers=HEADERS):
+        """Асинхронная версия get_api_answer.
+        Ошибки соответствуют синхронной версии: исключения requests,
+        EndpointError при коде ответа, отличном от 200.
+        """
+        raw = await self.get_raw_answer(current_timestamp, headers)
+        try:
+            return json.loads(raw)
+        except json.decoder.JSONDecodeError:
+            logger.error('Ответ не является типом данный Python')
+            raise
+
+    async def get_raw_answer(self, current_timestamp, headers=HEADERS):
+        """Асинхронная версия request_raw_answer."""
+        async with self.practicum_semaphore:
+            if self.session is None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    None, request_raw_answer, current_timestamp, headers
+                )
+            return await self._fetch(current_timestamp, headers)
+
+    async def _fetch(self, current_timestamp, headers):
+        timestamp = current_timestamp or int(transport.now())
+        params = {'from_date': timestamp}
+        try:
+            async with self.session.get(
+                ENDPOINT, headers=headers, params=params,
+                timeout=client_timeout(),
+            ) as response:
+                if response.status != HTTPStatus.OK:
+                    logger.error('Эндпоинт недоступен: %s', response.status)
+                    raise EndpointError(response.status)
+                return await response.read()
+        except asyncio.TimeoutError:
+            logger.error('Время ожидания запроса истекло')
+            raise requests.exceptions.Timeout('Время ожидания запроса истекло')
+        except aiohttp.TooManyRedirects:
+            logger.error('URL-адрес был неправильным')
+            raise requests.exceptions.TooManyRedirects(
+                'URL-адрес был неправильным'
+            )
+        except aiohttp.ClientConnectionError:
+            logger.error('Проблемы с сетью')
+            raise requests.exceptions.ConnectionError('Проблемы с сетью')
+        except aiohttp.ClientError:
+            logger.error('Сбой при запросе к эндпоинту')
+            raise requests.exceptions.RequestException(
+                'Сбой при запросе к эндпоинту'
+            )
+
+    async def send_message(self, chat_id, message, parse_mode=None):
+        """Асинхронная версия send_message.
+        python-telegram-bot синхронный, поэтому отправка выполняется
+        в пуле потоков, но не больше TELEGRAM_CONCURRENCY одновременно.
+        """
+        async with self.telegram_semaphore:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, send_message_to, self.bot, chat_id, message, parse_mode
+            )
+
+    async def notify(self, chat_id, message, parse_mode=None):
+        """Передаёт сообщение в очередь отправки или отправляет сразу."""
+        if self.outbox is not None:
+            self.outbox.put(chat_id, message, parse_mode)
+        else:
+            await self.send_message(chat_id, message, parse_mode)
+
+    async def check_updates(self, current_timestamp, headers, statuses,
+                            renderer=None):
+        """Асинхронная версия check_updates.
+        Тексты берутся из шаблонов renderer, как в describe_poll.
+        """
+        breaker = get_breaker(ENDPOINT)
+        if not breaker.allow():
+            error = CircuitOpenError(breaker.retry_after())
+            message = describe_poll([], error, statuses, renderer)
+            return message, current_timestamp, error
+        started = time.perf_counter()
+        try:
+            raw = await self.get_raw_answer(current_timestamp, headers)
+            message, current_timestamp = handle_response(
+                raw, statuses, renderer
+            )
+        except Exception as error:
+            metrics.record_practicum(started, error)
+            breaker.record_failure(error)
+            message = describe_poll([], error, statuses, renderer)
+            return message, current_timestamp, error
+        metrics.record_practicum(started)
+        breaker.record_success()
+        return message, current_timestamp, None
+
+    async def poll(self, tenant, interval):
+        """Выполняет один опрос подписчика и возвращает паузу до следующего.
+        Изменения статусов пишутся в журнал, как в синхронном режиме.
+        """
+        renderer = tenant.renderer
+        before = history.snapshot(tenant.statuses)
+        message, tenant.from_date, error = await self.check_updates(
+            tenant.from_date, tenant.headers, tenant.statuses, renderer
+        )
+        history.record(tenant.key, before, tenant.statuses, tenant.from_date)
+        message, digest = gate_alert(tenant.key, message, error, renderer)
+        if message is not None and (
+            tenant.remember(message) or error is not None
+        ):
+            await self.notify(tenant.chat_id, message, renderer.parse_mode)
+        if digest is not None:
+            await self.notify(tenant.chat_id, digest, renderer.parse_mode)
+        if self.store is not None:
+            tenant.save(self.store)
+            self.store.maybe_flush()
+        history.maybe_flush()
+        return interval.next_delay(tenant.statuses, error)
+
+    async def watch(self, tenant, retry_time=RETRY_TIME, stopping=None):
+        """Опрашивает API от имени одного подписчика.
+        Если передано событие stopping, опрос прекращается, как только
+        оно выставлено: пауза прерывается, а начатый опрос доводится
+        до конца.
+        """
+        interval = AdaptiveInterval(retry_time, clock=transport.monotonic)
+        stopping = asyncio.Event() if stopping is None else stopping
+        while not stopping.is_set():
+            delay = await self.poll(tenant, interval)
+            try:
+                await asyncio.wait_for(stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+class Watchers:
+    """Задачи опроса подписчиков в одном цикле событий.
+    Повторяет методы расписания, нужные reload_registry: schedule()
+    запускает опрос подписчика, remove() отменяет его.
+    """
+
+    def __init__(self, async_bot, stopping, retry_time=RETRY_TIME):
+        """Задаёт бота, событие остановки и базовую паузу."""
+        self.async_bot = async_bot
+        self.stopping = stopping
+        self.retry_time = retry_time
+        self.tasks = {}
+
+    def schedule(self, tenant, delay=0):
+        """Запускает опрос подписчика, если он ещё не идёт.
+        Первый опрос выполняется сразу, delay не учитывается.
+        """
+        if tenant.key not in self.tasks:
+            self.tasks[tenant.key] = asyncio.ensure_future(
+                self.async_bot.watch(tenant, self.retry_time, self.stopping)
+            )
+
+    def remove(self, tenant):
+        """Отменяет опрос подписчика."""
+        task = self.tasks.pop(tenant.key, None)
+        if task is not None:
+            task.cancel()
+
+    async def wait(self, timeout):
+        """Ждёт завершения опросов не дольше timeout секунд.
+        Не успевшие опросы отменяются: их курсоры не сдвигались,
+        поэтому после перезапуска они просто повторятся.
+        """
+        tasks = list(self.tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            logger.warning('Не завершено опросов: %d', len(pending))
+
+
+async def run(registry, bot, store=None, outbox=None,
+              retry_time=RETRY_TIME):
+    """Запускает опрос всех подписчиков реестра в одном цикле событий."""
+    async with AsyncBot(bot, store=store, outbox=outbox) as async_bot:
+        await asyncio.gather(
+            *(async_bot.watch(tenant, retry_time) for tenant in registry)
+        )
+
+
+async def serve(registry, bot, store, outbox, lifecycle):
+    """Опрашивает подписчиков реестра до SIGTERM или SIGINT.
+    После сигнала новые опросы не начинаются, а начатые доводятся
+    до конца за оставшееся время lifecycle.remaining(). SIGHUP
+    перечитывает настройки, тексты вердиктов и файл подписчиков.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    async with AsyncBot(bot, store=store, outbox=outbox) as async_bot:
+        watchers = Watchers(async_bot, stopping)
+        for tenant in registry:
+            watchers.schedule(tenant)
+
+        def reload():
+            homework.reload_settings(outbox)
+            reload_registry(registry, watchers, store)
+
+        lifecycle.on_stop(stopping.set)
+        loop.add_signal_handler(signal.SIGTERM, lifecycle.request_stop)
+        loop.add_signal_handler(signal.SIGINT, lifecycle.request_stop)
+        loop.add_signal_handler(signal.SIGHUP, reload)
+        await stopping.wait()
+        await watchers.wait(lifecycle.remaining())
+
+
+def main():
+    """Асинхронный режим работы бота."""
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical('Отсутствует переменная окружения TELEGRAM_TOKEN')
+        raise Exception('Отсутствует переменная окружения TELEGRAM_TOKEN')
+    registry = load_registry()
+    logger.info('Асинхронный режим, подписчиков: %d', len(registry))
+    outbox = transport.make_outbox(homework.TELEGRAM_TOKEN)
+    bot = outbox.bot
+    outbox.start()
+    start_metrics(outbox)
+    http_pool.configure()
+    store = state.open_store()
+    history.open_log(clock=transport.now)
+    for tenant in registry:
+        tenant.restore(store)
+    lifecycle = Lifecycle()
+    try:
+        asyncio.run(serve(registry, bot, store, outbox, lifecycle))
+    finally:
+        lifecycle.shutdown(outbox, store)
+
+
+if __name__ == '__main__':
+    homework.init()
+    main()
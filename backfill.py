@@ -0,0 +1,253 @@
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import history
+import homework
+import http_pool
+import settings
+import state
+import tenants
+from fetch_pool import FetchExecutor
+from homework import decode_response, logger, request_api_answer
+
+
+@settings.register
+def read_env():
+    """Читает настройки загрузки истории из окружения."""
+    global BACKFILL_WORKERS, BACKFILL_WINDOW, BACKFILL_CHECKPOINT
+    BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', 4))
+    BACKFILL_WINDOW = int(os.getenv('BACKFILL_WINDOW', 7 * 24 * 3600))
+    BACKFILL_CHECKPOINT = os.getenv('BACKFILL_CHECKPOINT', 'backfill.json')
+
+
+def parse_date(value):
+    """Переводит date_updated из ответа API во временную метку."""
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(
+            value.replace('Z', '+00:00')
+        ).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def windows(start, end, size):
+    """Делит период [start, end) на окна по size секунд.
+    Последнее окно тоже заканчивается в end: изменения после конца
+    периода достанутся обычному опросу, курсор которого сдвигается
+    на end.
+    """
+    return [
+        (left, min(left + size, end)) for left in range(start, end, size)
+    ]
+
+
+def fetch_window(start, end, headers):
+    """Запрашивает работы окна [start, end) и проверяет ответ.
+    API отдаёт все работы, обновлённые после from_date, поэтому
+    работы с date_updated позже конца окна отбрасываются: их вернёт
+    запрос следующего окна. Возвращает список пар (HomeworkStatus,
+    date_updated), start и None, как poll_records.
+    """
+    records, _ = decode_response.dated(request_api_answer(start, headers))
+    window = []
+    for record, date_updated in records:
+        updated = parse_date(date_updated)
+        if updated is None or updated < end:
+            window.append((record, updated))
+    return window, start, None
+
+
+class Checkpoint:
+    """Прогресс загрузки истории: до какого момента пройден подписчик.
+    Хранится в JSON-файле, который перезаписывается атомарно.
+    """
+
+    def __init__(self, path=None):
+        """Читает прогресс из файла path, если он есть."""
+        path = BACKFILL_CHECKPOINT if path is None else path
+        self.path = path
+        try:
+            with open(path, encoding='utf-8') as file:
+                self.done = json.load(file)
+        except FileNotFoundError:
+            self.done = {}
+
+    def save(self):
+        """Записывает прогресс на диск."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(self.done, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class Backfill:
+    """Загрузка истории статусов без уведомлений.
+    Окна всех подписчиков запрашиваются параллельно не более чем
+    в workers потоков, а применяются к хранилищу по порядку окон.
+    После каждой пачки окон хранилище записывается, и только затем
+    сохраняется прогресс, поэтому прерванная загрузка продолжается
+    с первого неприменённого окна.
+    """
+
+    def __init__(self, store, checkpoint, window=None, workers=None,
+                 fetch=fetch_window, clock=time.time):
+        """Задаёт хранилище, прогресс, размер окна и число потоков."""
+        window = BACKFILL_WINDOW if window is None else window
+        workers = BACKFILL_WORKERS if workers is None else workers
+        self.store = store
+        self.checkpoint = checkpoint
+        self.window = window
+        self.workers = workers
+        self.fetch = fetch
+        self.clock = clock
+        self.stats = {'windows': 0, 'changes': 0, 'failed': 0}
+
+    def plan(self, registry, since, until):
+        """Возвращает окна подписчиков, которые ещё не пройдены."""
+        return [
+            (tenant, start, end)
+            for tenant in registry
+            for start, end in windows(
+                max(since, self.checkpoint.done.get(tenant.key, since)),
+                until, self.window,
+            )
+        ]
+
+    def run(self, registry, since, until=None):
+        """Проходит окна с since по until и возвращает статистику."""
+        until = until or int(self.clock())
+        plan = self.plan(registry, since, until)
+        failed = set()
+        executor = FetchExecutor(self.fetch, self.workers)
+        try:
+            for offset in range(0, len(plan), self.workers * 4):
+                batch = [
+                    item for item in plan[offset:offset + self.workers * 4]
+                    if item[0].key not in failed
+                ]
+                results = executor.map(
+                    (start, end, tenant.headers)
+                    for tenant, start, end in batch
+                )
+                for (tenant, _, end), result in zip(batch, results):
+                    self.apply(tenant, end, result, failed)
+                self.store.flush()
+                if history.log is not None:
+                    history.log.flush()
+                self.checkpoint.save()
+        finally:
+            executor.shutdown()
+        return self.stats
+
+    def apply(self, tenant, end, result, failed):
+        """Применяет результат окна к хранилищу без уведомлений."""
+        records, start, error = result
+        if tenant.key in failed:
+            return
+        if error is not None:
+            logger.error(
+                'Загрузка истории %r остановлена на %s: %s',
+                tenant, start, error,
+            )
+            failed.add(tenant.key)
+            self.stats['failed'] += 1
+            return
+        saved = self.store.get(tenant.key)
+        for record, updated in records:
+            if saved.statuses.get(record.homework_name) == record.status:
+                continue
+            self.store.set_status(
+                tenant.key, record.homework_name, record.status
+            )
+            if history.log is not None:
+                history.log.append(
+                    tenant.key, record.homework_name, record.status,
+                    record.current_date, updated or self.clock(),
+                )
+            self.stats['changes'] += 1
+        if (saved.current_date or 0) < end:
+            self.store.update(tenant.key, current_date=end)
+        self.checkpoint.done[tenant.key] = end
+        self.stats['windows'] += 1
+
+
+def parse_moment(value):
+    """Разбирает дату ГГГГ-ММ-ДД или временную метку."""
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).replace(
+        tzinfo=timezone.utc
+    ).timestamp())
+
+
+def parse_days(value):
+    """Разбирает размер окна в днях: не меньше секунды."""
+    days = float(value)
+    if not 1 <= days * 86400 < math.inf:
+        raise argparse.ArgumentTypeError(
+            'окно должно быть не короче секунды'
+        )
+    return days
+
+
+def parse_workers(value):
+    """Разбирает число потоков: не меньше одного."""
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError('нужен хотя бы один поток')
+    return workers
+
+
+def main():
+    """Загружает историю статусов всех подписчиков реестра."""
+    parser = argparse.ArgumentParser(
+        description='Загрузка истории статусов без уведомлений'
+    )
+    parser.add_argument('--since', type=parse_moment, required=True)
+    parser.add_argument('--until', type=parse_moment)
+    parser.add_argument(
+        '--window', type=parse_days, default=BACKFILL_WINDOW / 86400,
+        help='размер окна в днях',
+    )
+    parser.add_argument(
+        '--workers', type=parse_workers, default=BACKFILL_WORKERS,
+    )
+    parser.add_argument('--checkpoint', default=BACKFILL_CHECKPOINT)
+    options = parser.parse_args()
+    registry = tenants.load_registry()
+    http_pool.configure(
+        pool_size=max(http_pool.HTTP_POOL_SIZE, options.workers)
+    )
+    store = state.open_store()
+    history.open_log()
+    started = time.perf_counter()
+    try:
+        stats = Backfill(
+            store, Checkpoint(options.checkpoint),
+            window=int(options.window * 86400), workers=options.workers,
+        ).run(registry, options.since, options.until)
+    finally:
+        store.close()
+        history.close()
+    logger.info(
+        'История загружена за %.1f с: окон %d, изменений %d, сбоев %d',
+        time.perf_counter() - started, stats['windows'], stats['changes'],
+        stats['failed'],
+    )
+
+
+if __name__ == '__main__':
+    homework.init()
+    main()
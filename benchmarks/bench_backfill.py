@@ -0,0 +1,84 @@
+"""Нагрузочный тест загрузки истории на локальной заглушке API.
+
+Заглушка Практикума запускается в отдельном процессе с работами,
+обновлёнными равномерно за --history-days дней. Для каждого числа
+потоков загрузка проходит всю историю подписчиков окнами по --window
+дней; печатаются время, окна в секунду и число изменений статусов.
+
+Запуск: python benchmarks/bench_backfill.py --tenants 20 --workers 1 4 16
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import backfill  # noqa: E402
+import fake_servers  # noqa: E402
+import homework  # noqa: E402
+import http_pool  # noqa: E402
+import state  # noqa: E402
+import tenants  # noqa: E402
+
+
+def measure(registry, since, window, workers):
+    """Загружает историю с нуля и печатает замеры."""
+    store = state.MemoryStateStore()
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = backfill.Checkpoint(
+            os.path.join(directory, 'backfill.json')
+        )
+        started = time.perf_counter()
+        stats = backfill.Backfill(
+            store, checkpoint, window=window, workers=workers
+        ).run(registry, since)
+        elapsed = time.perf_counter() - started
+    print(
+        f'потоков: {workers:>3} | {elapsed:6.2f} с | '
+        f'окон/с {stats["windows"] / elapsed:7.1f} | '
+        f'окон {stats["windows"]:>5} | изменений {stats["changes"]:>6} | '
+        f'сбоев {stats["failed"]}'
+    )
+
+
+def main():
+    """Запускает заглушку в отдельном процессе и замеры в текущем."""
+    parser = fake_servers.add_arguments(argparse.ArgumentParser())
+    parser.add_argument('--tenants', type=int, default=20)
+    parser.add_argument('--window', type=float, default=7.0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.set_defaults(
+        history_days=180, homeworks=50, practicum_latency=0.02
+    )
+    options = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    servers = multiprocessing.Process(
+        target=fake_servers.serve, args=(options, ready), daemon=True
+    )
+    servers.start()
+    practicum_url, _ = ready.get(timeout=10)
+
+    logging.disable(logging.CRITICAL)
+    homework.ENDPOINT = practicum_url
+    http_pool.configure(pool_size=max(options.workers))
+    registry = tenants.TenantRegistry(
+        tenants.Tenant(f'token-{chat}', chat)
+        for chat in range(options.tenants)
+    )
+    since = int(time.time() - options.history_days * 86400)
+    try:
+        for workers in options.workers:
+            measure(registry, since, int(options.window * 86400), workers)
+    finally:
+        servers.terminate()
+
+
+if __name__ == '__main__':
+    main()
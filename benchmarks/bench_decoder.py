@@ -0,0 +1,65 @@
+"""Сравнение разбора ответа API: decode_response против цепочки функций.
+
+Запуск: python benchmarks/bench_decoder.py [число работ в ответе]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import decoder  # noqa: E402
+import homework  # noqa: E402
+import templates  # noqa: E402
+
+
+def make_payload(size):
+    """Готовит тело ответа API с заданным числом работ."""
+    statuses = list(homework.HOMEWORK_STATUSES)
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': index,
+                'homework_name': f'user__hw{index}.zip',
+                'status': statuses[index % len(statuses)],
+                'reviewer_comment': 'Всё нравится',
+                'date_updated': '2020-02-13T14:40:57Z',
+                'lesson_name': 'Итоговый проект',
+            }
+            for index in range(size)
+        ],
+        'current_date': 1581604970,
+    }).encode()
+
+
+def chain(raw):
+    """Прежний путь: json, check_response и parse_status."""
+    data = json.loads(raw)
+    return [
+        homework.parse_status(item) for item in homework.check_response(data)
+    ]
+
+
+def fast_path(raw):
+    """Новый путь: decode_response и форматирование записей."""
+    records, _ = homework.decode_response(raw)
+    renderer = templates.renderer()
+    return [
+        renderer.status(record.homework_name, record.status)
+        for record in records
+    ]
+
+
+def main(size=5):
+    """Печатает время одного разбора для обоих путей."""
+    raw = make_payload(size)
+    backend = 'orjson' if decoder.orjson is not None else 'json'
+    print(f'работ в ответе: {size}, декодер: {backend}')
+    for name, func in (('цепочка', chain), ('decode_response', fast_path)):
+        number, total = timeit.Timer(lambda: func(raw)).autorange()
+        print(f'{name}: {total / number * 1e6:.2f} мкс на ответ')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,109 @@
+"""Нагрузочный тест конвейера бота на локальных заглушках.
+
+Для каждого числа подписчиков выполняет запрос к API, check_response,
+parse_status и send_message и печатает задержки p50/p99, уведомления
+в секунду, процессорное время и пиковый RSS.
+
+Запуск: python benchmarks/bench_pipeline.py --watchers 1 100 10000
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import telegram  # noqa: E402
+from telegram.utils.request import Request  # noqa: E402
+
+import fake_servers  # noqa: E402
+import homework  # noqa: E402
+import http_pool  # noqa: E402
+
+
+def run_watcher(bot, chat_id):
+    """Один проход конвейера для подписчика.
+    Возвращает задержку и исход: 'sent', 'quiet' или 'error'.
+    """
+    started = time.perf_counter()
+    headers = homework.make_headers(f'token-{chat_id}')
+    try:
+        response = homework.request_api_answer(0, headers)
+        messages = [
+            homework.parse_status(item)
+            for item in homework.check_response(response)
+        ]
+        if messages:
+            homework.send_message_to(bot, chat_id, '\n\n'.join(messages))
+    except Exception:
+        return time.perf_counter() - started, 'error'
+    return time.perf_counter() - started, 'sent' if messages else 'quiet'
+
+
+def measure(bot, watchers, concurrency):
+    """Прогоняет конвейер для заданного числа подписчиков."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(
+            executor.map(lambda chat: run_watcher(bot, chat), range(watchers))
+        )
+    elapsed = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    latencies = sorted(latency for latency, _ in results)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p99 = cuts[49], cuts[98]
+    else:
+        p50 = p99 = latencies[0]
+    outcomes = [outcome for _, outcome in results]
+    cpu = (after.ru_utime - usage.ru_utime) + (after.ru_stime - usage.ru_stime)
+    print(
+        f'подписчиков: {watchers:>6} | '
+        f'p50 {p50 * 1000:7.2f} мс | p99 {p99 * 1000:7.2f} мс | '
+        f'уведомлений/с {outcomes.count("sent") / elapsed:8.1f} | '
+        f'ошибок {outcomes.count("error"):>5} | '
+        f'CPU {cpu:6.2f} с | RSS {after.ru_maxrss / 1024:6.1f} МБ'
+    )
+
+
+def main():
+    """Запускает заглушки в отдельном процессе и замеры в текущем."""
+    parser = fake_servers.add_arguments(argparse.ArgumentParser())
+    parser.add_argument(
+        '--watchers', type=int, nargs='+', default=[1, 100, 10_000]
+    )
+    parser.add_argument('--concurrency', type=int, default=32)
+    options = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    servers = multiprocessing.Process(
+        target=fake_servers.serve, args=(options, ready), daemon=True
+    )
+    servers.start()
+    practicum_url, telegram_url = ready.get(timeout=10)
+
+    logging.disable(logging.CRITICAL)
+    homework.ENDPOINT = practicum_url
+    http_pool.configure(pool_size=options.concurrency)
+    bot = telegram.Bot(
+        token='123456:benchmark',
+        base_url=telegram_url,
+        request=Request(con_pool_size=options.concurrency),
+    )
+    try:
+        for watchers in options.watchers:
+            measure(bot, watchers, options.concurrency)
+    finally:
+        servers.terminate()
+
+
+if __name__ == '__main__':
+    main()
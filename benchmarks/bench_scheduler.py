@@ -0,0 +1,64 @@
+"""Нагрузочный тест планировщика на 100 000 подписчиков.
+
+Запуск: python benchmarks/bench_scheduler.py [число подписчиков]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import Scheduler  # noqa: E402
+
+RETRY_TIME = 600
+
+
+class FakeClock:
+    """Виртуальные часы, которые переводит сам тест."""
+
+    def __init__(self):
+        """Начинает отсчёт с нуля."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Возвращает текущее виртуальное время."""
+        return self.now
+
+
+def main(watchers=100_000):
+    """Замеряет постановку, извлечение и перенос опросов."""
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+
+    started = time.perf_counter()
+    for watcher in range(watchers):
+        scheduler.add(watcher, RETRY_TIME)
+    added = time.perf_counter() - started
+
+    per_second = Counter()
+    dispatched = 0
+    started = time.perf_counter()
+    while clock.now < RETRY_TIME:
+        clock.now += 1
+        due = scheduler.pop_due()
+        per_second[int(clock.now)] += len(due)
+        for watcher in due:
+            scheduler.schedule(watcher, RETRY_TIME)
+        dispatched += len(due)
+    cycled = time.perf_counter() - started
+
+    print(f'подписчиков: {watchers}')
+    print(f'постановка: {added / watchers * 1e6:.2f} мкс на подписчика')
+    print(
+        f'извлечение и перенос: {cycled / dispatched * 1e6:.2f} мкс '
+        f'на опрос ({dispatched} опросов)'
+    )
+    print(
+        f'опросов в секунду окна: среднее {dispatched / RETRY_TIME:.0f}, '
+        f'максимум {max(per_second.values())}'
+    )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
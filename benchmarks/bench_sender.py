@@ -0,0 +1,114 @@
+"""Сравнение отправителей сообщений: telegram.Bot против DirectBot.
+
+Каждый отправитель замеряется в отдельном процессе против локальной
+заглушки Telegram Bot API: время импорта и создания бота, задержки
+отправки p50/p99 и пиковый RSS процесса.
+
+Запуск: python benchmarks/bench_sender.py --messages 1000 [--no-preload]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_servers  # noqa: E402
+
+TOKEN = '123456:benchmark'
+
+
+def make_sender(sender, url):
+    """Импортирует и создаёт отправителя заданного типа."""
+    if sender == 'direct':
+        import bot_api
+
+        return bot_api.DirectBot(TOKEN, base_url=url)
+    import telegram
+
+    return telegram.Bot(token=TOKEN, base_url=url)
+
+
+def child(sender, url, messages, preload):
+    """Замеры внутри дочернего процесса; результат печатается в JSON.
+    При preload заранее импортируется requests: процесс бота всё
+    равно загружает его для запросов к API Практикума.
+    """
+    if preload:
+        import requests  # noqa: F401
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    bot = make_sender(sender, url)
+    startup = time.perf_counter() - started
+    latencies = []
+    for index in range(messages):
+        started = time.perf_counter()
+        bot.send_message(1, f'Сообщение {index}')
+        latencies.append(time.perf_counter() - started)
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    print(json.dumps({
+        'startup': startup,
+        'p50': cuts[49],
+        'p99': cuts[98],
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'rss_before': rss_before,
+    }))
+
+
+def measure(sender, url, messages, preload):
+    """Запускает дочерний процесс и печатает его замеры."""
+    command = [
+        sys.executable, __file__, '--child', sender, '--url', url,
+        '--messages', str(messages),
+    ]
+    if not preload:
+        command.append('--no-preload')
+    result = subprocess.run(
+        command, capture_output=True, text=True, check=True
+    )
+    data = json.loads(result.stdout)
+    print(
+        f'{sender:>6} | старт {data["startup"] * 1000:7.1f} мс | '
+        f'p50 {data["p50"] * 1000:6.2f} мс | '
+        f'p99 {data["p99"] * 1000:6.2f} мс | '
+        f'RSS {data["rss"] / 1024:6.1f} МБ '
+        f'(+{(data["rss"] - data["rss_before"]) / 1024:.1f} МБ)'
+    )
+
+
+def main():
+    """Запускает заглушку Telegram и замеры обоих отправителей."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument(
+        '--senders', nargs='+', default=['ptb', 'direct'],
+        choices=['ptb', 'direct'],
+    )
+    parser.add_argument('--no-preload', action='store_true')
+    parser.add_argument('--child', choices=['ptb', 'direct'])
+    parser.add_argument('--url')
+    options = parser.parse_args()
+    if options.child:
+        child(
+            options.child, options.url, options.messages,
+            not options.no_preload,
+        )
+        return
+    server = fake_servers.make_server(
+        fake_servers.TelegramHandler, latency=options.latency
+    )
+    url = fake_servers.server_url(server, '/bot')
+    for sender in options.senders:
+        measure(sender, url, options.messages, not options.no_preload)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Замер холодного старта процесса бота.
+
+Для каждого модуля запускает отдельный интерпретатор с
+python -X importtime, печатает медиану времени импорта, время до
+готовности после init() и самые тяжёлые зависимости, которые
+импорт тянет за собой.
+
+Запуск: python benchmarks/bench_startup.py [--modules homework tenants]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, importtime=False):
+    """Запускает интерпретатор и возвращает время работы и stderr."""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', code]
+    env = dict(os.environ, LOG_FILE=os.devnull)
+    started = time.perf_counter()
+    result = subprocess.run(
+        command, cwd=ROOT, env=env, capture_output=True, text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, result.stderr
+
+
+def parse_importtime(stderr):
+    """Разбирает вывод -X importtime в словарь модуль -> (собств., всего).
+    Время возвращается в миллисекундах.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own) / 1000, int(cumulative) / 1000)
+    return modules
+
+
+def measure(module, repeat, top):
+    """Печатает замеры холодного старта одного модуля."""
+    baseline = parse_importtime(run_python('pass', importtime=True)[1])
+    imports = []
+    for _ in range(repeat):
+        modules = parse_importtime(
+            run_python(f'import {module}', importtime=True)[1]
+        )
+        imports.append(modules[module][1])
+    wall = statistics.median(
+        run_python(f'import {module}')[0] for _ in range(repeat)
+    )
+    ready = statistics.median(
+        run_python(
+            f'import {module}, homework; '
+            'getattr(homework, "init", lambda: None)()'
+        )[0]
+        for _ in range(repeat)
+    )
+    python = statistics.median(run_python('pass')[0] for _ in range(repeat))
+    heavy = sorted(
+        (
+            (own, name) for name, (own, _) in modules.items()
+            if name not in baseline and name != module
+        ),
+        reverse=True,
+    )[:top]
+    loaded = [
+        name for name in ('telegram', 'requests', 'dotenv', 'aiohttp')
+        if name in modules
+    ]
+    print(
+        f'{module}: импорт {statistics.median(imports):6.1f} мс | '
+        f'процесс {(wall - python) * 1000:6.1f} мс сверх пустого '
+        f'интерпретатора | после init() {(ready - python) * 1000:6.1f} мс'
+    )
+    print(f'  тяжёлые пакеты при импорте: {", ".join(loaded) or "нет"}')
+    for own, name in heavy:
+        print(f'  {own:6.1f} мс  {name}')
+
+
+def main():
+    """Разбирает аргументы и печатает замеры."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modules', nargs='+', default=['homework'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    options = parser.parse_args()
+    for module in options.modules:
+        measure(module, options.repeat, options.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Замер вывода уведомлений по шаблонам.
+
+Сравнивает на 100 000 уведомлений f-строку parse_status, вывод по
+скомпилированному шаблону без кэша и с кэшем по (язык, статус, работа).
+Уведомления сохраняются в списке, как в очереди отправки, и для каждого
+способа печатаются время, выделенные блоки памяти и пик tracemalloc.
+
+Запуск: python benchmarks/bench_templates.py [--notifications 100000]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import homework  # noqa: E402
+import templates  # noqa: E402
+
+
+def workload(notifications, homeworks):
+    """Возвращает список уведомлений: язык, формат, работа и статус."""
+    cases = itertools.cycle(itertools.product(
+        ('ru', 'en'), ('plain', 'html', 'markdown'),
+        [f'student__hw{index:04d}.zip' for index in range(homeworks)],
+        sorted(homework.HOMEWORK_STATUSES),
+    ))
+    return list(itertools.islice(cases, notifications))
+
+
+def measure(name, render, cases, reset=None):
+    """Выводит все уведомления и печатает замеры.
+    Время замеряется отдельным проходом без tracemalloc; перед каждым
+    проходом вызывается reset, если он передан.
+    """
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    messages = [render(*case) for case in cases]
+    allocated = sys.getallocatedblocks() - blocks
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    if reset is not None:
+        reset()
+    started = time.perf_counter()
+    messages = [render(*case) for case in cases]
+    elapsed = time.perf_counter() - started
+    print(
+        f'{name:>12} | {elapsed / len(messages) * 1e9:7.0f} нс | '
+        f'блоков {allocated:>8} | пик {peak / 1024 / 1024:6.2f} МБ'
+    )
+
+
+def main():
+    """Замеряет три способа вывода на одном наборе уведомлений."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--notifications', type=int, default=100_000)
+    parser.add_argument('--homeworks', type=int, default=500)
+    options = parser.parse_args()
+    cases = workload(options.notifications, options.homeworks)
+
+    def f_string(locale, markup, name, status):
+        return homework.parse_status(
+            {'homework_name': name, 'status': status}
+        )
+
+    def compiled(locale, markup, name, status):
+        return templates.renderer(locale, markup).statuses[status].render(
+            homework_name=name
+        )
+
+    def cached(locale, markup, name, status):
+        return templates.renderer(locale, markup).status(name, status)
+
+    measure('f-строка', f_string, cases)
+    measure('шаблон', compiled, cases)
+    measure('шаблон+кэш', cached, cases, templates.render_status.cache_clear)
+    measure('прогретый', cached, cases)
+
+
+if __name__ == '__main__':
+    main()
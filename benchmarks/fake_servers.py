@@ -0,0 +1,168 @@
+"""Локальные заглушки API Практикума и Telegram Bot API для нагрузочных тестов.
+
+Запуск отдельно: python benchmarks/fake_servers.py [--help]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Общая часть заглушек: задержка, доля ошибок и ответ JSON."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        """Не печатает каждый запрос."""
+
+    def reply(self, payload):
+        """Отвечает с задержкой и заданной долей ошибок 500."""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            failed = server.random.random() < server.error_rate
+        if failed:
+            self.send_json(500, {'ok': False, 'description': 'fake error'})
+            return
+        self.send_json(200, payload)
+
+    def send_json(self, code, payload):
+        """Отправляет JSON-ответ с Content-Length для keep-alive."""
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PracticumHandler(FakeHandler):
+    """Заглушка эндпоинта homework_statuses."""
+
+    def do_GET(self):
+        """Возвращает homeworks заданного размера.
+        Если задан history_span, работы обновлены равномерно за
+        последние history_span секунд и фильтруются по from_date.
+        """
+        server = self.server
+        now = int(time.time())
+        from_date = int(
+            parse_qs(urlsplit(self.path).query).get('from_date', ['0'])[0]
+        )
+        with server.lock:
+            homeworks = []
+            for index in range(server.homeworks):
+                updated = 1581604857
+                if server.history_span:
+                    updated = now - server.history_span * (
+                        index + 1
+                    ) // server.homeworks
+                    if updated < from_date:
+                        continue
+                homeworks.append({
+                    'id': index,
+                    'homework_name': f'user__hw{index}.zip',
+                    'status': server.random.choice(STATUSES),
+                    'reviewer_comment': 'Всё нравится',
+                    'date_updated': time.strftime(
+                        '%Y-%m-%dT%H:%M:%SZ', time.gmtime(updated)
+                    ),
+                    'lesson_name': 'Итоговый проект',
+                })
+        self.reply({'homeworks': homeworks, 'current_date': now})
+
+
+class TelegramHandler(FakeHandler):
+    """Заглушка метода sendMessage Telegram Bot API."""
+
+    def do_POST(self):
+        """Принимает сообщение и отвечает объектом Message."""
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.headers.get('Content-Type', '').startswith(
+            'application/json'
+        ):
+            data = json.loads(body or b'{}')
+        else:
+            data = {}
+        with self.server.lock:
+            self.server.messages += 1
+        self.reply({
+            'ok': True,
+            'result': {
+                'message_id': self.server.messages,
+                'date': int(time.time()),
+                'chat': {'id': int(data.get('chat_id', 1)), 'type': 'private'},
+                'text': data.get('text', ''),
+            },
+        })
+
+
+def make_server(handler, latency=0.0, error_rate=0.0, homeworks=1, seed=0,
+                port=0, history_span=0):
+    """Создаёт и запускает заглушку в фоновом потоке."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.homeworks = homeworks
+    server.history_span = history_span
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.messages = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server, path='/'):
+    """Возвращает адрес запущенной заглушки."""
+    host, port = server.server_address
+    return f'http://{host}:{port}{path}'
+
+
+def serve(options, ready=None):
+    """Запускает обе заглушки и сообщает их адреса через ready."""
+    practicum = make_server(
+        PracticumHandler, options.practicum_latency,
+        options.practicum_error_rate, options.homeworks, options.seed,
+        options.practicum_port, int(options.history_days * 86400),
+    )
+    telegram = make_server(
+        TelegramHandler, options.telegram_latency,
+        options.telegram_error_rate, seed=options.seed,
+        port=options.telegram_port,
+    )
+    urls = (server_url(practicum), server_url(telegram, '/bot'))
+    if ready is not None:
+        ready.put(urls)
+    else:
+        print(f'Практикум: {urls[0]}\nTelegram: {urls[1]}')
+    threading.Event().wait()
+
+
+def add_arguments(parser):
+    """Добавляет настройки заглушек в разбор аргументов."""
+    parser.add_argument('--practicum-latency', type=float, default=0.0)
+    parser.add_argument('--practicum-error-rate', type=float, default=0.0)
+    parser.add_argument('--homeworks', type=int, default=1)
+    parser.add_argument('--history-days', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.0)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--practicum-port', type=int, default=0)
+    parser.add_argument('--telegram-port', type=int, default=0)
+    return parser
+
+
+if __name__ == '__main__':
+    serve(add_arguments(argparse.ArgumentParser()).parse_args())
@@ -0,0 +1,200 @@
+import json
+import os
+from http import HTTPStatus
+
+import http_pool
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает настройки отправки в Telegram из окружения."""
+    global TELEGRAM_SENDER, TELEGRAM_API_URL, TELEGRAM_POOL_SIZE
+    TELEGRAM_SENDER = os.getenv('TELEGRAM_SENDER', 'ptb')
+    TELEGRAM_API_URL = os.getenv(
+        'TELEGRAM_API_URL', 'https://api.telegram.org/bot'
+    )
+    TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 4))
+
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def _lstrip(message, prefix):
+    return message[len(prefix):] if message.startswith(prefix) else message
+
+
+class TelegramError(Exception):
+    """Ошибка Telegram Bot API.
+    Иерархия и тексты ошибок повторяют telegram.error из
+    python-telegram-bot, но модуль не тянет за собой эту библиотеку.
+    """
+
+    def __init__(self, message):
+        """Запоминает текст ошибки."""
+        super().__init__()
+        stripped = message
+        for prefix in ('Error: ', '[Error]: ', 'Bad Request: '):
+            stripped = _lstrip(stripped, prefix)
+        self.message = (
+            stripped.capitalize() if stripped != message else message
+        )
+
+    def __str__(self):
+        """Возвращает текст ошибки."""
+        return self.message
+
+
+class Unauthorized(TelegramError):
+    """У бота нет прав на действие или токен отозван."""
+
+
+class InvalidToken(TelegramError):
+    """Токен бота не распознан сервером."""
+
+    def __init__(self):
+        """Создаёт ошибку неверного токена."""
+        super().__init__('Invalid token')
+
+
+class NetworkError(TelegramError):
+    """Сетевой сбой при обращении к Bot API."""
+
+
+class BadRequest(NetworkError):
+    """Bot API не смог обработать запрос."""
+
+
+class TimedOut(NetworkError):
+    """Запрос к Bot API не завершился вовремя."""
+
+    def __init__(self):
+        """Создаёт ошибку истечения времени ожидания."""
+        super().__init__('Timed out')
+
+
+class ChatMigrated(TelegramError):
+    """Группа преобразована в супергруппу с новым chat_id."""
+
+    def __init__(self, new_chat_id):
+        """Запоминает новый идентификатор чата."""
+        super().__init__(
+            f'Group migrated to supergroup. New chat id: {new_chat_id}'
+        )
+        self.new_chat_id = new_chat_id
+
+
+class RetryAfter(TelegramError):
+    """Превышен лимит отправки, повтор возможен через retry_after секунд."""
+
+    def __init__(self, retry_after):
+        """Запоминает, сколько секунд просит подождать Telegram."""
+        super().__init__(
+            f'Flood control exceeded. Retry in {float(retry_after)} seconds'
+        )
+        self.retry_after = float(retry_after)
+
+
+class Conflict(TelegramError):
+    """Запрос конфликтует с другим запросом того же бота."""
+
+
+STATUS_ERRORS = {
+    HTTPStatus.BAD_REQUEST: BadRequest,
+    HTTPStatus.UNAUTHORIZED: Unauthorized,
+    HTTPStatus.FORBIDDEN: Unauthorized,
+    HTTPStatus.CONFLICT: Conflict,
+}
+
+
+class DirectBot:
+    """Минимальный клиент Bot API: только sendMessage.
+    Отправляет JSON напрямую через пул keep-alive соединений urllib3
+    и отображает ответы сервера на те же исключения, что и
+    telegram.Bot, поэтому подходит вместо него для send_message
+    и очереди отправки.
+    """
+
+    def __init__(self, token, base_url=None, pool=None, pool_size=None):
+        """Запоминает токен и создаёт пул соединений с Bot API."""
+        import urllib3
+
+        base_url = TELEGRAM_API_URL if base_url is None else base_url
+        pool_size = TELEGRAM_POOL_SIZE if pool_size is None else pool_size
+        self.token = token
+        self.base_url = f'{base_url}{token}'
+        self.pool = pool or urllib3.PoolManager(
+            maxsize=pool_size, block=True,
+            timeout=urllib3.Timeout(*http_pool.timeout),
+            retries=False,
+        )
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Отправляет сообщение и возвращает объект Message как словарь."""
+        from urllib3.exceptions import HTTPError, TimeoutError
+
+        body = json.dumps(dict(kwargs, chat_id=chat_id, text=text))
+        try:
+            response = self.pool.request(
+                'POST', f'{self.base_url}/sendMessage',
+                body=body.encode(), headers=JSON_HEADERS,
+            )
+        except TimeoutError:
+            raise TimedOut()
+        except HTTPError as error:
+            raise NetworkError(f'urllib3 HTTPError {error}')
+        return parse_response(response.status, response.data)
+
+    def close(self):
+        """Закрывает соединения пула."""
+        self.pool.clear()
+
+
+def parse_response(status, body):
+    """Возвращает result ответа Bot API или выбрасывает TelegramError."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise NetworkError('Invalid server response')
+    if data.get('ok'):
+        return data.get('result')
+    parameters = data.get('parameters') or {}
+    if 'migrate_to_chat_id' in parameters:
+        raise ChatMigrated(parameters['migrate_to_chat_id'])
+    if 'retry_after' in parameters:
+        raise RetryAfter(parameters['retry_after'])
+    description = data.get('description', 'Unknown HTTPError')
+    if status == HTTPStatus.NOT_FOUND:
+        raise InvalidToken()
+    if status == HTTPStatus.BAD_GATEWAY:
+        raise NetworkError('Bad Gateway')
+    if status in STATUS_ERRORS:
+        raise STATUS_ERRORS[status](description)
+    raise NetworkError(f'{description} ({status})')
+
+
+def make_bot(token, sender=None):
+    """Создаёт отправителя сообщений по настройке TELEGRAM_SENDER.
+    'direct' — DirectBot, иначе — telegram.Bot.
+    """
+    sender = TELEGRAM_SENDER if sender is None else sender
+    if sender == 'direct':
+        return DirectBot(token)
+    import telegram
+
+    return telegram.Bot(token=token)
+
+
+def error_types(bot):
+    """Возвращает классы RetryAfter и TelegramError для отправителя bot.
+    Отправитель может указать их сам атрибутом error_types.
+    """
+    types = getattr(bot, 'error_types', None)
+    if types is not None:
+        return types
+    if isinstance(bot, DirectBot):
+        return RetryAfter, TelegramError
+    from telegram.error import RetryAfter as PTBRetryAfter
+    from telegram.error import TelegramError as PTBTelegramError
+
+    return PTBRetryAfter, PTBTelegramError
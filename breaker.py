@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+import settings
+from polling import is_transient
+
+
+@settings.register
+def read_env():
+    """Читает пороги предохранителя из окружения."""
+    global BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 60))
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Предохранитель запросов к одному эндпоинту.
+    После failure_threshold временных сбоев подряд размыкается, и
+    опросы всех подписчиков пропускаются без запроса к API. Через
+    reset_timeout секунд пропускается один пробный запрос: удачный
+    замыкает предохранитель, неудачный снова размыкает его.
+    Ответы, не считающиеся временным сбоем (например, 401), говорят
+    о том, что эндпоинт жив, и учитываются как успех.
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None,
+                 clock=time.monotonic):
+        """Задаёт порог сбоев, время до пробного запроса и часы."""
+        if failure_threshold is None:
+            failure_threshold = BREAKER_FAILURE_THRESHOLD
+        if reset_timeout is None:
+            reset_timeout = BREAKER_RESET_TIMEOUT
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Проверяет, что опросы сейчас пропускаются."""
+        return self.state != CLOSED
+
+    def allow(self):
+        """Решает, можно ли выполнить запрос.
+        В разомкнутом состоянии по истечении reset_timeout разрешает
+        ровно один пробный запрос.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.retry_after() == 0:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self):
+        """Возвращает время до пробного запроса в секундах."""
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def record_success(self):
+        """Учитывает удачный запрос и замыкает предохранитель."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self, error):
+        """Учитывает сбой запроса.
+        Возвращает True, если после него предохранитель разомкнут.
+        """
+        if not is_transient(error):
+            self.record_success()
+            return False
+        with self._lock:
+            self.failures += 1
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self._opened_at = self.clock()
+            return self.state == OPEN
+
+
+def get_breaker(endpoint):
+    """Возвращает общий для всех подписчиков предохранитель эндпоинта."""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker())
+    return breaker
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает размер и срок жизни кэша из окружения."""
+    global RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 10000))
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 3600))
+
+
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+|null)')
+
+
+class LRUCache:
+    """Словарь ограниченного размера с вытеснением по LRU и TTL."""
+
+    def __init__(self, max_entries=None, ttl=None, clock=time.monotonic):
+        """Задаёт размер кэша, время жизни записей и часы."""
+        if max_entries is None:
+            max_entries = RESPONSE_CACHE_SIZE
+        ttl = RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Возвращает число записей в кэше."""
+        return len(self._entries)
+
+    def get(self, key):
+        """Возвращает свежее значение по ключу или None."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or self.clock() - item[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def discard(self, key):
+        """Удаляет запись по ключу, если она есть."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def put(self, key, value):
+        """Сохраняет значение, вытесняя самые давние записи."""
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class Validators:
+    """Валидаторы ответа для условного запроса и его разобранное тело."""
+
+    __slots__ = ('etag', 'last_modified', 'records', 'current_date')
+
+    def __init__(self, etag, last_modified, records, current_date):
+        """Запоминает валидаторы ответа и разобранные записи."""
+        self.etag = etag
+        self.last_modified = last_modified
+        self.records = records
+        self.current_date = current_date
+
+
+class ResponseCache:
+    """Кэш ответов API Практикума.
+    Валидаторы ETag и Last-Modified последнего ответа хранятся по
+    токену: курсор from_date сдвигается после каждого ответа, поэтому
+    следующий опрос отправляет их с уже новым курсором и может
+    получить от сервера 304 вместо тела.
+    Разобранные записи хранятся по хэшу тела без current_date:
+    неизменившийся список работ не разбирается и не проверяется
+    повторно, даже если курсор сдвинулся.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, clock=time.monotonic):
+        """Создаёт кэш разборов и кэш валидаторов."""
+        if max_entries is None:
+            max_entries = RESPONSE_CACHE_SIZE
+        ttl = RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.validators = LRUCache(max_entries, ttl, clock)
+        self.parsed = LRUCache(max_entries, ttl, clock)
+
+    def conditional_headers(self, headers):
+        """Дополняет заголовки запроса валидаторами прошлого ответа."""
+        entry = self.validators.get(headers.get('Authorization'))
+        if entry is None:
+            return headers
+        headers = dict(headers)
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def not_modified(self, headers, cursor):
+        """Возвращает записи и курсор для ответа 304.
+        Записи берутся из прошлого ответа, курсор — запрошенный,
+        если он новее current_date прошлого ответа.
+        """
+        entry = self.validators.get(headers.get('Authorization'))
+        if entry is None:
+            return None
+        current_date = max(cursor, entry.current_date or cursor)
+        records = [
+            record._replace(current_date=current_date)
+            for record in entry.records
+        ]
+        return records, current_date
+
+    def decode(self, raw, decode_response):
+        """Разбирает тело ответа, используя кэш по его хэшу."""
+        match = CURRENT_DATE.search(raw)
+        digest = hashlib.blake2b(
+            CURRENT_DATE.sub(b'', raw), digest_size=16
+        ).digest()
+        records = self.parsed.get(digest)
+        if records is None or match is None:
+            records, current_date = decode_response(raw)
+            self.parsed.put(digest, records)
+            return records, current_date
+        value = match.group(1)
+        current_date = None if value == b'null' else int(value)
+        if records and records[0].current_date != current_date:
+            records = [
+                record._replace(current_date=current_date)
+                for record in records
+            ]
+        return records, current_date
+
+    def remember(self, headers, response, records, current_date):
+        """Сохраняет валидаторы ответа, если сервер их прислал.
+        Иначе забывает валидаторы прошлого ответа: они описывают уже
+        не последнее известное тело.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        key = headers.get('Authorization')
+        if etag or last_modified:
+            self.validators.put(
+                key, Validators(etag, last_modified, records, current_date)
+            )
+        else:
+            self.validators.discard(key)
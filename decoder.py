@@ -0,0 +1,99 @@
+import json
+import logging
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+class HomeworkStatus(NamedTuple):
+    """Статус одной домашней работы из ответа API."""
+
+    homework_name: str
+    status: str
+    current_date: Optional[int]
+
+
+def _fail(error_class, message):
+    logger.error(message)
+    return error_class(message)
+
+
+class ResponseDecoder:
+    """Разбор ответа API для заданного набора статусов.
+    Проверяет ответ за один проход так же, как цепочка
+    check_response и parse_status, с теми же исключениями
+    и текстами ошибок.
+    """
+
+    __slots__ = ('known_statuses',)
+
+    def __init__(self, known_statuses):
+        """Запоминает статусы, которые считаются документированными."""
+        self.known_statuses = frozenset(known_statuses)
+
+    def __call__(self, raw):
+        """Разбирает тело ответа в байтах.
+        Возвращает список HomeworkStatus и значение current_date.
+        """
+        try:
+            data = loads(raw)
+        except ValueError:
+            logger.error('Ответ не является типом данный Python')
+            raise json.JSONDecodeError(
+                'Ответ не является типом данный Python', '', 0
+            ) from None
+        return self.decode(data)
+
+    def decode(self, data):
+        """Проверяет уже разобранный JSON ответа или события.
+        Возвращает список HomeworkStatus и значение current_date.
+        """
+        if type(data) is not dict:
+            raise _fail(TypeError, 'Ответ от API не является словарем')
+        if 'homeworks' not in data:
+            raise _fail(KeyError, 'Ключ "homeworks" отсутствует в словаре')
+        homeworks = data['homeworks']
+        if type(homeworks) is not list:
+            raise _fail(
+                TypeError,
+                'Под ключом `homeworks` ответ от API не в виде списка',
+            )
+        current_date = data.get('current_date')
+        return [
+            self._record(homework, current_date) for homework in homeworks
+        ], current_date
+
+    def dated(self, data):
+        """Проверяет ответ так же, как decode, не теряя date_updated.
+        Возвращает список пар (HomeworkStatus, date_updated) и значение
+        current_date; у работ без date_updated вторым элементом идёт
+        None.
+        """
+        records, current_date = self.decode(data)
+        return [
+            (record, homework.get('date_updated'))
+            for record, homework in zip(records, data['homeworks'])
+        ], current_date
+
+    def _record(self, homework, current_date):
+        if 'homework_name' not in homework:
+            raise _fail(
+                KeyError,
+                'Отсутствует ожидаемый ключ "homework_name" в ответе',
+            )
+        if 'status' not in homework:
+            raise _fail(
+                KeyError,
+                'Отсутствует ожидаемый ключ "status" в ответе API',
+            )
+        status = homework['status']
+        if status not in self.known_statuses:
+            raise _fail(Exception, f'Недокументированный статус: {status}')
+        return HomeworkStatus(homework['homework_name'], status, current_date)
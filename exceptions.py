@@ -2,3 +2,33 @@ class CustomError(Exception):
     """Пользовательское исключение."""
 
     pass
+
+
+class EndpointError(CustomError):
+    """Эндпоинт ответил кодом, отличным от 200."""
+
+    def __init__(self, status_code):
+        """Запоминает код ответа эндпоинта."""
+        super().__init__(f'Эндпоинт недоступен: {status_code}')
+        self.status_code = status_code
+
+
+class CircuitOpenError(CustomError):
+    """Опрос пропущен: предохранитель эндпоинта разомкнут."""
+
+    def __init__(self, retry_after):
+        """Запоминает время до пробного запроса."""
+        super().__init__(
+            f'Эндпоинт отключён предохранителем, '
+            f'повтор через {retry_after:.0f} с'
+        )
+        self.retry_after = retry_after
+
+
+class FetchTimeoutError(CustomError):
+    """Запрос в пуле потоков не завершился за отведённое время."""
+
+    def __init__(self, timeout):
+        """Запоминает отведённое на запрос время."""
+        super().__init__(f'Запрос не завершился за {timeout:.0f} с')
+        self.timeout = timeout
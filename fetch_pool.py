@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+
+import settings
+from exceptions import FetchTimeoutError
+
+
+@settings.register
+def read_env():
+    """Читает настройки пула запросов из окружения."""
+    global FETCH_WORKERS, FETCH_TASK_TIMEOUT, FETCH_CANCEL_ON_SHUTDOWN
+    FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', 0))
+    FETCH_TASK_TIMEOUT = float(os.getenv('FETCH_TASK_TIMEOUT', 60))
+    FETCH_CANCEL_ON_SHUTDOWN = (
+        os.getenv('FETCH_CANCEL_ON_SHUTDOWN', 'true').lower() != 'false'
+    )
+
+
+class FetchExecutor:
+    """Пул потоков для параллельных запросов к API.
+    Выполняет в потоках только функцию fetch, не меняющую состояние
+    подписчиков, и возвращает результаты в порядке задач, чтобы
+    дедупликация и отправка сообщений оставались последовательными.
+    Задача, не завершившаяся за task_timeout секунд от начала
+    пакета, отменяется, а вместо результата возвращается
+    FetchTimeoutError.
+    """
+
+    def __init__(self, fetch, workers=None, task_timeout=None,
+                 cancel_on_shutdown=None):
+        """Задаёт функцию запроса, число потоков и таймауты."""
+        workers = FETCH_WORKERS if workers is None else workers
+        if task_timeout is None:
+            task_timeout = FETCH_TASK_TIMEOUT
+        if cancel_on_shutdown is None:
+            cancel_on_shutdown = FETCH_CANCEL_ON_SHUTDOWN
+        self.fetch = fetch
+        self.workers = workers
+        self.task_timeout = task_timeout
+        self.cancel_on_shutdown = cancel_on_shutdown
+        self._running = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='fetch'
+        )
+
+    def map(self, tasks, keys=None):
+        """Выполняет fetch для каждого кортежа аргументов из tasks.
+        Возвращает список результатов fetch; упавшая задача даёт
+        результат ([], первый аргумент, исключение), как у poll_records.
+        Все задачи пакета ждут результата до общего срока task_timeout.
+        Если заданы keys, задача с ключом, чей запрос из прошлого
+        пакета ещё выполняется, не ставится повторно и сразу получает
+        FetchTimeoutError.
+        """
+        self._running = {
+            key: future for key, future in self._running.items()
+            if not future.done()
+        }
+        tasks = list(tasks)
+        keys = [None] * len(tasks) if keys is None else list(keys)
+        futures = [
+            self._submit(key, args) for key, args in zip(keys, tasks)
+        ]
+        wait(
+            [future for future in futures if future is not None],
+            timeout=self.task_timeout,
+        )
+        return [
+            self._result(future, args) for future, args in zip(futures, tasks)
+        ]
+
+    def _submit(self, key, args):
+        running = self._running.get(key)
+        if running is not None and not running.done():
+            return None
+        future = self._executor.submit(self.fetch, *args)
+        if key is not None:
+            self._running[key] = future
+        return future
+
+    def _result(self, future, args):
+        if future is None or not future.done():
+            if future is not None:
+                future.cancel()
+            return [], args[0], FetchTimeoutError(self.task_timeout)
+        try:
+            return future.result()
+        except CancelledError:
+            return [], args[0], FetchTimeoutError(self.task_timeout)
+        except Exception as error:
+            return [], args[0], error
+
+    def shutdown(self):
+        """Останавливает пул.
+        При cancel_on_shutdown задачи, ещё не начавшие выполнение,
+        отменяются, иначе пул дожидается всех поставленных задач.
+        """
+        self._executor.shutdown(
+            wait=not self.cancel_on_shutdown,
+            cancel_futures=self.cancel_on_shutdown,
+        )
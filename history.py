@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает настройки журнала изменений из окружения."""
+    global HISTORY_STORE, HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL
+    HISTORY_STORE = os.getenv('HISTORY_STORE', '')
+    HISTORY_BATCH_SIZE = int(os.getenv('HISTORY_BATCH_SIZE', 500))
+    HISTORY_FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL', 5))
+
+
+log = None
+
+
+class StatusEvent(NamedTuple):
+    """Запись журнала: изменение статуса домашней работы."""
+
+    tenant: str
+    homework_name: str
+    status: str
+    current_date: Optional[int]
+    received_at: float
+
+
+class HistoryLog:
+    """Журнал изменений статусов в базе SQLite.
+    Записи только добавляются. Они копятся в памяти и пишутся одной
+    транзакцией, когда набирается batch_size записей или с прошлой
+    записи прошло flush_interval секунд. Индексы по подписчику и по
+    времени получения позволяют выбирать диапазоны без полного обхода,
+    индекс по работе — находить её последний статус.
+    """
+
+    def __init__(self, path=None, batch_size=None, flush_interval=None,
+                 clock=time.time):
+        """Открывает базу журнала и создаёт таблицу и индексы."""
+        path = HISTORY_STORE if path is None else path
+        batch_size = HISTORY_BATCH_SIZE if batch_size is None else batch_size
+        if flush_interval is None:
+            flush_interval = HISTORY_FLUSH_INTERVAL
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS status_event ('
+            ' id INTEGER PRIMARY KEY,'
+            ' tenant TEXT NOT NULL,'
+            ' homework_name TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' from_date INTEGER,'
+            ' received_at REAL NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS status_event_tenant_time'
+            ' ON status_event (tenant, received_at);'
+            'CREATE INDEX IF NOT EXISTS status_event_time'
+            ' ON status_event (received_at);'
+            'CREATE INDEX IF NOT EXISTS status_event_homework'
+            ' ON status_event (tenant, homework_name, id);'
+        )
+        self._pending = []
+        self._flushed_at = clock()
+
+    def append(self, tenant, homework_name, status, current_date=None,
+               received_at=None):
+        """Добавляет запись в очередь на запись."""
+        if received_at is None:
+            received_at = self.clock()
+        self._pending.append(StatusEvent(
+            tenant, homework_name, status, current_date, received_at
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def maybe_flush(self):
+        """Записывает очередь, если с прошлой записи прошло достаточно."""
+        if self._pending and (
+            self.clock() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Записывает все накопленные записи одной транзакцией."""
+        if self._pending:
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT INTO status_event (tenant, homework_name, status,'
+                    ' from_date, received_at) VALUES (?, ?, ?, ?, ?)',
+                    self._pending,
+                )
+            self._pending = []
+        self._flushed_at = self.clock()
+
+    def changes(self, tenant=None, since=None, until=None):
+        """Возвращает записи за период [since, until) по времени получения.
+        Без tenant выбираются записи всех подписчиков.
+        """
+        self.flush()
+        conditions, parameters = [], []
+        for condition, value in (
+            ('tenant = ?', tenant),
+            ('received_at >= ?', since),
+            ('received_at < ?', until),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        return [
+            StatusEvent(*row) for row in self.connection.execute(
+                'SELECT tenant, homework_name, status, from_date,'
+                ' received_at FROM status_event' + where
+                + ' ORDER BY received_at, id',
+                parameters,
+            )
+        ]
+
+    def latest(self, tenant):
+        """Возвращает последние статусы работ подписчика."""
+        self.flush()
+        return dict(self.connection.execute(
+            'SELECT homework_name, status FROM status_event WHERE id IN ('
+            ' SELECT MAX(id) FROM status_event WHERE tenant = ?'
+            ' GROUP BY homework_name)',
+            (tenant,),
+        ))
+
+    def cursor(self, tenant):
+        """Возвращает последнее значение current_date подписчика."""
+        self.flush()
+        current_date, = self.connection.execute(
+            'SELECT MAX(from_date) FROM status_event WHERE tenant = ?',
+            (tenant,),
+        ).fetchone()
+        return current_date
+
+    def review_durations(self, since=None):
+        """Возвращает длительность проверок в секундах.
+        Проверкой считается переход работы из reviewing в approved или
+        rejected; since ограничивает время получения итогового статуса.
+        """
+        self.flush()
+        return self.connection.execute(
+            'SELECT tenant, homework_name, status, received_at - started'
+            ' FROM (SELECT tenant, homework_name, status, received_at,'
+            '  LAG(status) OVER work AS previous,'
+            '  LAG(received_at) OVER work AS started'
+            '  FROM status_event'
+            '  WINDOW work AS (PARTITION BY tenant, homework_name'
+            '   ORDER BY id))'
+            " WHERE previous = 'reviewing'"
+            " AND status IN ('approved', 'rejected')"
+            ' AND received_at >= ?',
+            (since or 0,),
+        ).fetchall()
+
+    def close(self):
+        """Записывает очередь и закрывает соединение с базой."""
+        self.flush()
+        self.connection.close()
+
+
+def open_log(path=None, clock=time.time):
+    """Открывает журнал, если задан путь к нему.
+    Время получения записей берётся из clock.
+    """
+    global log
+    path = HISTORY_STORE if path is None else path
+    log = HistoryLog(path, clock=clock) if path else None
+    return log
+
+
+def snapshot(statuses):
+    """Копирует статусы перед разбором ответа, если журнал включён."""
+    return dict(statuses) if log is not None else None
+
+
+def record(tenant, before, statuses, current_date=None):
+    """Записывает в журнал работы, статус которых изменился.
+    before — результат snapshot() до разбора ответа или события,
+    statuses — словарь статусов после него.
+    """
+    if log is None or before is None:
+        return
+    for homework_name, status in statuses.items():
+        if before.get(homework_name) != status:
+            log.append(tenant, homework_name, status, current_date)
+
+
+def restore(tenant):
+    """Восстанавливает курсор и статусы подписчика по журналу.
+    Возвращает (None, {}), если журнал выключен или пуст.
+    """
+    if log is None:
+        return None, {}
+    return log.cursor(tenant), log.latest(tenant)
+
+
+def maybe_flush():
+    """Записывает очередь журнала, если пора."""
+    if log is not None:
+        log.maybe_flush()
+
+
+def close():
+    """Закрывает журнал при завершении работы."""
+    global log
+    if log is not None:
+        log.close()
+        log = None
@@ -1,33 +1,28 @@
 import json
 import logging
 import os
-import sys
 import time
 from http import HTTPStatus
-from logging import StreamHandler
 
-import requests
-import telegram
-from dotenv import load_dotenv
-from telegram import TelegramError
-
-from exceptions import CustomError
-
-load_dotenv()
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    filename='main.log',
-    format='%(asctime)s, %(levelname)s, %(message)s, %(funcName)s, %(lineno)s',
-    filemode='a'
-)
+import alerts
+import history
+import http_pool
+import metrics
+import push
+import settings
+import state
+import templates
+import transport
+from bot_api import error_types
+from breaker import get_breaker
+from cache import ResponseCache
+from decoder import ResponseDecoder
+from exceptions import CircuitOpenError, EndpointError
+from lifecycle import Lifecycle
+from log_config import setup_logging
+from polling import AdaptiveInterval
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = StreamHandler(stream=sys.stdout)
-formatter = logging.Formatter('%(asctime)s, %(levelname)s, %(message)s,')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
@@ -43,17 +38,35 @@ HOMEWORK_STATUSES = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+HOMEWORK_STATUSES_FILE = os.getenv(
+    'HOMEWORK_STATUSES_FILE', 'homework_statuses.json'
+)
+
+decode_response = ResponseDecoder(HOMEWORK_STATUSES)
+templates.configure(HOMEWORK_STATUSES)
+response_cache = ResponseCache()
+
 
 def send_message(bot, message):
     """Отправляет сообщение в Telegram чат, определяемый TELEGRAM_CHAT_ID.
     Принимает на вход два параметра: экземпляр класса Bot
     и строку с текстом сообщения.
     """
+    send_message_to(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to(bot, chat_id, message, parse_mode=None):
+    """Отправляет сообщение в произвольный Telegram чат.
+    Используется в многопользовательском режиме, где у каждого
+    подписчика свой chat_id и своя разметка parse_mode.
+    """
+    TelegramError = error_types(bot)[1]
+    options = {'parse_mode': parse_mode} if parse_mode else {}
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logger.info(f'Сообщение "{message}" отправлено в Telegram')
+        bot.send_message(chat_id, message, **options)
+        logger.info('Сообщение "%s" отправлено в Telegram', message)
     except TelegramError:
-        logger.error(f'Сбой при отправке сообщения "{message}" Telegram')
+        logger.error('Сбой при отправке сообщения "%s" Telegram', message)
         raise TelegramError(f'Сбой при отправке сообщения "{message}"Telegram')
 
 
@@ -63,10 +76,47 @@ def get_api_answer(current_timestamp):
     В случае успешного запроса должна вернуть ответ API,
     преобразовав его из формата JSON к типам данных Python.
     """
-    timestamp = current_timestamp or int(time.time())
+    return request_api_answer(current_timestamp, HEADERS)
+
+
+def make_headers(token):
+    """Формирует заголовки авторизации для токена Практикума."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def request_api_answer(current_timestamp, headers):
+    """Делает запрос к API с заданными заголовками авторизации.
+    Общая часть get_api_answer: позволяет опрашивать API
+    от имени любого подписчика, а не только PRACTICUM_TOKEN.
+    """
+    response = send_api_request(current_timestamp, headers)
+    try:
+        response = response.json()
+    except json.decoder.JSONDecodeError:
+        logger.error('Ответ не является типом данный Python')
+        raise json.decoder.JSONDecodeError(
+            'Ответ не является типом данный Python'
+        )
+    return response
+
+
+def request_raw_answer(current_timestamp, headers):
+    """Делает запрос к API и возвращает тело ответа в байтах.
+    Разбор тела выполняет decode_response.
+    """
+    return send_api_request(current_timestamp, headers).content
+
+
+def send_api_request(current_timestamp, headers, allow_not_modified=False):
+    """Отправляет запрос к API и проверяет код ответа.
+    Ответ 304 допустим только для условного запроса.
+    """
+    import requests
+
+    timestamp = current_timestamp or int(transport.now())
     params = {'from_date': timestamp}
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+        response = transport.fetch(ENDPOINT, headers, params)
     except requests.exceptions.ConnectionError:
         logger.error('Проблемы с сетью')
         raise requests.exceptions.ConnectionError('Проблемы с сетью')
@@ -83,16 +133,11 @@ def get_api_answer(current_timestamp):
         raise requests.exceptions.RequestException(
             'Сбой при запросе к эндпоинту'
         )
+    if response.status_code == HTTPStatus.NOT_MODIFIED and allow_not_modified:
+        return response
     if response.status_code != HTTPStatus.OK:
-        logger.error(f'Эндпоинт недоступен: {response.status_code}')
-        raise CustomError(f'Эндпоинт недоступен: {response.status_code}')
-    try:
-        response = response.json()
-    except json.decoder.JSONDecodeError:
-        logger.error('Ответ не является типом данный Python')
-        raise json.decoder.JSONDecodeError(
-            'Ответ не является типом данный Python'
-        )
+        logger.error('Эндпоинт недоступен: %s', response.status_code)
+        raise EndpointError(response.status_code)
     return response
 
 
@@ -133,7 +178,7 @@ def parse_status(homework):
     homework_name = homework['homework_name']
     homework_status = homework['status']
     if homework_status not in HOMEWORK_STATUSES:
-        logger.error(f'Недокументированный статус: {homework_status}')
+        logger.error('Недокументированный статус: %s', homework_status)
         raise Exception(f'Недокументированный статус: {homework_status}')
     verdict = HOMEWORK_STATUSES[homework_status]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
@@ -149,33 +194,327 @@ def check_tokens():
     return False
 
 
-def main():
-    """Основная логика работы бота."""
+def read_status_texts(path=None):
+    """Читает тексты вердиктов из JSON-файла, если он есть.
+    Файл содержит объект вида {"approved": "текст", ...}.
+    """
+    path = HOMEWORK_STATUSES_FILE if path is None else path
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def load_status_texts():
+    """Заменяет тексты вердиктов HOMEWORK_STATUSES текстами из файла.
+    Шаблоны сообщений перекомпилируются с новыми текстами и
+    каталогами из MESSAGE_CATALOG_FILE, а разбор ответа начинает
+    принимать статусы, добавленные в файл.
+    """
+    HOMEWORK_STATUSES.update(read_status_texts())
+    decode_response.known_statuses = frozenset(HOMEWORK_STATUSES)
+    templates.configure(HOMEWORK_STATUSES, templates.read_catalogs())
+
+
+def init():
+    """Подготавливает процесс к работе.
+    Читает .env, перечитывает настройки всех модулей, настраивает
+    журнал и пересоздаёт объекты, созданные при импорте с прежними
+    настройками. Импорт модуля не имеет побочных эффектов, поэтому
+    init() вызывается явно в точке входа, до main().
+    """
+    from dotenv import load_dotenv
+
+    global response_cache
+    load_dotenv()
+    settings.reload()
+    setup_logging()
+    read_env()
+    response_cache = ResponseCache()
+    alerts.gate = alerts.AlertGate()
+    transport.configure()
+
+
+def read_env():
+    """Перечитывает токены, чат и тексты вердиктов.
+    Словари HEADERS и HOMEWORK_STATUSES обновляются на месте, поэтому
+    изменения видны всем модулям, импортировавшим их.
+    """
+    global PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
+    global HOMEWORK_STATUSES_FILE
+    PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
+    TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+    TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+    HOMEWORK_STATUSES_FILE = os.getenv(
+        'HOMEWORK_STATUSES_FILE', 'homework_statuses.json'
+    )
+    HEADERS.update(make_headers(PRACTICUM_TOKEN))
+    load_status_texts()
+
+
+def reload_settings(outbox=None):
+    """Перечитывает .env и тексты вердиктов без перезапуска процесса.
+    Если передана очередь отправки и сменился TELEGRAM_TOKEN,
+    бот в ней заменяется.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    read_env()
+    if outbox is not None and outbox.bot.token != TELEGRAM_TOKEN:
+        outbox.bot = transport.make_deliverer(TELEGRAM_TOKEN)
+    logger.info('Настройки перечитаны')
+
+
+def check_updates(current_timestamp, headers, statuses):
+    """Выполняет один цикл опроса API.
+    Возвращает текст сообщения для Telegram, новую временную метку
+    для следующего запроса и исключение, если цикл завершился сбоем.
+    Словарь statuses с последними статусами работ обновляется.
+    """
+    records, current_timestamp, error = poll_records(
+        current_timestamp, headers
+    )
+    return describe_poll(records, error, statuses), current_timestamp, error
+
+
+def poll_records(current_timestamp, headers):
+    """Запрашивает изменения статусов под защитой предохранителя.
+    Не меняет состояние подписчика, поэтому может выполняться
+    в пуле потоков. Возвращает записи, новую временную метку
+    и исключение или None.
+    """
+    breaker = get_breaker(ENDPOINT)
+    if not breaker.allow():
+        error = CircuitOpenError(breaker.retry_after())
+        return [], current_timestamp, error
+    started = time.perf_counter()
+    try:
+        records, current_timestamp = fetch_records(current_timestamp, headers)
+    except Exception as error:
+        metrics.record_practicum(started, error)
+        breaker.record_failure(error)
+        return [], current_timestamp, error
+    metrics.record_practicum(started)
+    breaker.record_success()
+    return records, current_timestamp, None
+
+
+def describe_poll(records, error, statuses, renderer=None):
+    """Возвращает текст сообщения по итогам опроса.
+    Пока предохранитель эндпоинта разомкнут, все подписчики получают
+    одно и то же сообщение о недоступности API, поэтому дедупликация
+    оставляет одно уведомление на сбой. Тексты берутся из шаблонов
+    renderer, по умолчанию — из MESSAGE_LOCALE и MESSAGE_FORMAT.
+    """
+    renderer = renderer or templates.renderer()
+    if error is None:
+        return build_message(records, statuses, renderer)
+    if isinstance(error, CircuitOpenError) or get_breaker(ENDPOINT).is_open:
+        return renderer.outage
+    return renderer.failure(error)
+
+
+def gate_alert(key, message, error, renderer=None):
+    """Пропускает сообщение о сбое через подавление повторов.
+    Возвращает сообщение или None, если о сбое того же класса
+    подписчику key уже сообщалось недавно, и сводку подавленных
+    сбоев, если подошёл её срок, или None.
+    """
+    renderer = renderer or templates.renderer()
+    if error is not None and not alerts.gate.allow(key, error):
+        message = None
+    return message, alerts.gate.digest(key, renderer)
+
+
+def deliver_poll(outbox, key, message, error, old_message):
+    """Отправляет итог опроса в TELEGRAM_CHAT_ID.
+    Повтор прошлого сообщения не отправляется. О повторах сбоев
+    решает только подавление в gate_alert: пропущенное им сообщение
+    отправляется, даже если совпадает с прошлым.
+    Возвращает последнее отправленное сообщение.
+    """
+    renderer = templates.renderer()
+    message, digest = gate_alert(key, message, error, renderer)
+    if message is not None and (
+        message != old_message or error is not None
+    ):
+        outbox.put(TELEGRAM_CHAT_ID, message, renderer.parse_mode)
+        old_message = message
+    if digest is not None:
+        outbox.put(TELEGRAM_CHAT_ID, digest, renderer.parse_mode)
+    return old_message
+
+
+def fetch_records(current_timestamp, headers):
+    """Запрашивает и разбирает ответ API с учётом кэша ответов.
+    Возвращает список HomeworkStatus и значение current_date.
+    """
+    timestamp = current_timestamp or int(transport.now())
+    response = send_api_request(
+        timestamp,
+        response_cache.conditional_headers(headers),
+        allow_not_modified=True,
+    )
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        cached = response_cache.not_modified(headers, timestamp)
+        if cached is None:
+            raise EndpointError(response.status_code)
+        return cached
+    records, current_date = response_cache.decode(
+        response.content, decode_response
+    )
+    response_cache.remember(headers, response, records, current_date)
+    return records, current_date
+
+
+def handle_response(raw, statuses, renderer=None):
+    """Разбирает тело ответа API, полученное любым способом.
+    Возвращает кортеж из текста сообщения и значения current_date.
+    """
+    records, current_date = response_cache.decode(raw, decode_response)
+    return build_message(records, statuses, renderer), current_date
+
+
+def build_message(records, statuses, renderer=None):
+    """Собирает все изменения статусов в одно сообщение."""
+    renderer = renderer or templates.renderer()
+    messages = parse_records(records, statuses, renderer)
+    return '\n\n'.join(messages) if messages else renderer.no_changes
+
+
+def push_message(records, statuses, renderer=None):
+    """Собирает сообщение по событию от внешнего источника.
+    В отличие от build_message возвращает None, если статусы
+    не изменились: событие могло прийти повторно или уже быть
+    учтено опросом API.
+    """
+    messages = parse_records(records, statuses, renderer)
+    return '\n\n'.join(messages) if messages else None
+
+
+def apply_push(events, outbox, statuses, old_message):
+    """Отправляет изменения из событий, адресованных TELEGRAM_CHAT_ID.
+    Возвращает последнее отправленное сообщение.
+    """
+    for event in events:
+        if event.chat_id is not None and (
+            str(event.chat_id) != str(TELEGRAM_CHAT_ID)
+        ):
+            logger.warning('Событие для чужого чата %s', event.chat_id)
+            continue
+        message = push_message(event.records, statuses)
+        if message is not None:
+            outbox.put(
+                TELEGRAM_CHAT_ID, message, templates.renderer().parse_mode
+            )
+            old_message = message
+    return old_message
+
+
+def parse_records(records, statuses, renderer=None):
+    """Готовит сообщения обо всех домашних работах из ответа API.
+    Работы, статус которых совпадает с последним известным
+    в словаре statuses, пропускаются. Словарь обновляется на месте.
+    """
+    renderer = renderer or templates.renderer()
+    messages = []
+    for record in records:
+        if statuses.get(record.homework_name) == record.status:
+            continue
+        statuses[record.homework_name] = record.status
+        metrics.record_transition(record.status)
+        messages.append(renderer.status(record.homework_name, record.status))
+    return messages
+
+
+def restore_state(store, key, default=None):
+    """Возвращает курсор, последнее сообщение и статусы из хранилища.
+    Если для ключа ничего не сохранено, состояние восстанавливается
+    по журналу изменений, затем берётся default, а без него —
+    текущее время и пустое состояние.
+    """
+    saved = store.get(key)
+    if not saved.current_date:
+        current_date, statuses = history.restore(key)
+        if current_date:
+            return current_date, '', statuses
+        if default is not None:
+            return default
+    return (
+        saved.current_date or int(transport.now()),
+        saved.last_message,
+        dict(saved.statuses),
+    )
+
+
+def main(store=None):
+    """Основная логика работы бота.
+    store — хранилище состояния; по умолчанию открывается STATE_STORE.
+    """
     if not check_tokens():
         logger.critical('Отсутствуют одна или несколько переменных окружения')
         raise Exception('Отсутствуют одна или несколько переменных окружения')
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    old_message = ''
+    lifecycle = Lifecycle().install()
+    outbox = transport.make_outbox(TELEGRAM_TOKEN)
+    outbox.start()
+    if metrics.METRICS_PORT:
+        metrics.register_gauge(
+            'homework_bot_outbox_depth',
+            'Сообщения в очереди отправки.',
+            lambda: outbox.depth,
+        )
+        metrics.start_server()
+    http_pool.configure()
+    if store is None:
+        store = state.open_store()
+    history.open_log(clock=transport.now)
+    key = state.tenant_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+    current_timestamp, old_message, statuses = restore_state(store, key)
+    interval = AdaptiveInterval(RETRY_TIME, clock=transport.monotonic)
+    inbox = push.Inbox(decode_response.decode, lifecycle.wake)
+    stop_push = push.start(inbox)
+    due_at = transport.monotonic()
     try:
-        while True:
-            try:
-                response = get_api_answer(current_timestamp)
-                try:
-                    message = parse_status(check_response(response)[0])
-                except IndexError:
-                    message = 'Изменений нет'
-                current_timestamp = response.get('current_date')
-            except Exception as error:
-                message = f'Сбой в работе программы: {error}'
-            finally:
-                if message != old_message:
-                    send_message(bot, message)
-                    old_message = message
-                time.sleep(RETRY_TIME)
-    except KeyboardInterrupt:
-        print('Работа бота завершена!')
+        while not lifecycle.stopping:
+            if lifecycle.take_reload():
+                reload_settings(outbox)
+                key = state.tenant_key(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID)
+                current_timestamp, old_message, statuses = restore_state(
+                    store, key, (current_timestamp, old_message, statuses)
+                )
+            if transport.monotonic() >= due_at:
+                metrics.record_lag(transport.monotonic() - due_at)
+                before = history.snapshot(statuses)
+                message, current_timestamp, error = check_updates(
+                    current_timestamp, HEADERS, statuses
+                )
+                history.record(key, before, statuses, current_timestamp)
+                old_message = deliver_poll(
+                    outbox, key, message, error, old_message
+                )
+                due_at = transport.monotonic() + interval.next_delay(
+                    statuses, error
+                )
+            before = history.snapshot(statuses)
+            old_message = apply_push(
+                inbox.drain(), outbox, statuses, old_message
+            )
+            history.record(key, before, statuses)
+            store.update(
+                key,
+                current_date=current_timestamp,
+                last_message=old_message,
+                statuses=dict(statuses),
+            )
+            store.maybe_flush()
+            history.maybe_flush()
+            transport.wait(lifecycle, max(0.0, due_at - transport.monotonic()))
+    finally:
+        stop_push()
+        lifecycle.shutdown(outbox, store)
 
 
 if __name__ == '__main__':
+    init()
     main()
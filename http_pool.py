@@ -0,0 +1,63 @@
+import os
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает размер пула и таймауты из окружения."""
+    global HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, timeout
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+    timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+_session = None
+
+
+def configure(pool_size=None, connect_timeout=None, read_timeout=None):
+    """Создаёт общую HTTP-сессию с пулом keep-alive соединений.
+    Сессия переиспользуется между циклами опроса и между
+    подписчиками, поэтому TCP+TLS рукопожатие выполняется один раз
+    на соединение пула, а не на каждый запрос.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    global _session, timeout
+    pool_size = HTTP_POOL_SIZE if pool_size is None else pool_size
+    if connect_timeout is None:
+        connect_timeout = HTTP_CONNECT_TIMEOUT
+    read_timeout = HTTP_READ_TIMEOUT if read_timeout is None else read_timeout
+    close()
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size, pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    timeout = (connect_timeout, read_timeout)
+    _session = session
+    return session
+
+
+def close():
+    """Закрывает общую сессию и все соединения пула."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def get(url, **kwargs):
+    """Выполняет GET-запрос через общий пул соединений.
+    Пока пул не настроен вызовом configure(), запрос уходит
+    через requests.get. Таймауты применяются в обоих случаях.
+    """
+    kwargs.setdefault('timeout', timeout)
+    if _session is None:
+        import requests
+
+        return requests.get(url, **kwargs)
+    return _session.get(url, **kwargs)
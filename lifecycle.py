@@ -0,0 +1,117 @@
+import logging
+import os
+import signal
+import threading
+import time
+
+import history
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает срок остановки из окружения."""
+    global SHUTDOWN_TIMEOUT
+    SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', 25))
+
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Сигналы остановки и перезагрузки настроек.
+    Обработчики сигналов только выставляют флаги и будят основной
+    цикл, поэтому текущий опрос всегда доводится до конца. SIGTERM
+    и SIGINT запрашивают остановку, SIGHUP — перезагрузку настроек.
+    """
+
+    def __init__(self, shutdown_timeout=None, clock=time.monotonic):
+        """Задаёт время на завершение работы и часы."""
+        if shutdown_timeout is None:
+            shutdown_timeout = SHUTDOWN_TIMEOUT
+        self.shutdown_timeout = shutdown_timeout
+        self.clock = clock
+        self.stopping = False
+        self.stop_requested_at = None
+        self._reload = False
+        self._wakeup = threading.Event()
+        self._on_stop_callbacks = []
+
+    def install(self):
+        """Устанавливает обработчики сигналов в главном потоке."""
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self._on_reload)
+        return self
+
+    def _on_stop(self, signum, frame):
+        logger.info('Получен сигнал %s, бот завершает работу', signum)
+        self.request_stop()
+
+    def _on_reload(self, signum, frame):
+        logger.info('Получен сигнал %s, настройки будут перечитаны', signum)
+        self.request_reload()
+
+    def on_stop(self, callback):
+        """Регистрирует функцию, вызываемую при запросе остановки."""
+        self._on_stop_callbacks.append(callback)
+
+    def request_stop(self):
+        """Запрашивает остановку основного цикла."""
+        if not self.stopping:
+            self.stopping = True
+            self.stop_requested_at = self.clock()
+            for callback in self._on_stop_callbacks:
+                callback()
+        self._wakeup.set()
+
+    def request_reload(self):
+        """Запрашивает перезагрузку настроек."""
+        self._reload = True
+        self._wakeup.set()
+
+    def wake(self):
+        """Прерывает текущее ожидание без запроса остановки."""
+        self._wakeup.set()
+
+    @property
+    def reload_requested(self):
+        """Запрошена ли перезагрузка, ещё не взятая take_reload()."""
+        return self._reload
+
+    def take_reload(self):
+        """Возвращает True один раз на каждый запрос перезагрузки."""
+        if not self._reload:
+            return False
+        self._reload = False
+        return True
+
+    def wait(self, delay):
+        """Ждёт delay секунд или сигнала.
+        Возвращает True, если ожидание прервано сигналом.
+        """
+        interrupted = self._wakeup.wait(delay)
+        if not self.stopping:
+            self._wakeup.clear()
+        return interrupted
+
+    def remaining(self):
+        """Возвращает время, оставшееся до истечения shutdown_timeout."""
+        if self.stop_requested_at is None:
+            return self.shutdown_timeout
+        elapsed = self.clock() - self.stop_requested_at
+        return max(0.0, self.shutdown_timeout - elapsed)
+
+    def shutdown(self, outbox, store, executor=None):
+        """Завершает работу в пределах shutdown_timeout.
+        Останавливает пул запросов, отправляет накопившиеся сообщения
+        за оставшееся время, сохраняет курсоры подписчиков и
+        дописывает журнал изменений.
+        """
+        if executor is not None:
+            executor.shutdown()
+        outbox.stop(timeout=self.remaining())
+        store.close()
+        history.close()
+        print('Работа бота завершена!')
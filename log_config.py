@@ -0,0 +1,92 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает настройки журнала из окружения."""
+    global LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_QUEUE
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FILE = os.getenv('LOG_FILE', 'main.log')
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    LOG_QUEUE = os.getenv('LOG_QUEUE', 'true').lower() not in ('0', 'false')
+
+
+FILE_FORMAT = (
+    '%(asctime)s, %(levelname)s, %(message)s, %(funcName)s, %(lineno)s'
+)
+STREAM_FORMAT = '%(asctime)s, %(levelname)s, %(message)s,'
+
+_listener = None
+_handlers = []
+
+
+class LazyQueueHandler(QueueHandler):
+    """Кладёт запись в очередь без форматирования.
+    Подстановка аргументов в сообщение и запись в файл и stdout
+    выполняются в потоке QueueListener, а не в цикле опроса.
+    """
+
+    def prepare(self, record):
+        """Возвращает запись как есть."""
+        return record
+
+
+def setup_logging(level=None, filename=None, max_bytes=None, backup_count=None,
+                  use_queue=None):
+    """Настраивает журнал бота.
+    Журнал пишется в файл filename с ротацией по размеру и в stdout.
+    При use_queue обработчики работают в отдельном потоке, и вызов
+    logger.* в цикле опроса только кладёт запись в очередь.
+    Повторный вызов заменяет ранее установленные обработчики.
+    """
+    global _listener
+    level = LOG_LEVEL if level is None else level
+    filename = LOG_FILE if filename is None else filename
+    max_bytes = LOG_MAX_BYTES if max_bytes is None else max_bytes
+    backup_count = LOG_BACKUP_COUNT if backup_count is None else backup_count
+    use_queue = LOG_QUEUE if use_queue is None else use_queue
+    stop_logging()
+    file_handler = RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count,
+        encoding='utf-8', delay=True,
+    )
+    file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    stream_handler = logging.StreamHandler(stream=sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(STREAM_FORMAT))
+    root = logging.getLogger()
+    root.setLevel(level)
+    if use_queue:
+        records = queue.SimpleQueue()
+        _listener = QueueListener(records, file_handler, stream_handler)
+        _listener.start()
+        _handlers.append(LazyQueueHandler(records))
+    else:
+        _handlers.extend((file_handler, stream_handler))
+    for handler in _handlers:
+        root.addHandler(handler)
+
+
+def stop_logging():
+    """Дописывает очередь журнала и снимает установленные обработчики."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    root = logging.getLogger()
+    while _handlers:
+        handler = _handlers.pop()
+        root.removeHandler(handler)
+        handler.close()
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,237 @@
+import json
+import os
+import threading
+import time
+
+import settings
+from exceptions import EndpointError
+
+
+@settings.register
+def read_env():
+    """Читает адрес сервера метрик из окружения."""
+    global METRICS_PORT, METRICS_HOST
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+LAG_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+
+enabled = False
+_lock = threading.Lock()
+_metrics = []
+_gauges = {}
+
+
+class Counter:
+    """Счётчик с одной меткой."""
+
+    def __init__(self, name, documentation, label):
+        """Задаёт имя, описание и метку счётчика."""
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.values = {}
+        _metrics.append(self)
+
+    def inc(self, label_value, amount=1):
+        """Увеличивает значение счётчика для метки."""
+        with _lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        """Возвращает строки в текстовом формате Prometheus."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for label_value, value in sorted(self.values.items()):
+            yield f'{self.name}{{{self.label}="{label_value}"}} {value}'
+
+
+class Histogram:
+    """Гистограмма с необязательной меткой."""
+
+    def __init__(self, name, documentation, label=None,
+                 buckets=LATENCY_BUCKETS):
+        """Задаёт имя, описание, метку и границы корзин."""
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self.values = {}
+        _metrics.append(self)
+
+    def observe(self, value, label_value=''):
+        """Учитывает наблюдение в гистограмме."""
+        with _lock:
+            counts = self.values.get(label_value)
+            if counts is None:
+                counts = self.values[label_value] = [0] * len(self.buckets)
+                counts += [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def render(self):
+        """Возвращает строки в текстовом формате Prometheus."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for label_value, counts in sorted(self.values.items()):
+            labels = (
+                f'{self.label}="{label_value}",' if self.label else ''
+            )
+            for bound, count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket{{{labels}le="{bound}"}} {count}'
+            yield f'{self.name}_bucket{{{labels}le="+Inf"}} {counts[-1]}'
+            labels = labels.rstrip(',')
+            yield f'{self.name}_sum{{{labels}}} {counts[-2]}'
+            yield f'{self.name}_count{{{labels}}} {counts[-1]}'
+
+
+PRACTICUM_LATENCY = Histogram(
+    'homework_bot_practicum_request_seconds',
+    'Время запроса к API Практикума по исходу.',
+    'outcome',
+)
+TELEGRAM_LATENCY = Histogram(
+    'homework_bot_telegram_send_seconds',
+    'Время отправки сообщения в Telegram по исходу.',
+    'outcome',
+)
+STATUS_TRANSITIONS = Counter(
+    'homework_bot_status_transitions_total',
+    'Изменения статусов домашних работ.',
+    'status',
+)
+PUSH_EVENTS = Counter(
+    'homework_bot_push_events_total',
+    'События, присланные внешним источником, по исходу.',
+    'outcome',
+)
+ALERTS = Counter(
+    'homework_bot_alerts_total',
+    'Сообщения о сбоях: отправленные, подавленные и сводки.',
+    'outcome',
+)
+POLL_LAG = Histogram(
+    'homework_bot_poll_lag_seconds',
+    'Опоздание опроса относительно запланированного времени.',
+    buckets=LAG_BUCKETS,
+)
+
+
+def practicum_outcome(error):
+    """Определяет исход запроса к API по исключению."""
+    import requests
+
+    if error is None:
+        return 'ok'
+    if isinstance(error, EndpointError):
+        return 'non_200'
+    if isinstance(error, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return 'connection_error'
+    if isinstance(error, json.JSONDecodeError):
+        return 'json_decode'
+    if isinstance(error, requests.exceptions.RequestException):
+        return 'request_error'
+    return 'invalid_response'
+
+
+def record_practicum(started, error=None):
+    """Учитывает запрос к API, начатый в момент started."""
+    if enabled:
+        PRACTICUM_LATENCY.observe(
+            time.perf_counter() - started, practicum_outcome(error)
+        )
+
+
+def record_telegram(started, outcome):
+    """Учитывает отправку сообщения, начатую в момент started."""
+    if enabled:
+        TELEGRAM_LATENCY.observe(time.perf_counter() - started, outcome)
+
+
+def record_transition(status):
+    """Учитывает изменение статуса домашней работы."""
+    if enabled:
+        STATUS_TRANSITIONS.inc(status)
+
+
+def record_push(outcome):
+    """Учитывает событие, присланное внешним источником."""
+    if enabled:
+        PUSH_EVENTS.inc(outcome)
+
+
+def record_alert(outcome):
+    """Учитывает сообщение о сбое по исходу."""
+    if enabled:
+        ALERTS.inc(outcome)
+
+
+def record_lag(lag):
+    """Учитывает опоздание очередного опроса."""
+    if enabled:
+        POLL_LAG.observe(max(0.0, lag))
+
+
+def register_gauge(name, documentation, callback):
+    """Регистрирует показатель, значение которого читается при выдаче."""
+    _gauges[name] = (documentation, callback)
+
+
+def render():
+    """Возвращает все метрики в текстовом формате Prometheus."""
+    lines = []
+    with _lock:
+        for metric in _metrics:
+            lines.extend(metric.render())
+    for name, (documentation, callback) in sorted(_gauges.items()):
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {callback()}')
+    return '\n'.join(lines) + '\n'
+
+
+def start_server(port=None, host=None):
+    """Включает сбор метрик и запускает HTTP-сервер в отдельном потоке.
+    http.server импортируется только здесь: без METRICS_PORT он
+    не нужен и не замедляет запуск бота.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    global enabled
+    port = METRICS_PORT if port is None else port
+    host = METRICS_HOST if host is None else host
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Отдаёт метрики по адресу /metrics."""
+
+        def do_GET(self):
+            """Обрабатывает запрос метрик."""
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            """Не пишет запросы метрик в журнал."""
+
+    enabled = True
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True
+    )
+    thread.start()
+    return server
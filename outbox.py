@@ -0,0 +1,209 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import metrics
+import settings
+from bot_api import error_types
+
+
+@settings.register
+def read_env():
+    """Читает ограничения частоты отправки из окружения."""
+    global TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_INTERVAL
+    TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+    TELEGRAM_CHAT_INTERVAL = float(os.getenv('TELEGRAM_CHAT_INTERVAL', 1))
+
+
+TELEGRAM_MAX_LENGTH = 4096
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Очередь исходящих сообщений Telegram с отдельным потоком отправки.
+    Цикл опроса только кладёт сообщения в очередь и никогда не ждёт
+    Telegram. Поток отправки соблюдает ограничения на частоту сообщений
+    в один чат и в целом для бота, выжидает RetryAfter и объединяет
+    накопившиеся сообщения одного чата с одинаковой разметкой в одно.
+    """
+
+    def __init__(self, bot, global_rate=None, chat_interval=None,
+                 clock=time.monotonic):
+        """Задаёт отправителя, ограничения частоты и часы."""
+        if global_rate is None:
+            global_rate = TELEGRAM_GLOBAL_RATE
+        if chat_interval is None:
+            chat_interval = TELEGRAM_CHAT_INTERVAL
+        self.bot = bot
+        self.global_interval = 1 / global_rate
+        self.chat_interval = chat_interval
+        self.clock = clock
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.latencies = deque(maxlen=1000)
+        self._pending = OrderedDict()
+        self._chat_ready_at = {}
+        self._global_ready_at = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def depth(self):
+        """Число сообщений, ожидающих отправки."""
+        with self._condition:
+            return sum(len(queued) for queued in self._pending.values())
+
+    def stats(self):
+        """Возвращает показатели очереди для мониторинга."""
+        latencies = list(self.latencies)
+        return {
+            'depth': self.depth,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'latency_avg': (
+                sum(latencies) / len(latencies) if latencies else 0.0
+            ),
+            'latency_max': max(latencies, default=0.0),
+        }
+
+    def put(self, chat_id, message, parse_mode=None):
+        """Ставит сообщение в очередь, не дожидаясь отправки.
+        parse_mode передаётся в Telegram: None, 'HTML' или 'MarkdownV2'.
+        """
+        with self._condition:
+            self._pending.setdefault(chat_id, []).append(
+                (message, self.clock(), parse_mode)
+            )
+            self._condition.notify()
+
+    def process_once(self):
+        """Отправляет одно сообщение, если это позволяют ограничения.
+        Возвращает время в секундах, через которое стоит повторить
+        попытку, или None, если очередь пуста.
+        """
+        with self._condition:
+            chat_id, delay = self._next_ready()
+            if chat_id is None:
+                return delay
+            queued = self._pending.pop(chat_id)
+            text, enqueued_at, parse_mode = self._merge(queued)
+            if queued:
+                self._pending[chat_id] = queued
+                self._pending.move_to_end(chat_id, last=False)
+        self._send(chat_id, text, enqueued_at, parse_mode)
+        return 0
+
+    def _next_ready(self):
+        if not self._pending:
+            return None, None
+        now = self.clock()
+        ready_at = min(
+            self._chat_ready_at.get(chat_id, 0) for chat_id in self._pending
+        )
+        delay = max(ready_at, self._global_ready_at) - now
+        if delay > 0:
+            return None, delay
+        for chat_id in self._pending:
+            if self._chat_ready_at.get(chat_id, 0) <= now:
+                return chat_id, 0
+
+    @staticmethod
+    def _merge(queued):
+        """Забирает из очереди чата сообщения, умещающиеся в одно.
+        Одинаковые сообщения, например о недоступности API от разных
+        подписчиков одного чата, попадают в текст один раз. Сообщения
+        с разной разметкой не объединяются. Возвращает объединённый
+        текст, время постановки в очередь самого старого из них и
+        разметку.
+        """
+        messages = []
+        length = -2
+        _, enqueued_at, parse_mode = queued[0]
+        while queued:
+            message = queued[0][0]
+            if message in messages:
+                queued.pop(0)
+                continue
+            if queued[0][2] != parse_mode or messages and (
+                length + 2 + len(message) > TELEGRAM_MAX_LENGTH
+            ):
+                break
+            messages.append(message)
+            length += 2 + len(message)
+            queued.pop(0)
+        return '\n\n'.join(messages), enqueued_at, parse_mode
+
+    def _send(self, chat_id, text, enqueued_at, parse_mode=None):
+        RetryAfter, TelegramError = error_types(self.bot)
+        started = time.perf_counter()
+        options = {'parse_mode': parse_mode} if parse_mode else {}
+        try:
+            self.bot.send_message(chat_id, text, **options)
+        except RetryAfter as error:
+            metrics.record_telegram(started, 'retry_after')
+            self.retried += 1
+            logger.warning(
+                'Telegram просит подождать %s с', error.retry_after
+            )
+            with self._condition:
+                self._global_ready_at = self.clock() + error.retry_after
+                self._pending.setdefault(chat_id, []).insert(
+                    0, (text, enqueued_at, parse_mode)
+                )
+                self._pending.move_to_end(chat_id, last=False)
+            return
+        except TelegramError as error:
+            metrics.record_telegram(started, 'error')
+            self.failed += 1
+            logger.error(
+                'Сбой при отправке сообщения "%s" Telegram: %s', text, error
+            )
+        else:
+            metrics.record_telegram(started, 'ok')
+            self.sent += 1
+            self.latencies.append(self.clock() - enqueued_at)
+            logger.info('Сообщение "%s" отправлено в Telegram', text)
+        now = self.clock()
+        self._chat_ready_at[chat_id] = now + self.chat_interval
+        self._global_ready_at = max(
+            self._global_ready_at, now + self.global_interval
+        )
+
+    def run(self):
+        """Цикл потока отправки."""
+        while True:
+            delay = self.process_once()
+            if delay == 0:
+                continue
+            with self._condition:
+                if delay is None and self._pending:
+                    continue
+                if self._stopping and not self._pending:
+                    return
+                self._condition.wait(delay)
+
+    def start(self):
+        """Запускает поток отправки."""
+        self._thread = threading.Thread(
+            target=self.run, name='outbox', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Дожидается отправки очереди и останавливает поток."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(
+                    'Очередь отправки не опустела, не отправлено: %d',
+                    self.depth,
+                )
@@ -0,0 +1,103 @@
+import os
+import random
+import time
+from http import HTTPStatus
+
+import settings
+from exceptions import EndpointError, FetchTimeoutError
+
+
+@settings.register
+def read_env():
+    """Читает границы интервалов опроса из окружения."""
+    global POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_REVIEWING_INTERVAL
+    global POLL_IDLE_AFTER
+    POLL_MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 60))
+    POLL_MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', 3600))
+    POLL_REVIEWING_INTERVAL = float(os.getenv('POLL_REVIEWING_INTERVAL', 120))
+    POLL_IDLE_AFTER = float(os.getenv('POLL_IDLE_AFTER', 24 * 60 * 60))
+
+
+POLL_IDLE_FACTOR = 1.5
+POLL_BACKOFF_FACTOR = 2
+POLL_JITTER = 0.1
+
+
+def is_transient(error):
+    """Проверяет, что сбой временный и запрос стоит повторить позже.
+    Временными считаются таймауты, проблемы с сетью, ответы 5xx и 429.
+    """
+    import requests
+
+    if isinstance(error, EndpointError):
+        return (
+            error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or error.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        )
+    return isinstance(error, (
+        requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+        FetchTimeoutError,
+    ))
+
+
+class AdaptiveInterval:
+    """Вычисляет паузу до следующего опроса API.
+    Пока хотя бы одна работа на ревью, опрос учащается. После
+    временного сбоя пауза растёт экспоненциально. Если статусы
+    не меняются дольше idle_after секунд, пауза постепенно растёт.
+    Итоговая пауза получает случайный разброс и ограничивается
+    снизу и сверху.
+    """
+
+    __slots__ = (
+        'base', 'minimum', 'maximum', 'reviewing', 'idle_after', 'clock',
+        'random', 'failures', '_statuses', '_changed_at', '_idle_delay',
+    )
+
+    def __init__(self, base, minimum=None, maximum=None, reviewing=None,
+                 idle_after=None, clock=time.monotonic, random=random.random):
+        """Задаёт базовую паузу, её границы и часы."""
+        minimum = POLL_MIN_INTERVAL if minimum is None else minimum
+        maximum = POLL_MAX_INTERVAL if maximum is None else maximum
+        reviewing = POLL_REVIEWING_INTERVAL if reviewing is None else reviewing
+        idle_after = POLL_IDLE_AFTER if idle_after is None else idle_after
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.reviewing = reviewing
+        self.idle_after = idle_after
+        self.clock = clock
+        self.random = random
+        self.failures = 0
+        self._statuses = None
+        self._changed_at = clock()
+        self._idle_delay = base
+
+    def next_delay(self, statuses, error=None):
+        """Возвращает паузу в секундах по итогам очередного опроса.
+        statuses — последние известные статусы работ,
+        error — исключение, которым завершился опрос, или None.
+        """
+        if error is not None and is_transient(error):
+            self.failures += 1
+            delay = self.base * POLL_BACKOFF_FACTOR ** min(self.failures, 16)
+        else:
+            self.failures = 0
+            delay = self._delay_for(statuses)
+        delay *= 1 + POLL_JITTER * (2 * self.random() - 1)
+        return min(self.maximum, max(self.minimum, delay))
+
+    def _delay_for(self, statuses):
+        now = self.clock()
+        if statuses != self._statuses:
+            self._statuses = dict(statuses)
+            self._changed_at = now
+            self._idle_delay = self.base
+        if 'reviewing' in statuses.values():
+            return self.reviewing
+        if now - self._changed_at < self.idle_after:
+            return self.base
+        self._idle_delay = min(
+            self.maximum, self._idle_delay * POLL_IDLE_FACTOR
+        )
+        return self._idle_delay
@@ -0,0 +1,246 @@
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import metrics
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает настройки приёма событий из окружения."""
+    global PUSH_PORT, PUSH_HOST, PUSH_SECRET, PUSH_FILE, PUSH_FILE_INTERVAL
+    PUSH_PORT = int(os.getenv('PUSH_PORT', 0))
+    PUSH_HOST = os.getenv('PUSH_HOST', '127.0.0.1')
+    PUSH_SECRET = os.getenv('PUSH_SECRET', '')
+    PUSH_FILE = os.getenv('PUSH_FILE', '')
+    PUSH_FILE_INTERVAL = float(os.getenv('PUSH_FILE_INTERVAL', 1))
+
+
+PUSH_MAX_BODY = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class PushEvent(NamedTuple):
+    """Событие об изменении статусов, присланное внешним источником."""
+
+    chat_id: object
+    records: list
+
+
+class Inbox:
+    """Очередь событий от внешних источников.
+    Источники работают в своих потоках и только кладут проверенные
+    события в очередь и будят основной цикл; статусы, сообщения
+    и хранилище меняются только в основном цикле через drain().
+    """
+
+    def __init__(self, decode, wakeup=None):
+        """Задаёт разбор событий и функцию пробуждения цикла."""
+        self.decode = decode
+        self.wakeup = wakeup
+        self._events = deque()
+
+    def submit(self, raw):
+        """Проверяет событие в формате ответа API и ставит в очередь.
+        Событие — JSON-объект с ключом homeworks и необязательным
+        chat_id. При ошибке формата выбрасывает исключение.
+        """
+        try:
+            data = json.loads(raw)
+            records, _ = self.decode(data)
+        except Exception:
+            metrics.record_push('rejected')
+            raise
+        event = PushEvent(data.get('chat_id'), records)
+        self._events.append(event)
+        metrics.record_push('accepted')
+        if self.wakeup is not None:
+            self.wakeup()
+        return event
+
+    def drain(self):
+        """Забирает все накопившиеся события."""
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def __len__(self):
+        """Возвращает число событий в очереди."""
+        return len(self._events)
+
+
+def body_length(headers):
+    """Возвращает длину тела запроса из заголовка Content-Length.
+    Для нечислового или отрицательного значения выбрасывает ValueError.
+    """
+    value = headers.get('Content-Length') or '0'
+    if not value.strip().isdigit():
+        raise ValueError(f'Неверный заголовок Content-Length: {value}')
+    return int(value)
+
+
+def start_server(inbox, port=None, host=None, secret=None):
+    """Запускает HTTP-приёмник событий POST /events в отдельном потоке.
+    Если задан secret, запрос должен содержать его в заголовке
+    X-Push-Secret. Принятое событие подтверждается кодом 202.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    port = PUSH_PORT if port is None else port
+    host = PUSH_HOST if host is None else host
+    secret = PUSH_SECRET if secret is None else secret
+
+    class PushHandler(BaseHTTPRequestHandler):
+        """Принимает события по адресу /events."""
+
+        def do_POST(self):
+            """Обрабатывает присланное событие."""
+            if self.path != '/events':
+                self.reply(404, 'Неизвестный адрес')
+                return
+            given = self.headers.get('X-Push-Secret', '')
+            if secret and not hmac.compare_digest(given, secret):
+                self.reply(403, 'Неверный секрет')
+                return
+            try:
+                length = body_length(self.headers)
+                if length > PUSH_MAX_BODY:
+                    self.reply(413, 'Слишком большое событие')
+                    return
+                inbox.submit(self.rfile.read(length))
+            except Exception as error:
+                logger.warning('Отклонено событие: %s', error)
+                self.reply(400, str(error))
+                return
+            self.reply(202)
+
+        def reply(self, status, description=None):
+            """Отвечает JSON в формате {"ok": ..., "description": ...}."""
+            data = {'ok': description is None}
+            if description is not None:
+                data['description'] = description
+            body = json.dumps(data, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            """Не пишет запросы в журнал."""
+
+    server = ThreadingHTTPServer((host, port), PushHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, name='push', daemon=True
+    )
+    thread.start()
+    logger.info('Приём событий запущен на %s:%s', host, port)
+    return server
+
+
+class FileFollower(threading.Thread):
+    """Читает события из файла по одному JSON-объекту на строку.
+    Файл читается с конца, как tail -f: события, записанные до
+    запуска, уже учтены сверочным опросом API. Если при запуске
+    файла ещё нет, он читается с начала, когда появится.
+    Незавершённая строка ждёт следующей проверки.
+    """
+
+    def __init__(self, inbox, path, interval=None):
+        """Задаёт очередь, файл событий и интервал проверки."""
+        interval = PUSH_FILE_INTERVAL if interval is None else interval
+        super().__init__(name='push-file', daemon=True)
+        self.inbox = inbox
+        self.path = path
+        self.interval = interval
+        self.position = None
+        self._buffer = b''
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Проверяет файл каждые interval секунд до остановки."""
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Читает из файла строки, дописанные с прошлой проверки."""
+        try:
+            with open(self.path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                if self.position is None:
+                    self.position = size
+                elif size < self.position:
+                    self.position = 0
+                    self._buffer = b''
+                file.seek(self.position)
+                chunk = file.read()
+        except OSError as error:
+            if self.position is None and isinstance(error, FileNotFoundError):
+                self.position = 0
+            logger.warning('Файл событий %s недоступен: %s', self.path, error)
+            return
+        self.position += len(chunk)
+        *lines, self._buffer = (self._buffer + chunk).split(b'\n')
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self.inbox.submit(line)
+            except Exception as error:
+                logger.warning('Отклонено событие из файла: %s', error)
+
+    def stop(self):
+        """Останавливает чтение файла."""
+        self._stopped.set()
+
+
+def start(inbox, port=None, path=None):
+    """Запускает настроенные источники событий.
+    Возвращает функцию, останавливающую их.
+    """
+    port = PUSH_PORT if port is None else port
+    path = PUSH_FILE if path is None else path
+    server = start_server(inbox, port) if port else None
+    follower = None
+    if path:
+        follower = FileFollower(inbox, path)
+        follower.poll()
+        follower.start()
+
+    def stop():
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if follower is not None:
+            follower.stop()
+
+    return stop
+
+
+def wait_for_events(lifecycle, inbox, delay, handle, clock=time.monotonic,
+                    wait=None):
+    """Ждёт delay секунд, передавая события в handle по мере прихода.
+    Возвращается раньше срока при запросе остановки или перезагрузки.
+    Срок считается по часам clock, а ждёт функция wait(delay),
+    по умолчанию lifecycle.wait.
+    """
+    wait = lifecycle.wait if wait is None else wait
+    deadline = clock() + delay
+    while True:
+        wait(max(0.0, deadline - clock()))
+        events = inbox.drain()
+        if events:
+            handle(events)
+        if (
+            lifecycle.stopping or lifecycle.reload_requested
+            or clock() >= deadline
+        ):
+            return
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+import random
+import time
+
+import metrics
+
+
+class Scheduler:
+    """Планировщик опросов на двоичной куче сроков.
+    Каждый подписчик хранится в куче со своим временем следующего
+    опроса, поэтому постановка и перенос стоят O(log n), а выбор
+    очередного подписчика не требует обхода всего реестра. Устаревшие
+    записи кучи не удаляются сразу, а пропускаются при извлечении.
+    """
+
+    def __init__(self, clock=time.monotonic, random=random.random):
+        """Задаёт часы и источник случайных чисел."""
+        self.clock = clock
+        self.random = random
+        self.running = False
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """Возвращает число подписчиков в расписании."""
+        return len(self._entries)
+
+    def schedule(self, watcher, delay):
+        """Назначает опрос через delay секунд, отменяя прежний срок."""
+        seq = next(self._counter)
+        self._entries[watcher] = seq
+        heapq.heappush(self._heap, (self.clock() + delay, seq, watcher))
+
+    def add(self, watcher, spread):
+        """Добавляет подписчика со случайным сдвигом в пределах spread.
+        Сдвиг разносит первые запросы тысяч подписчиков по времени,
+        чтобы они не приходили в API в одну и ту же секунду.
+        """
+        self.schedule(watcher, spread * self.random())
+
+    def remove(self, watcher):
+        """Убирает подписчика из расписания."""
+        self._entries.pop(watcher, None)
+
+    def pop_due(self):
+        """Извлекает всех подписчиков, срок опроса которых наступил."""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, seq, watcher = heapq.heappop(self._heap)
+            if self._entries.get(watcher) == seq:
+                del self._entries[watcher]
+                due.append(watcher)
+                metrics.record_lag(now - due_at)
+        return due
+
+    def time_until_next(self):
+        """Возвращает время до ближайшего опроса или None."""
+        while self._heap:
+            due_at, seq, watcher = self._heap[0]
+            if self._entries.get(watcher) == seq:
+                return max(0, due_at - self.clock())
+            heapq.heappop(self._heap)
+        return None
+
+    def run(self, dispatch, sleep=time.sleep, idle=1):
+        """Передаёт наступившие опросы в dispatch до вызова stop().
+        dispatch получает подписчика и возвращает паузу до его
+        следующего опроса.
+        """
+        self.running = True
+        while self.running:
+            for watcher in self.pop_due():
+                self.schedule(watcher, dispatch(watcher))
+            delay = self.time_until_next()
+            sleep(idle if delay is None else min(delay, idle))
+
+    def run_batches(self, dispatch, sleep=time.sleep, idle=1):
+        """Передаёт наступившие опросы в dispatch пачками до stop().
+        dispatch получает список подписчиков и возвращает список
+        пауз до их следующих опросов в том же порядке.
+        """
+        self.running = True
+        while self.running:
+            due = self.pop_due()
+            if due:
+                for watcher, delay in zip(due, dispatch(due)):
+                    self.schedule(watcher, delay)
+            delay = self.time_until_next()
+            sleep(idle if delay is None else min(delay, idle))
+
+    def stop(self):
+        """Останавливает цикл run() после текущей итерации."""
+        self.running = False
@@ -0,0 +1,18 @@
+_readers = []
+
+
+def register(read_env):
+    """Регистрирует функцию чтения настроек модуля и сразу вызывает её.
+    Функция перечитывает переменные окружения в глобальные переменные
+    своего модуля, поэтому её можно вызвать повторно после того, как
+    окружение изменилось.
+    """
+    _readers.append(read_env)
+    read_env()
+    return read_env
+
+
+def reload():
+    """Перечитывает настройки всех модулей, например после load_dotenv()."""
+    for read_env in _readers:
+        read_env()
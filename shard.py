@@ -0,0 +1,363 @@
+import argparse
+import bisect
+import hashlib
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+import homework
+import settings
+import state
+import tenants
+from homework import logger
+from lifecycle import Lifecycle
+
+
+@settings.register
+def read_env():
+    """Читает настройки шардирования из окружения."""
+    global SHARD_DB, SHARD_WORKER_ID, SHARD_HEARTBEAT, SHARD_WORKER_TTL
+    global SHARD_VNODES
+    SHARD_DB = os.getenv('SHARD_DB', 'shards.db')
+    SHARD_WORKER_ID = os.getenv('SHARD_WORKER_ID', '')
+    SHARD_HEARTBEAT = float(os.getenv('SHARD_HEARTBEAT', 5))
+    SHARD_WORKER_TTL = float(os.getenv('SHARD_WORKER_TTL', 20))
+    SHARD_VNODES = int(os.getenv('SHARD_VNODES', 64))
+
+
+def ring_hash(value):
+    """Возвращает положение строки на кольце хэшей."""
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HashRing:
+    """Кольцо согласованного хэширования.
+    Каждый процесс занимает vnodes точек кольца, подписчик достаётся
+    владельцу ближайшей точки по часовой стрелке. При появлении или
+    уходе процесса переезжает примерно 1/N подписчиков, а не все.
+    """
+
+    def __init__(self, workers, vnodes=None):
+        """Расставляет точки процессов на кольце."""
+        vnodes = SHARD_VNODES if vnodes is None else vnodes
+        points = sorted(
+            (ring_hash(f'{worker}#{index}'), worker)
+            for worker in workers
+            for index in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._workers = [worker for _, worker in points]
+
+    def owner(self, key):
+        """Возвращает процесс, которому принадлежит ключ подписчика."""
+        if not self._workers:
+            return None
+        index = bisect.bisect(self._hashes, ring_hash(key))
+        return self._workers[index % len(self._workers)]
+
+
+class AssignmentTable:
+    """Таблица распределения подписчиков в базе SQLite.
+    Хранит живые процессы с временем последнего сигнала и версией
+    распределения, которую они применили, и само распределение.
+    Несколько процессов на одной машине или общем диске работают
+    с одним файлом без внешних сервисов.
+    """
+
+    def __init__(self, path=None):
+        """Открывает базу распределения и создаёт таблицы."""
+        path = SHARD_DB if path is None else path
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS shard_worker ('
+            ' worker TEXT PRIMARY KEY,'
+            ' heartbeat REAL NOT NULL,'
+            ' version INTEGER NOT NULL DEFAULT 0);'
+            'CREATE TABLE IF NOT EXISTS shard_assignment ('
+            ' tenant TEXT PRIMARY KEY,'
+            ' worker TEXT NOT NULL);'
+            'CREATE INDEX IF NOT EXISTS shard_assignment_worker'
+            ' ON shard_assignment (worker);'
+            'CREATE TABLE IF NOT EXISTS shard_meta ('
+            ' id INTEGER PRIMARY KEY CHECK (id = 0),'
+            ' version INTEGER NOT NULL);'
+            'INSERT OR IGNORE INTO shard_meta VALUES (0, 0);'
+        )
+
+    def heartbeat(self, worker, now):
+        """Отмечает, что процесс жив."""
+        self.connection.execute(
+            'INSERT INTO shard_worker (worker, heartbeat) VALUES (?, ?) '
+            'ON CONFLICT (worker) '
+            'DO UPDATE SET heartbeat = excluded.heartbeat',
+            (worker, now),
+        )
+
+    def ack(self, worker, version):
+        """Отмечает, что процесс применил версию распределения."""
+        self.connection.execute(
+            'UPDATE shard_worker SET version = ? WHERE worker = ?',
+            (version, worker),
+        )
+
+    def leave(self, worker):
+        """Убирает процесс из списка живых."""
+        self.connection.execute(
+            'DELETE FROM shard_worker WHERE worker = ?', (worker,)
+        )
+
+    def live_workers(self, since):
+        """Возвращает процессы, подававшие сигнал не раньше since."""
+        return [
+            worker for worker, in self.connection.execute(
+                'SELECT worker FROM shard_worker WHERE heartbeat >= ? '
+                'ORDER BY worker',
+                (since,),
+            )
+        ]
+
+    def settled(self, version, since):
+        """Применили ли версию распределения все живые процессы."""
+        behind, = self.connection.execute(
+            'SELECT COUNT(*) FROM shard_worker '
+            'WHERE heartbeat >= ? AND version < ?',
+            (since, version),
+        ).fetchone()
+        return behind == 0
+
+    def version(self):
+        """Возвращает номер текущей версии распределения."""
+        version, = self.connection.execute(
+            'SELECT version FROM shard_meta'
+        ).fetchone()
+        return version
+
+    def assignment(self):
+        """Возвращает распределение: ключ подписчика -> процесс."""
+        return dict(self.connection.execute(
+            'SELECT tenant, worker FROM shard_assignment'
+        ))
+
+    def assigned(self, worker):
+        """Возвращает ключи подписчиков, назначенных процессу."""
+        return {
+            tenant for tenant, in self.connection.execute(
+                'SELECT tenant FROM shard_assignment WHERE worker = ?',
+                (worker,),
+            )
+        }
+
+    def assign(self, assignment):
+        """Записывает новое распределение одной транзакцией.
+        Возвращает номер новой версии.
+        """
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute('DELETE FROM shard_assignment')
+            self.connection.executemany(
+                'INSERT INTO shard_assignment VALUES (?, ?)',
+                assignment.items(),
+            )
+            self.connection.execute(
+                'UPDATE shard_meta SET version = version + 1'
+            )
+        return self.version()
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+
+class Coordinator:
+    """Распределяет подписчиков между живыми процессами.
+    Пересчитывает распределение, когда меняется список живых
+    процессов или подписчиков, и записывает его новой версией.
+    """
+
+    def __init__(self, table, keys, ttl=None, vnodes=None, clock=time.time):
+        """Задаёт таблицу, источник ключей подписчиков и часы."""
+        ttl = SHARD_WORKER_TTL if ttl is None else ttl
+        vnodes = SHARD_VNODES if vnodes is None else vnodes
+        self.table = table
+        self.keys = keys
+        self.ttl = ttl
+        self.vnodes = vnodes
+        self.clock = clock
+
+    def rebalance(self):
+        """Обновляет распределение при необходимости.
+        Возвращает число подписчиков, сменивших процесс.
+        """
+        workers = self.table.live_workers(self.clock() - self.ttl)
+        ring = HashRing(workers, self.vnodes)
+        assignment = {key: ring.owner(key) for key in self.keys()}
+        if not workers:
+            assignment = {}
+        previous = self.table.assignment()
+        if assignment == previous:
+            return 0
+        moved = sum(
+            previous.get(key) != worker for key, worker in assignment.items()
+        )
+        version = self.table.assign(assignment)
+        logger.info(
+            'Распределение %d: процессов %d, подписчиков %d, переехало %d',
+            version, len(workers), len(assignment), moved,
+        )
+        return moved
+
+
+class ShardWorker:
+    """Участие процесса tenants.py в распределении подписчиков.
+    Подписчики передаются в два шага: сначала каждый процесс
+    сохраняет и отпускает тех, кто ему больше не назначен, и
+    подтверждает версию; новых подписчиков процесс берёт, только
+    когда версию подтвердили все живые процессы, поэтому состояние
+    переехавшего подписчика читается уже после его записи.
+    """
+
+    def __init__(self, table, worker_id=None, heartbeat=None, ttl=None,
+                 clock=time.time, load=tenants.load_registry):
+        """Задаёт таблицу, идентификатор процесса и интервалы."""
+        heartbeat = SHARD_HEARTBEAT if heartbeat is None else heartbeat
+        ttl = SHARD_WORKER_TTL if ttl is None else ttl
+        self.table = table
+        self.worker_id = worker_id or (
+            SHARD_WORKER_ID or f'{socket.gethostname()}:{os.getpid()}'
+        )
+        self.heartbeat = heartbeat
+        self.ttl = ttl
+        self.clock = clock
+        self.load = load
+        self.applied = None
+        self.pending = None
+        self._beat_at = None
+
+    def join(self):
+        """Сообщает о себе координатору."""
+        self._beat_at = self.clock()
+        self.table.heartbeat(self.worker_id, self._beat_at)
+
+    def sync(self, registry, scheduler, store):
+        """Подаёт сигнал и применяет изменения распределения.
+        Вызывается из цикла опроса; обращается к базе не чаще раза
+        в heartbeat секунд.
+        """
+        now = self.clock()
+        if self._beat_at is not None and now - self._beat_at < self.heartbeat:
+            return
+        self.join()
+        version = self.table.version()
+        if version != self.applied:
+            self.pending = self.table.assigned(self.worker_id)
+            self._release(registry, scheduler, store, self.pending)
+            self.table.ack(self.worker_id, version)
+            self.applied = version
+        if self.pending is not None and self.table.settled(
+            self.applied, now - self.ttl
+        ):
+            self._acquire(registry, scheduler, store, self.pending)
+            self.pending = None
+
+    def _release(self, registry, scheduler, store, keys):
+        released = [tenant for tenant in registry if tenant.key not in keys]
+        for tenant in released:
+            tenant.save(store)
+            registry.remove(tenant.token, tenant.chat_id)
+            scheduler.remove(tenant)
+        store.flush()
+        if released:
+            logger.info('Передано другим процессам: %d', len(released))
+
+    def _acquire(self, registry, scheduler, store, keys):
+        missing = keys - {tenant.key for tenant in registry}
+        if not missing:
+            return
+        store.refresh(missing)
+        acquired = 0
+        for tenant in self.load():
+            if tenant.key in missing:
+                tenant.restore(store)
+                registry.add(tenant)
+                scheduler.add(tenant, tenants.RETRY_TIME)
+                acquired += 1
+        logger.info('Получено от координатора: %d', acquired)
+
+    def leave(self):
+        """Уходит из распределения, чтобы подписчиков сразу передали."""
+        self.table.leave(self.worker_id)
+
+
+def registry_keys(path=None):
+    """Возвращает ключи подписчиков из файла реестра."""
+    path = tenants.TENANTS_FILE if path is None else path
+    return {tenant.key for tenant in tenants.load_registry(path)}
+
+
+def run_coordinator(table, lifecycle, interval=None):
+    """Пересчитывает распределение до запроса остановки."""
+    interval = SHARD_HEARTBEAT if interval is None else interval
+    coordinator = Coordinator(table, registry_keys)
+    while not lifecycle.stopping:
+        try:
+            coordinator.rebalance()
+        except Exception as error:
+            logger.error('Сбой координатора: %s', error)
+        lifecycle.wait(interval)
+
+
+def run_local(workers):
+    """Запускает координатор и workers процессов на этой машине."""
+    lifecycle = Lifecycle().install()
+    table = AssignmentTable()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), 'worker'],
+            env=dict(os.environ, SHARD_WORKER_ID=f'worker-{index}'),
+        )
+        for index in range(workers)
+    ]
+    try:
+        run_coordinator(table, lifecycle)
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait()
+        table.close()
+
+
+def main():
+    """Точка входа распределённого режима."""
+    parser = argparse.ArgumentParser(
+        description='Распределение подписчиков между процессами'
+    )
+    parser.add_argument('role', choices=['local', 'coordinator', 'worker'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    options = parser.parse_args()
+    if options.role == 'worker':
+        if not state.STATE_STORE.endswith(('.db', '.sqlite', '.sqlite3')):
+            logger.critical('Распределённому режиму нужно хранилище SQLite')
+            raise Exception('Распределённому режиму нужно хранилище SQLite')
+        tenants.main(ShardWorker(AssignmentTable()))
+    elif options.role == 'coordinator':
+        table = AssignmentTable()
+        try:
+            run_coordinator(table, Lifecycle().install())
+        finally:
+            table.close()
+    else:
+        run_local(options.workers)
+
+
+if __name__ == '__main__':
+    homework.init()
+    main()
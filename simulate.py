@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import alerts
+import breaker
+import homework
+import state
+import transport
+from homework import logger
+
+SIMULATION_TOKEN = 'simulation'
+
+
+def simulate(fetcher, deliverer, clock, store=None):
+    """Прогоняет homework.main() на подменённом транспорте.
+    Цикл опроса идёт по виртуальным часам clock до их отметки until,
+    предохранитель и подавление сбоев тоже считают виртуальное время.
+    Возвращает доставщик с отправленными сообщениями.
+    """
+    saved_breakers, saved_gate = dict(breaker._breakers), alerts.gate
+    saved_tokens = (
+        homework.PRACTICUM_TOKEN, homework.TELEGRAM_TOKEN,
+        homework.TELEGRAM_CHAT_ID,
+    )
+    breaker._breakers[homework.ENDPOINT] = breaker.CircuitBreaker(
+        clock=clock.monotonic
+    )
+    alerts.gate = alerts.AlertGate(clock=clock.monotonic)
+    homework.PRACTICUM_TOKEN = homework.PRACTICUM_TOKEN or SIMULATION_TOKEN
+    homework.TELEGRAM_TOKEN = homework.TELEGRAM_TOKEN or SIMULATION_TOKEN
+    homework.TELEGRAM_CHAT_ID = homework.TELEGRAM_CHAT_ID or SIMULATION_TOKEN
+    transport.configure(fetcher, deliverer, clock)
+    try:
+        homework.main(state.MemoryStateStore() if store is None else store)
+    finally:
+        transport.configure()
+        breaker._breakers.clear()
+        breaker._breakers.update(saved_breakers)
+        alerts.gate = saved_gate
+        (
+            homework.PRACTICUM_TOKEN, homework.TELEGRAM_TOKEN,
+            homework.TELEGRAM_CHAT_ID,
+        ) = saved_tokens
+    return deliverer
+
+
+def main():
+    """Проигрывает запись ответов API на виртуальных часах."""
+    parser = argparse.ArgumentParser(
+        description='Прогон бота по записи ответов API без ожидания'
+    )
+    parser.add_argument(
+        'recording', help='файл, записанный с TRANSPORT_RECORD',
+    )
+    parser.add_argument(
+        '--days', type=float, help='длительность прогона в днях; '
+        'по умолчанию — до конца записи',
+    )
+    parser.add_argument(
+        '--output', default='simulation.jsonl',
+        help='файл для отправленных сообщений',
+    )
+    options = parser.parse_args()
+    clock = transport.VirtualClock()
+    fetcher = transport.ReplayFetcher(options.recording, clock)
+    clock.now = start = fetcher.start or time.time()
+    clock.until = (
+        clock.now + options.days * 86400 if options.days
+        else fetcher.end or clock.now
+    )
+    started = time.perf_counter()
+    deliverer = simulate(
+        fetcher, transport.RecordingDeliverer(options.output, clock), clock
+    )
+    logger.info(
+        'Прогон %.1f сут. занял %.1f с, отправлено сообщений: %d',
+        (clock.now - start) / 86400,
+        time.perf_counter() - started, len(deliverer.sent),
+    )
+
+
+if __name__ == '__main__':
+    homework.init()
+    main()
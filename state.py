@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает расположение и интервал записи состояния из окружения."""
+    global STATE_STORE, STATE_FLUSH_INTERVAL
+    STATE_STORE = os.getenv('STATE_STORE', 'state.json')
+    STATE_FLUSH_INTERVAL = float(os.getenv('STATE_FLUSH_INTERVAL', 30))
+
+
+def tenant_key(token, chat_id):
+    """Возвращает ключ состояния подписчика.
+    Токен Практикума не сохраняется на диск в открытом виде,
+    в ключ попадает только начало его хэша.
+    """
+    digest = hashlib.sha256(str(token).encode()).hexdigest()[:16]
+    return f'{chat_id}:{digest}'
+
+
+class TenantState:
+    """Сохраняемое состояние подписчика: курсор и дедупликация."""
+
+    __slots__ = ('current_date', 'last_message', 'statuses')
+
+    def __init__(self, current_date=None, last_message='', statuses=None):
+        """Создаёт состояние подписчика."""
+        self.current_date = current_date
+        self.last_message = last_message
+        self.statuses = statuses or {}
+
+    def to_dict(self):
+        """Представление состояния для сериализации."""
+        return {
+            'current_date': self.current_date,
+            'last_message': self.last_message,
+            'statuses': self.statuses,
+        }
+
+
+class StateStore:
+    """Базовое хранилище состояния подписчиков.
+    Состояние держится в памяти, изменения накапливаются и
+    записываются пачкой не чаще раза в flush_interval секунд,
+    поэтому цикл опроса не ждёт синхронной записи на диск.
+    """
+
+    def __init__(self, flush_interval=None, clock=time.monotonic):
+        """Задаёт интервал записи и часы."""
+        if flush_interval is None:
+            flush_interval = STATE_FLUSH_INTERVAL
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._states = self._load_all()
+        self._dirty = set()
+        self._flushed_at = clock()
+
+    def get(self, key):
+        """Возвращает состояние подписчика, создавая пустое при отсутствии."""
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = TenantState()
+        return state
+
+    def update(self, key, **fields):
+        """Изменяет поля состояния подписчика и помечает его к записи."""
+        state = self.get(key)
+        for name, value in fields.items():
+            if getattr(state, name) != value:
+                setattr(state, name, value)
+                self._dirty.add(key)
+
+    def set_status(self, key, homework_name, status):
+        """Запоминает последний отправленный статус домашней работы."""
+        state = self.get(key)
+        if state.statuses.get(homework_name) != status:
+            state.statuses[homework_name] = status
+            self._dirty.add(key)
+
+    def maybe_flush(self):
+        """Записывает изменения, если с прошлой записи прошло достаточно."""
+        if self._dirty and (
+            self.clock() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Записывает все накопленные изменения."""
+        if self._dirty:
+            self._write({key: self._states[key] for key in self._dirty})
+            self._dirty.clear()
+        self._flushed_at = self.clock()
+
+    def close(self):
+        """Записывает изменения перед завершением работы."""
+        self.flush()
+
+    def refresh(self, keys):
+        """Перечитывает состояние подписчиков из хранилища.
+        Нужно, когда подписчик переходит от другого процесса, успевшего
+        записать более новое состояние. Несохранённые изменения этого
+        процесса не затираются.
+        """
+        keys = [key for key in keys if key not in self._dirty]
+        loaded = self._load(keys)
+        for key in keys:
+            self._states.pop(key, None)
+        self._states.update(loaded)
+
+    def _load_all(self):
+        return {}
+
+    def _load(self, keys):
+        return {}
+
+    def _write(self, changed):
+        pass
+
+
+class MemoryStateStore(StateStore):
+    """Хранилище без записи на диск, для тестов и отладки."""
+
+
+class FileStateStore(StateStore):
+    """Хранилище в JSON-файле.
+    Файл перезаписывается атомарно: данные пишутся во временный
+    файл в том же каталоге, который затем заменяет основной.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        """Читает состояние из JSON-файла path."""
+        path = STATE_STORE if path is None else path
+        self.path = path
+        super().__init__(**kwargs)
+
+    def _load_all(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        return {key: TenantState(**value) for key, value in data.items()}
+
+    def _load(self, keys):
+        states = self._load_all()
+        return {key: states[key] for key in keys if key in states}
+
+    def _write(self, changed):
+        data = {key: state.to_dict() for key, state in self._states.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class SQLiteStateStore(StateStore):
+    """Хранилище в базе SQLite.
+    Пачка изменений записывается одной транзакцией: статусы работ
+    подписчика заменяются целиком, поэтому удалённые из словаря
+    статусы не возвращаются после перезапуска. База открывается в
+    режиме WAL с ожиданием блокировки, чтобы с ней могли работать
+    несколько процессов распределённого режима.
+    """
+
+    def __init__(self, path, **kwargs):
+        """Открывает базу SQLite и создаёт таблицы."""
+        self.connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS tenant_state ('
+            ' tenant TEXT PRIMARY KEY,'
+            ' from_date INTEGER,'
+            " last_message TEXT NOT NULL DEFAULT '');"
+            'CREATE TABLE IF NOT EXISTS homework_status ('
+            ' tenant TEXT NOT NULL,'
+            ' homework_name TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' PRIMARY KEY (tenant, homework_name));'
+        )
+        super().__init__(**kwargs)
+
+    def _load_all(self):
+        return self._select('', ())
+
+    def _load(self, keys):
+        keys = list(keys)
+        states = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            states.update(self._select(
+                f' WHERE tenant IN ({", ".join("?" * len(chunk))})', chunk
+            ))
+        return states
+
+    def _select(self, where, parameters):
+        states = {
+            tenant: TenantState(current_date, last_message)
+            for tenant, current_date, last_message in self.connection.execute(
+                'SELECT tenant, from_date, last_message FROM tenant_state'
+                + where,
+                parameters,
+            )
+        }
+        for tenant, homework_name, status in self.connection.execute(
+            'SELECT tenant, homework_name, status FROM homework_status'
+            + where,
+            parameters,
+        ):
+            states.setdefault(tenant, TenantState()).statuses[
+                homework_name
+            ] = status
+        return states
+
+    def _write(self, changed):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO tenant_state '
+                'VALUES (?, ?, ?)',
+                [
+                    (key, state.current_date, state.last_message)
+                    for key, state in changed.items()
+                ],
+            )
+            self.connection.executemany(
+                'DELETE FROM homework_status WHERE tenant = ?',
+                [(key,) for key in changed],
+            )
+            self.connection.executemany(
+                'INSERT INTO homework_status VALUES (?, ?, ?)',
+                [
+                    (key, homework_name, status)
+                    for key, state in changed.items()
+                    for homework_name, status in state.statuses.items()
+                ],
+            )
+
+    def close(self):
+        """Записывает изменения и закрывает соединение с базой."""
+        super().close()
+        self.connection.close()
+
+
+def open_store(location=None, **kwargs):
+    """Открывает хранилище состояния по строке настройки.
+    ':memory:' — хранилище в памяти, файлы .db и .sqlite —
+    SQLite, остальные пути — JSON-файл.
+    """
+    location = STATE_STORE if location is None else location
+    if location == ':memory:':
+        return MemoryStateStore(**kwargs)
+    if location.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SQLiteStateStore(location, **kwargs)
+    return FileStateStore(location, **kwargs)
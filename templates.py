@@ -0,0 +1,251 @@
+import html
+import json
+import logging
+import os
+import string
+from functools import lru_cache
+
+import settings
+
+
+@settings.register
+def read_env():
+    """Читает язык, формат и каталог сообщений из окружения."""
+    global MESSAGE_LOCALE, MESSAGE_FORMAT, MESSAGE_CATALOG_FILE
+    global TEMPLATE_CACHE_SIZE
+    MESSAGE_LOCALE = os.getenv('MESSAGE_LOCALE', 'ru')
+    MESSAGE_FORMAT = os.getenv('MESSAGE_FORMAT', 'plain')
+    MESSAGE_CATALOG_FILE = os.getenv('MESSAGE_CATALOG_FILE', 'messages.json')
+    TEMPLATE_CACHE_SIZE = int(os.getenv('TEMPLATE_CACHE_SIZE', 65536))
+
+
+DEFAULT_LOCALE = 'ru'
+
+logger = logging.getLogger(__name__)
+
+CATALOGS = {
+    'ru': {
+        'status_changed': (
+            'Изменился статус проверки работы "{homework_name}". {verdict}'
+        ),
+        'status_changed:html': (
+            'Изменился статус проверки работы <b>{homework_name}</b>. '
+            '{verdict}'
+        ),
+        'status_changed:markdown': (
+            'Изменился статус проверки работы *{homework_name}*\\. {verdict}'
+        ),
+        'no_changes': 'Изменений нет',
+        'failure': 'Сбой в работе программы: {error}',
+        'outage': (
+            'API Практикума недоступен, проверка статусов приостановлена '
+            'до его восстановления'
+        ),
+        'digest': 'Повторяющиеся сбои за {minutes} мин.: {items}',
+        'error_classes': {
+            'timeout': 'время ожидания истекло',
+            'connection_error': 'проблемы с сетью',
+            'non_200': 'эндпоинт недоступен',
+            'json_decode': 'ответ не в формате JSON',
+            'request_error': 'сбой при запросе',
+            'invalid_response': 'некорректный ответ API',
+            'circuit_open': 'API отключён предохранителем',
+        },
+        'verdicts': {},
+    },
+    'en': {
+        'status_changed': (
+            'The review status of "{homework_name}" has changed. {verdict}'
+        ),
+        'status_changed:html': (
+            'The review status of <b>{homework_name}</b> has changed. '
+            '{verdict}'
+        ),
+        'status_changed:markdown': (
+            'The review status of *{homework_name}* has changed\\. {verdict}'
+        ),
+        'no_changes': 'No changes',
+        'failure': 'The bot has failed: {error}',
+        'outage': (
+            'The Practicum API is unavailable, status checks are paused '
+            'until it recovers'
+        ),
+        'digest': 'Repeated failures in the last {minutes} min: {items}',
+        'error_classes': {
+            'timeout': 'timeouts',
+            'connection_error': 'network errors',
+            'non_200': 'endpoint errors',
+            'json_decode': 'non-JSON responses',
+            'request_error': 'request errors',
+            'invalid_response': 'invalid API responses',
+            'circuit_open': 'circuit breaker open',
+        },
+        'verdicts': {
+            'approved': 'The reviewer liked everything. Hooray!',
+            'reviewing': 'The reviewer has started reviewing the work.',
+            'rejected': 'The reviewer has left some comments.',
+        },
+    },
+}
+MARKDOWN_SPECIAL = '_*[]()~`>#+-=|{}.!\\'
+MARKDOWN_ESCAPES = str.maketrans(
+    {char: f'\\{char}' for char in MARKDOWN_SPECIAL}
+)
+ESCAPES = {
+    'plain': str,
+    'html': lambda text: html.escape(text, quote=False),
+    'markdown': lambda text: text.translate(MARKDOWN_ESCAPES),
+}
+PARSE_MODES = {'plain': None, 'html': 'HTML', 'markdown': 'MarkdownV2'}
+
+
+class Template:
+    """Шаблон сообщения, разобранный на части один раз.
+    Постоянные подстановки (например, текст вердикта) и экранирование
+    текста шаблона выполняются при компиляции, поэтому при выводе
+    остаётся склеить готовые куски с экранированными значениями.
+    """
+
+    __slots__ = ('parts', 'escape')
+
+    def __init__(self, source, escape, markup=False, **constants):
+        """Разбирает шаблон и выполняет постоянные подстановки."""
+        self.escape = escape
+        self.parts = []
+        literal = ''
+        for text, field, _, _ in string.Formatter().parse(source):
+            literal += text if markup else escape(text)
+            if field is None:
+                continue
+            if field in constants:
+                literal += escape(str(constants[field]))
+                continue
+            self.parts.append(literal)
+            self.parts.append(field)
+            literal = ''
+        self.parts.append(literal)
+
+    def render(self, **values):
+        """Подставляет значения полей в шаблон."""
+        parts = self.parts
+        if len(parts) == 1:
+            return parts[0]
+        if len(parts) == 3:
+            return parts[0] + self.escape(str(values[parts[1]])) + parts[2]
+        chunks = []
+        for index, part in enumerate(parts):
+            chunks.append(
+                self.escape(str(values[part])) if index % 2 else part
+            )
+        return ''.join(chunks)
+
+
+class Renderer:
+    """Шаблоны сообщений одного языка и формата, скомпилированные сразу.
+    Недостающие в каталоге языка тексты берутся из русского каталога.
+    """
+
+    def __init__(self, locale, markup):
+        """Компилирует все шаблоны языка и формата разметки markup."""
+        if markup not in ESCAPES:
+            logger.warning('Неизвестный формат сообщений: %s', markup)
+            markup = 'plain'
+        catalog = dict(CATALOGS[DEFAULT_LOCALE])
+        catalog.update(CATALOGS.get(locale, {}))
+        verdicts = dict(CATALOGS[DEFAULT_LOCALE]['verdicts'])
+        verdicts.update(catalog['verdicts'])
+        self.locale = locale
+        self.markup = markup
+        self.parse_mode = PARSE_MODES[markup]
+        escape = ESCAPES[markup]
+
+        def build(name, **constants):
+            variant = f'{name}:{markup}'
+            if markup != 'plain' and variant in catalog:
+                return Template(catalog[variant], escape, True, **constants)
+            return Template(catalog[name], escape, **constants)
+
+        self.statuses = {
+            status: build('status_changed', verdict=verdict)
+            for status, verdict in verdicts.items()
+        }
+        self.no_changes = build('no_changes').render()
+        self.outage = build('outage').render()
+        self._failure = build('failure')
+        self._digest = build('digest')
+        self.error_classes = dict(
+            CATALOGS[DEFAULT_LOCALE]['error_classes'],
+            **catalog['error_classes'],
+        )
+
+    def status(self, homework_name, status):
+        """Возвращает уведомление об изменении статуса работы."""
+        return render_status(self.locale, self.markup, status, homework_name)
+
+    def failure(self, error):
+        """Возвращает сообщение о сбое."""
+        return self._failure.render(error=error)
+
+    def digest(self, counts, seconds):
+        """Возвращает сводку подавленных сбоев.
+        counts — словарь класс сбоя -> число повторов за seconds секунд.
+        """
+        items = ', '.join(
+            f'{self.error_classes.get(name, name)} — {count}'
+            for name, count in sorted(
+                counts.items(), key=lambda item: (-item[1], item[0])
+            )
+        )
+        return self._digest.render(minutes=round(seconds / 60), items=items)
+
+
+def renderer(locale=None, markup=None):
+    """Возвращает скомпилированные шаблоны для языка и формата.
+    По умолчанию — язык MESSAGE_LOCALE и формат MESSAGE_FORMAT.
+    """
+    return _renderer(
+        MESSAGE_LOCALE if locale is None else locale,
+        MESSAGE_FORMAT if markup is None else markup,
+    )
+
+
+@lru_cache(maxsize=None)
+def _renderer(locale, markup):
+    return Renderer(locale, markup)
+
+
+def _render_status(locale, markup, status, homework_name):
+    """Выводит уведомление о статусе с кэшем по работе.
+    Повторное уведомление о той же работе возвращает уже готовую
+    строку без новых выделений памяти.
+    """
+    return renderer(locale, markup).statuses[status].render(
+        homework_name=homework_name
+    )
+
+
+render_status = lru_cache(maxsize=TEMPLATE_CACHE_SIZE)(_render_status)
+
+
+def read_catalogs(path=None):
+    """Читает дополнительные каталоги сообщений из JSON-файла.
+    Файл содержит объект {"язык": {"ключ": "текст", ...}, ...}
+    с теми же ключами, что и встроенные каталоги.
+    """
+    path = MESSAGE_CATALOG_FILE if path is None else path
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def configure(verdicts, catalogs=None):
+    """Задаёт русские вердикты и каталоги и сбрасывает кэши шаблонов.
+    Кэш уведомлений создаётся заново с размером TEMPLATE_CACHE_SIZE.
+    """
+    global render_status
+    for locale, catalog in (catalogs or {}).items():
+        CATALOGS.setdefault(locale, {'verdicts': {}}).update(catalog)
+    CATALOGS[DEFAULT_LOCALE]['verdicts'] = dict(verdicts)
+    _renderer.cache_clear()
+    render_status = lru_cache(maxsize=TEMPLATE_CACHE_SIZE)(_render_status)
@@ -0,0 +1,394 @@
+import functools
+import json
+import os
+import time
+
+import alerts
+import fetch_pool
+import history
+import homework
+import http_pool
+import metrics
+import settings
+import state
+import templates
+import transport
+from fetch_pool import FetchExecutor
+from homework import (RETRY_TIME, decode_response, describe_poll, gate_alert,
+                      logger, make_headers, poll_records, push_message)
+from lifecycle import Lifecycle
+from polling import AdaptiveInterval
+from push import Inbox, start as start_push, wait_for_events
+from scheduler import Scheduler
+
+
+@settings.register
+def read_env():
+    """Читает путь к реестру подписчиков из окружения."""
+    global TENANTS_FILE
+    TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+
+
+class Tenant:
+    """Подписчик бота: токен Практикума, чат и курсор from_date.
+    Хранит только собственное состояние, поэтому память на одного
+    подписчика — несколько ссылок, а не отдельный процесс.
+    """
+
+    __slots__ = (
+        'token', 'chat_id', 'from_date', 'headers', 'last_message',
+        'statuses', 'key', 'interval', 'locale', 'markup',
+    )
+
+    def __init__(self, token, chat_id, from_date=None, locale=None,
+                 markup=None):
+        """Создаёт подписчика с курсором, языком и форматом."""
+        self.token = token
+        self.chat_id = chat_id
+        self.locale = locale or templates.MESSAGE_LOCALE
+        self.markup = markup or templates.MESSAGE_FORMAT
+        self.from_date = from_date or int(transport.now())
+        self.headers = make_headers(token)
+        self.last_message = ''
+        self.statuses = {}
+        self.key = state.tenant_key(token, chat_id)
+        self.interval = AdaptiveInterval(
+            RETRY_TIME, clock=transport.monotonic
+        )
+
+    @property
+    def renderer(self):
+        """Шаблоны сообщений на языке и в формате подписчика."""
+        return templates.renderer(self.locale, self.markup)
+
+    def remember(self, message):
+        """Запоминает сообщение, если оно отличается от предыдущего.
+        Возвращает True, когда сообщение нужно отправить.
+        """
+        if message == self.last_message:
+            return False
+        self.last_message = message
+        return True
+
+    def restore(self, store):
+        """Восстанавливает курсор и дедупликацию из хранилища.
+        Если в хранилище подписчика нет, они берутся из журнала
+        изменений.
+        """
+        saved = store.get(self.key)
+        self.last_message = saved.last_message
+        self.statuses = dict(saved.statuses)
+        if saved.current_date:
+            self.from_date = saved.current_date
+            return
+        current_date, statuses = history.restore(self.key)
+        if current_date:
+            self.from_date = current_date
+            self.statuses = statuses
+
+    def save(self, store):
+        """Передаёт курсор и последнее сообщение в хранилище."""
+        store.update(
+            self.key,
+            current_date=self.from_date,
+            last_message=self.last_message,
+            statuses=dict(self.statuses),
+        )
+
+    def __repr__(self):
+        """Возвращает описание подписчика без токена."""
+        return f'Tenant(chat_id={self.chat_id!r}, from_date={self.from_date})'
+
+
+class TenantRegistry:
+    """Реестр подписчиков, опрашиваемых одним процессом."""
+
+    def __init__(self, tenants=()):
+        """Создаёт реестр из подписчиков tenants."""
+        self._tenants = {}
+        self._by_chat = {}
+        for tenant in tenants:
+            self.add(tenant)
+
+    def add(self, tenant):
+        """Добавляет подписчика, заменяя прежнего с тем же токеном и чатом."""
+        key = (tenant.token, tenant.chat_id)
+        self._tenants[key] = tenant
+        self._by_chat.setdefault(str(tenant.chat_id), {})[key] = tenant
+
+    def remove(self, token, chat_id):
+        """Удаляет подписчика из реестра."""
+        self._tenants.pop((token, chat_id), None)
+        chat = self._by_chat.get(str(chat_id), {})
+        chat.pop((token, chat_id), None)
+        if not chat:
+            self._by_chat.pop(str(chat_id), None)
+
+    def for_chat(self, chat_id):
+        """Возвращает подписчиков, уведомления которых идут в чат."""
+        return list(self._by_chat.get(str(chat_id), {}).values())
+
+    def __iter__(self):
+        """Перебирает копию списка подписчиков."""
+        return iter(list(self._tenants.values()))
+
+    def __len__(self):
+        """Возвращает число подписчиков."""
+        return len(self._tenants)
+
+    @classmethod
+    def load(cls, path=None):
+        """Загружает реестр из JSON-файла.
+        Файл содержит список объектов с ключами practicum_token,
+        chat_id и необязательными from_date, locale (язык сообщений)
+        и format (plain, markdown или html).
+        """
+        path = TENANTS_FILE if path is None else path
+        with open(path, encoding='utf-8') as file:
+            entries = json.load(file)
+        return cls(
+            Tenant(
+                entry['practicum_token'],
+                entry['chat_id'],
+                entry.get('from_date'),
+                entry.get('locale'),
+                entry.get('format'),
+            )
+            for entry in entries
+        )
+
+
+def load_registry(path=None):
+    """Загружает реестр подписчиков.
+    Если файла с подписчиками нет, единственным подписчиком
+    становится владелец PRACTICUM_TOKEN и TELEGRAM_CHAT_ID.
+    """
+    path = TENANTS_FILE if path is None else path
+    if os.path.exists(path):
+        return TenantRegistry.load(path)
+    if not (homework.PRACTICUM_TOKEN and homework.TELEGRAM_CHAT_ID):
+        logger.critical('Не найден файл подписчиков %s', path)
+        raise Exception(f'Не найден файл подписчиков {path}')
+    return TenantRegistry(
+        [Tenant(homework.PRACTICUM_TOKEN, homework.TELEGRAM_CHAT_ID)]
+    )
+
+
+def reload_registry(registry, scheduler, store, path=None):
+    """Применяет изменившийся список подписчиков без перезапуска.
+    Новые подписчики восстанавливаются из хранилища и опрашиваются
+    сразу, удалённые сохраняются, снимаются с расписания и забываются
+    подавлением сбоев. Состояние оставшихся подписчиков не меняется.
+    """
+    path = TENANTS_FILE if path is None else path
+    try:
+        loaded = load_registry(path)
+    except Exception as error:
+        logger.error('Список подписчиков не перечитан: %s', error)
+        return
+    fresh = {(tenant.token, tenant.chat_id): tenant for tenant in loaded}
+    for tenant in registry:
+        if (tenant.token, tenant.chat_id) not in fresh:
+            tenant.save(store)
+            registry.remove(tenant.token, tenant.chat_id)
+            scheduler.remove(tenant)
+            alerts.gate.forget(tenant.key)
+    current = {(tenant.token, tenant.chat_id) for tenant in registry}
+    for key, tenant in fresh.items():
+        if key not in current:
+            tenant.restore(store)
+            registry.add(tenant)
+            scheduler.schedule(tenant, 0)
+    logger.info('Подписчиков после перезагрузки: %d', len(registry))
+
+
+def start_metrics(outbox, scheduler=None):
+    """Запускает сервер метрик, если задан METRICS_PORT."""
+    if not metrics.METRICS_PORT:
+        return
+    metrics.register_gauge(
+        'homework_bot_outbox_depth',
+        'Сообщения в очереди отправки.',
+        lambda: outbox.depth,
+    )
+    if scheduler is not None:
+        metrics.register_gauge(
+            'homework_bot_scheduled_tenants',
+            'Подписчики в расписании опросов.',
+            lambda: len(scheduler),
+        )
+    metrics.start_server()
+
+
+def poll_tenant(tenant):
+    """Опрашивает API от имени подписчика.
+    Обновляет курсор подписчика и возвращает текст сообщения,
+    если он отличается от последнего отправленного (иначе None),
+    и паузу до следующего опроса.
+    """
+    return apply_poll(tenant, *poll_records(tenant.from_date, tenant.headers))
+
+
+def apply_poll(tenant, records, from_date, error):
+    """Применяет результат poll_records к состоянию подписчика.
+    Возвращает то же, что и poll_tenant.
+    """
+    tenant.from_date = from_date
+    before = history.snapshot(tenant.statuses)
+    message = describe_poll(records, error, tenant.statuses, tenant.renderer)
+    history.record(tenant.key, before, tenant.statuses, from_date)
+    delay = tenant.interval.next_delay(tenant.statuses, error)
+    message, digest = gate_alert(tenant.key, message, error, tenant.renderer)
+    if message is not None and not tenant.remember(message) and (
+        error is None
+    ):
+        message = None
+    if digest is not None:
+        message = digest if message is None else f'{message}\n\n{digest}'
+    return message, delay
+
+
+def apply_push(registry, events, outbox, store):
+    """Отправляет изменения из событий подписчикам их чатов.
+    Событие без chat_id в многопользовательском режиме отбрасывается:
+    по нему нельзя понять, чьи это работы.
+    """
+    for event in events:
+        if event.chat_id is None:
+            logger.warning('Событие без chat_id отброшено')
+            continue
+        for tenant in registry.for_chat(event.chat_id):
+            before = history.snapshot(tenant.statuses)
+            message = push_message(
+                event.records, tenant.statuses, tenant.renderer
+            )
+            history.record(tenant.key, before, tenant.statuses)
+            if message is not None and tenant.remember(message):
+                outbox.put(tenant.chat_id, message, tenant.renderer.parse_mode)
+            tenant.save(store)
+    store.maybe_flush()
+    history.maybe_flush()
+
+
+def run(registry, outbox, store, retry_time=RETRY_TIME, scheduler=None,
+        executor=None, sleep=time.sleep):
+    """Опрашивает подписчиков реестра по расписанию.
+    Первые опросы равномерно разнесены по окну retry_time, дальше
+    каждый подписчик опрашивается со своей адаптивной паузой.
+    Если передан executor, запросы всех подписчиков, чей срок
+    наступил, выполняются параллельно в его пуле потоков.
+    """
+    if scheduler is None:
+        scheduler = Scheduler(clock=transport.monotonic)
+    start_metrics(outbox, scheduler)
+    for tenant in registry:
+        scheduler.add(tenant, retry_time)
+
+    def deliver(tenant, message):
+        if message is not None:
+            outbox.put(tenant.chat_id, message, tenant.renderer.parse_mode)
+        tenant.save(store)
+
+    def dispatch(tenant):
+        message, delay = poll_tenant(tenant)
+        deliver(tenant, message)
+        store.maybe_flush()
+        history.maybe_flush()
+        return delay
+
+    def dispatch_batch(tenants):
+        results = executor.map(
+            [(tenant.from_date, tenant.headers) for tenant in tenants],
+            [tenant.key for tenant in tenants],
+        )
+        delays = []
+        for tenant, result in zip(tenants, results):
+            message, delay = apply_poll(tenant, *result)
+            deliver(tenant, message)
+            delays.append(delay)
+        store.maybe_flush()
+        history.maybe_flush()
+        return delays
+
+    if executor is None:
+        scheduler.run(dispatch, sleep)
+    else:
+        scheduler.run_batches(dispatch_batch, sleep)
+
+
+def make_sleep(lifecycle, inbox, registry, scheduler, outbox, store,
+               shard=None):
+    """Возвращает функцию паузы для цикла опроса.
+    Во время паузы обрабатываются присланные события, запросы
+    перезагрузки настроек и изменения распределения подписчиков.
+    """
+    def handle_push(events):
+        apply_push(registry, events, outbox, store)
+
+    def sleep(delay):
+        wait_for_events(
+            lifecycle, inbox, delay, handle_push, clock=transport.monotonic,
+            wait=functools.partial(transport.wait, lifecycle),
+        )
+        if lifecycle.take_reload():
+            homework.reload_settings(outbox)
+            if shard is None:
+                reload_registry(registry, scheduler, store)
+        if shard is not None:
+            shard.sync(registry, scheduler, store)
+
+    return sleep
+
+
+def main(shard=None):
+    """Многопользовательский режим работы бота.
+    С shard процесс опрашивает только назначенных ему подписчиков
+    и получает их от координатора, а не из файла реестра.
+    """
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical('Отсутствует переменная окружения TELEGRAM_TOKEN')
+        raise Exception('Отсутствует переменная окружения TELEGRAM_TOKEN')
+    registry = load_registry() if shard is None else TenantRegistry()
+    logger.info('Загружено подписчиков: %d', len(registry))
+    lifecycle = Lifecycle().install()
+    outbox = transport.make_outbox(homework.TELEGRAM_TOKEN)
+    outbox.start()
+    executor = None
+    if fetch_pool.FETCH_WORKERS:
+        executor = FetchExecutor(poll_records)
+    http_pool.configure(
+        pool_size=max(http_pool.HTTP_POOL_SIZE, fetch_pool.FETCH_WORKERS)
+    )
+    store = state.open_store()
+    history.open_log(clock=transport.now)
+    for tenant in registry:
+        tenant.restore(store)
+    scheduler = Scheduler(clock=transport.monotonic)
+    inbox = Inbox(decode_response.decode, lifecycle.wake)
+    stop_push = start_push(inbox)
+
+    def stop_polling():
+        scheduler.stop()
+        if executor is not None:
+            executor.task_timeout = min(
+                executor.task_timeout, lifecycle.shutdown_timeout / 2
+            )
+
+    lifecycle.on_stop(stop_polling)
+    try:
+        run(
+            registry, outbox, store, scheduler=scheduler, executor=executor,
+            sleep=make_sleep(
+                lifecycle, inbox, registry, scheduler, outbox, store, shard
+            ),
+        )
+    finally:
+        stop_push()
+        lifecycle.shutdown(outbox, store, executor)
+        if shard is not None:
+            shard.leave()
+
+
+if __name__ == '__main__':
+    homework.init()
+    main()
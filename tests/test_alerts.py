@@ -0,0 +1,162 @@
+from http import HTTPStatus
+
+import requests
+
+from utils import FakeClock, MockResponse
+
+
+class TestAlerts:
+
+    def test_fingerprint_ignores_details(self):
+        import alerts
+        from exceptions import (CircuitOpenError, EndpointError,
+                                FetchTimeoutError)
+
+        assert alerts.fingerprint(EndpointError(HTTPStatus.BAD_GATEWAY)) == (
+            alerts.fingerprint(EndpointError(HTTPStatus.SERVICE_UNAVAILABLE))
+        ), 'Коды ответа не должны менять класс сбоя'
+        assert alerts.fingerprint(requests.exceptions.ReadTimeout()) == (
+            alerts.fingerprint(FetchTimeoutError(10))
+        ) == 'timeout'
+        assert alerts.fingerprint(CircuitOpenError(30)) == 'circuit_open'
+        assert alerts.fingerprint(KeyError('homeworks')) == (
+            'invalid_response'
+        )
+
+    def test_repeats_are_suppressed_and_digested(self):
+        import alerts
+        import templates
+        from exceptions import EndpointError
+
+        clock = FakeClock()
+        gate = alerts.AlertGate(window=600, digest_interval=3600, clock=clock)
+        renderer = templates.renderer('ru', 'plain')
+        assert gate.allow('a', EndpointError(HTTPStatus.BAD_GATEWAY))
+        assert gate.allow('b', EndpointError(HTTPStatus.BAD_GATEWAY)), (
+            'Подписчики должны получать сообщения о сбоях независимо'
+        )
+        assert gate.allow('a', requests.exceptions.ReadTimeout()), (
+            'Сбой нового класса должен сообщаться сразу'
+        )
+        for second in range(1, 12):
+            clock.now = second
+            assert not gate.allow(
+                'a', EndpointError(500 + second)
+            ), 'Повтор сбоя в пределах окна должен подавляться'
+        assert not gate.allow('a', requests.exceptions.ReadTimeout())
+        assert gate.digest('a', renderer) is None, (
+            'Сводка не должна приходить раньше срока'
+        )
+        clock.now = 3601
+        assert gate.digest('a', renderer) == (
+            'Повторяющиеся сбои за 60 мин.: эндпоинт недоступен — 11, '
+            'время ожидания истекло — 1'
+        )
+        assert gate.digest('a', renderer) is None, (
+            'После сводки счётчики должны обнуляться'
+        )
+        assert gate.allow('a', EndpointError(HTTPStatus.BAD_GATEWAY)), (
+            'По истечении окна сбой должен сообщаться снова'
+        )
+
+    def test_flapping_api_sends_one_failure(self, monkeypatch):
+        import alerts
+        import breaker
+        import homework
+        import tenants
+
+        clock = FakeClock()
+        monkeypatch.setattr(alerts, 'gate', alerts.AlertGate(
+            window=3600, digest_interval=3600, clock=clock
+        ))
+        monkeypatch.setattr(breaker, '_breakers', {
+            homework.ENDPOINT: breaker.CircuitBreaker(failure_threshold=100),
+        })
+        codes = iter([502, 503, 504, 502] * 3)
+
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse(status_code=next(codes)),
+        )
+        tenant = tenants.Tenant('flapping', 1, from_date=1)
+        sent = []
+        for second in range(12):
+            clock.now = second
+            message, _ = tenants.poll_tenant(tenant)
+            if message is not None:
+                sent.append(message)
+        assert len(sent) == 1, (
+            'Повторяющиеся сбои должны давать одно сообщение, а не '
+            f'сообщение на каждый опрос: {sent}'
+        )
+        clock.now = 3700
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockResponse(
+                status_code=HTTPStatus.BAD_GATEWAY
+            ),
+        )
+        message, _ = tenants.poll_tenant(tenant)
+        assert message == (
+            'Сбой в работе программы: Эндпоинт недоступен: 502\n\n'
+            'Повторяющиеся сбои за 62 мин.: эндпоинт недоступен — 11'
+        ), (
+            'По истечении окна сбой должен сообщаться снова, даже если '
+            'совпадает с прошлым сообщением, а подписчик должен получить '
+            'сводку'
+        )
+
+    def test_gate_alone_decides_on_repeats(self, monkeypatch):
+        import alerts
+        import homework
+        from exceptions import EndpointError
+
+        class FakeOutbox:
+
+            def __init__(self):
+                self.sent = []
+
+            def put(self, chat_id, message, parse_mode=None):
+                self.sent.append(message)
+
+        clock = FakeClock()
+        monkeypatch.setattr(alerts, 'gate', alerts.AlertGate(
+            window=600, digest_interval=3600, clock=clock
+        ))
+        outbox = FakeOutbox()
+        error = EndpointError(HTTPStatus.BAD_GATEWAY)
+        message = f'Сбой в работе программы: {error}'
+        old_message = ''
+        for second in (0, 10, 700):
+            clock.now = second
+            old_message = homework.deliver_poll(
+                outbox, 'a', message, error, old_message
+            )
+        assert outbox.sent == [message, message], (
+            'Сбой, пропущенный подавлением по истечении окна, должен '
+            'отправляться, даже если совпадает с прошлым сообщением'
+        )
+
+    def test_dropped_tenant_is_forgotten(self, monkeypatch, tmp_path):
+        import json
+
+        import alerts
+        import state
+        import tenants
+        from exceptions import EndpointError
+
+        monkeypatch.setattr(alerts, 'gate', alerts.AlertGate())
+        registry = tenants.TenantRegistry([tenants.Tenant('token', 1)])
+        tenant = next(iter(registry))
+        scheduler = tenants.Scheduler()
+        scheduler.add(tenant, 0)
+        alerts.gate.allow(tenant.key, EndpointError(HTTPStatus.BAD_GATEWAY))
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([]))
+        tenants.reload_registry(
+            registry, scheduler, state.MemoryStateStore(), str(path)
+        )
+        assert len(registry) == 0
+        assert tenant.key not in alerts.gate._sent, (
+            'Подавление сбоев должно забывать удалённых подписчиков'
+        )
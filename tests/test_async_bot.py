@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from utils import MockResponse
+
+
+class FakeOutbox:
+
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, message, parse_mode=None):
+        self.sent.append((chat_id, message, parse_mode))
+
+
+class TestAsyncBot:
+
+    def test_practicum_semaphore(self, monkeypatch, random_timestamp):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def mock_response_get(*args, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            return MockResponse(
+                {'homeworks': [], 'current_date': random_timestamp}
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+
+        import async_bot
+
+        async def poll_many():
+            bot = async_bot.AsyncBot(None, practicum_concurrency=3)
+            return await asyncio.gather(
+                *(bot.check_updates(0, {}, {}) for _ in range(12))
+            )
+
+        results = asyncio.run(poll_many())
+        assert results == [('Изменений нет', random_timestamp, None)] * 12
+        assert max(peak) <= 3, (
+            'Число одновременных запросов к API должно '
+            'ограничиваться семафором'
+        )
+
+    def test_aiohttp_errors_match_sync(self, monkeypatch, random_timestamp):
+        aiohttp = pytest.importorskip('aiohttp')
+        from aiohttp import web
+
+        import async_bot
+        from exceptions import CustomError
+
+        async def handler(request):
+            if request.query['from_date'] == '1':
+                return web.Response(status=HTTPStatus.INTERNAL_SERVER_ERROR)
+            return web.json_response({
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': random_timestamp,
+            })
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            monkeypatch.setattr(async_bot, 'ENDPOINT', f'http://127.0.0.1:{port}/')
+            try:
+                async with async_bot.AsyncBot(None) as bot:
+                    assert isinstance(bot.session, aiohttp.ClientSession)
+                    answer = await bot.get_api_answer(2)
+                    with pytest.raises(CustomError):
+                        await bot.get_api_answer(1)
+                    message, _, _ = await bot.check_updates(1, {}, {})
+            finally:
+                await runner.cleanup()
+            return answer, message
+
+        answer, message = asyncio.run(scenario())
+        assert answer['current_date'] == random_timestamp
+        assert message.startswith('Сбой в работе программы: Эндпоинт'), (
+            'Ошибки асинхронного запроса должны совпадать с синхронными'
+        )
+
+    def test_aiohttp_read_timeout(self, monkeypatch):
+        pytest.importorskip('aiohttp')
+        from aiohttp import web
+
+        import async_bot
+        import http_pool
+
+        async def handler(request):
+            await asyncio.sleep(1)
+            return web.json_response({'homeworks': [], 'current_date': 1})
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            monkeypatch.setattr(async_bot, 'ENDPOINT', f'http://127.0.0.1:{port}/')
+            monkeypatch.setattr(http_pool, 'timeout', (1, 0.2))
+            try:
+                async with async_bot.AsyncBot(None) as bot:
+                    started = time.perf_counter()
+                    with pytest.raises(requests.exceptions.Timeout):
+                        await bot.get_raw_answer(1)
+                    return time.perf_counter() - started
+            finally:
+                await runner.cleanup()
+
+        assert asyncio.run(scenario()) < 2, (
+            'Зависший запрос к API должен прерываться по таймауту http_pool'
+        )
+
+    def test_poll_writes_history(self, monkeypatch, tmp_path):
+        import async_bot
+        import history
+        import tenants
+        from polling import AdaptiveInterval
+
+        def mock_response_get(*args, **kwargs):
+            return MockResponse({
+                'homeworks': [
+                    {'homework_name': 'hw1', 'status': 'approved'},
+                ],
+                'current_date': 200,
+            })
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(history, 'log', None)
+        history.open_log(str(tmp_path / 'history.db'))
+        tenant = tenants.Tenant('token', 1, from_date=100)
+        tenant.statuses['hw1'] = 'reviewing'
+
+        async def poll_once():
+            bot = async_bot.AsyncBot(None, outbox=FakeOutbox())
+            return await bot.poll(tenant, AdaptiveInterval(600))
+
+        try:
+            asyncio.run(poll_once())
+            history.log.flush()
+            assert [
+                (event.tenant, event.homework_name, event.status,
+                 event.current_date)
+                for event in history.log.changes()
+            ] == [(tenant.key, 'hw1', 'approved', 200)], (
+                'Асинхронный режим должен писать изменения в журнал'
+            )
+        finally:
+            history.close()
+
+    def test_fetch_through_transport(self):
+        import async_bot
+        import transport
+
+        clock = transport.VirtualClock(1000)
+        fetcher = transport.MemoryFetcher(clock)
+        fetcher.set_status('hw1', 'approved')
+
+        async def fetch():
+            async with async_bot.AsyncBot(None) as bot:
+                assert bot.session is None, (
+                    'С подменённым получателем сессия aiohttp не нужна'
+                )
+                return await bot.get_api_answer(0, {})
+
+        transport.configure(fetcher, clock=clock)
+        try:
+            answer = asyncio.run(fetch())
+        finally:
+            transport.configure()
+        assert fetcher.requests == 1, (
+            'Асинхронный режим должен запрашивать API через транспорт'
+        )
+        assert answer['current_date'] == 1000
+        assert [item['homework_name'] for item in answer['homeworks']] == [
+            'hw1'
+        ]
+
+    def test_serve_finishes_polls_and_reloads(self, monkeypatch, tmp_path):
+        import async_bot
+        import history
+        import homework
+        import state
+        import tenants
+        import transport
+        from lifecycle import Lifecycle
+
+        class SlowFetcher:
+
+            def __init__(self):
+                self.started = []
+
+            def fetch(self, url, headers, params):
+                self.started.append(headers['Authorization'])
+                time.sleep(0.3)
+                return transport.Response.from_json(
+                    {'homeworks': [], 'current_date': 500}
+                )
+
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{'practicum_token': 'a', 'chat_id': 1}]))
+        monkeypatch.setattr(tenants, 'TENANTS_FILE', str(path))
+        monkeypatch.setattr(history, 'log', None)
+        reloads = []
+        monkeypatch.setattr(
+            homework, 'reload_settings', lambda outbox: reloads.append(outbox)
+        )
+        fetcher = SlowFetcher()
+        store = state.MemoryStateStore()
+        registry = tenants.load_registry()
+        handlers = {
+            signum: signal.getsignal(signum)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+        }
+
+        async def scenario():
+            task = asyncio.ensure_future(async_bot.serve(
+                registry, None, store, FakeOutbox(), Lifecycle()
+            ))
+            await asyncio.sleep(0.1)
+            path.write_text(json.dumps([
+                {'practicum_token': 'a', 'chat_id': 1},
+                {'practicum_token': 'b', 'chat_id': 2},
+            ]))
+            os.kill(os.getpid(), signal.SIGHUP)
+            while 'OAuth b' not in fetcher.started:
+                await asyncio.sleep(0.01)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(task, 5)
+
+        transport.configure(fetcher)
+        try:
+            asyncio.run(scenario())
+        finally:
+            transport.configure()
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        assert len(reloads) == 1
+        assert [tenant.token for tenant in registry] == ['a', 'b'], (
+            'SIGHUP должен перечитывать файл подписчиков'
+        )
+        assert store.get(state.tenant_key('b', 2)).current_date == 500, (
+            'Начатый опрос должен доводиться до конца при остановке'
+        )
@@ -0,0 +1,131 @@
+import json
+import sys
+
+import pytest
+
+DAY = 86400
+
+
+def homework(name, status, updated):
+    return {
+        'homework_name': name,
+        'status': status,
+        'date_updated': f'2024-01-{updated:02d}T00:00:00Z',
+    }
+
+
+def day(number):
+    return 1704067200 + (number - 1) * DAY
+
+
+HOMEWORKS = [
+    homework('hw1', 'approved', 2),
+    homework('hw2', 'rejected', 9),
+    homework('hw3', 'reviewing', 20),
+]
+
+
+class FakeApi:
+
+    def __init__(self, fail_from=None):
+        self.fail_from = fail_from
+        self.requests = []
+
+    def __call__(self, from_date, headers):
+        self.requests.append(from_date)
+        if self.fail_from is not None and from_date >= self.fail_from:
+            raise ConnectionError('Проблемы с сетью')
+        return {
+            'homeworks': [
+                item for item in HOMEWORKS
+                if day(int(item['date_updated'][8:10])) >= from_date
+            ],
+            'current_date': day(25),
+        }
+
+
+class TestBackfill:
+
+    def test_windows(self):
+        from backfill import windows
+
+        assert windows(0, 25, 10) == [(0, 10), (10, 20), (20, 25)]
+        assert windows(5, 5, 10) == []
+
+    def test_fetch_window_keeps_window_records(self, monkeypatch):
+        import backfill
+
+        monkeypatch.setattr(backfill, 'request_api_answer', FakeApi())
+        records, start, error = backfill.fetch_window(day(1), day(8), {})
+        assert [record.homework_name for record, _ in records] == ['hw1'], (
+            'Работы, обновлённые после конца окна, относятся к следующему'
+        )
+        assert records[0][1] == day(2) and start == day(1) and error is None
+        records, _, _ = backfill.fetch_window(day(15), day(18), {})
+        assert records == [], (
+            'Последнее окно не должно выходить за конец периода'
+        )
+
+    def test_resume_after_failure(self, monkeypatch, tmp_path):
+        import backfill
+        import history
+        import state
+        import tenants
+
+        registry = tenants.TenantRegistry([tenants.Tenant('token', 42)])
+        key = next(iter(registry)).key
+        store = state.MemoryStateStore()
+        path = str(tmp_path / 'backfill.json')
+        log = history.open_log(str(tmp_path / 'history.db'))
+        try:
+            failing = FakeApi(fail_from=day(15))
+            monkeypatch.setattr(backfill, 'request_api_answer', failing)
+            stats = backfill.Backfill(
+                store, backfill.Checkpoint(path), window=7 * DAY, workers=2,
+            ).run(registry, day(1), until=day(22))
+            assert stats == {'windows': 2, 'changes': 2, 'failed': 1}
+            with open(path) as file:
+                assert json.load(file) == {key: day(15)}, (
+                    'Прогресс должен сохраняться до первого сбойного окна'
+                )
+
+            api = FakeApi()
+            monkeypatch.setattr(backfill, 'request_api_answer', api)
+            stats = backfill.Backfill(
+                store, backfill.Checkpoint(path), window=7 * DAY, workers=2,
+            ).run(registry, day(1), until=day(22))
+            assert api.requests == [day(15)], (
+                'Продолжение должно начинаться с непройденного окна'
+            )
+            assert stats['changes'] == 1
+            saved = store.get(key)
+            assert saved.statuses == {
+                'hw1': 'approved', 'hw2': 'rejected', 'hw3': 'reviewing',
+            }
+            assert saved.current_date == day(22)
+            assert saved.last_message == '', (
+                'Загрузка истории не должна формировать уведомления'
+            )
+            assert [
+                (event.homework_name, event.received_at)
+                for event in log.changes(key)
+            ] == [('hw1', day(2)), ('hw2', day(9)), ('hw3', day(20))]
+        finally:
+            history.close()
+
+    @pytest.mark.parametrize('option', [
+        ['--window', '0'], ['--window', '-1'], ['--window', 'nan'],
+        ['--workers', '0'], ['--workers', '-2'],
+    ])
+    def test_rejects_empty_window_and_pool(self, monkeypatch, option):
+        import backfill
+
+        monkeypatch.setattr(
+            sys, 'argv', ['backfill.py', '--since', '2024-01-01', *option]
+        )
+        with pytest.raises(SystemExit) as error:
+            backfill.main()
+        assert error.value.code == 2, (
+            'Пустое окно и пул без потоков должны отклоняться при разборе '
+            'аргументов'
+        )
@@ -0,0 +1,106 @@
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.handshakes += 1
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(length))
+        self.server.requests.append((self.path, data))
+        body = json.dumps({
+            'ok': True,
+            'result': {'message_id': 1, 'text': data['text']},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def telegram_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TelegramHandler)
+    server.handshakes = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestBotApi:
+
+    def test_send_message(self, telegram_server):
+        import bot_api
+
+        host, port = telegram_server.server_address
+        bot = bot_api.DirectBot(
+            '123:abc', base_url=f'http://{host}:{port}/bot'
+        )
+        try:
+            for text in ('первое', 'второе'):
+                result = bot.send_message(42, text)
+        finally:
+            bot.close()
+        assert result == {'message_id': 1, 'text': 'второе'}
+        assert telegram_server.requests[0] == (
+            '/bot123:abc/sendMessage', {'chat_id': 42, 'text': 'первое'}
+        )
+        assert telegram_server.handshakes == 1, (
+            'Сообщения должны отправляться через одно keep-alive соединение'
+        )
+
+    @pytest.mark.parametrize('status, data, error, args', [
+        (HTTPStatus.TOO_MANY_REQUESTS,
+         {'ok': False, 'parameters': {'retry_after': 5}}, 'RetryAfter', (5,)),
+        (HTTPStatus.BAD_REQUEST,
+         {'ok': False, 'description': 'Bad Request: chat not found'},
+         'BadRequest', ('Bad Request: chat not found',)),
+        (HTTPStatus.FORBIDDEN,
+         {'ok': False, 'description': 'Forbidden: bot was blocked'},
+         'Unauthorized', ('Forbidden: bot was blocked',)),
+        (HTTPStatus.NOT_FOUND, {'ok': False}, 'InvalidToken', ()),
+        (HTTPStatus.BAD_REQUEST,
+         {'ok': False, 'parameters': {'migrate_to_chat_id': -100}},
+         'ChatMigrated', (-100,)),
+        (HTTPStatus.BAD_GATEWAY, None, 'NetworkError',
+         ('Invalid server response',)),
+    ])
+    def test_errors_match_telegram(self, status, data, error, args):
+        import telegram.error
+
+        import bot_api
+
+        with pytest.raises(getattr(bot_api, error)) as raised:
+            bot_api.parse_response(
+                status, json.dumps(data).encode() if data else b'<html>'
+            )
+        assert isinstance(raised.value, bot_api.TelegramError)
+        expected = getattr(telegram.error, error)(*args)
+        assert str(raised.value) == str(expected), (
+            'Тексты ошибок должны совпадать с python-telegram-bot'
+        )
+
+    def test_make_bot(self):
+        import bot_api
+
+        bot = bot_api.make_bot('123:abc', sender='direct')
+        assert isinstance(bot, bot_api.DirectBot)
+        assert bot_api.error_types(bot) == (
+            bot_api.RetryAfter, bot_api.TelegramError
+        )
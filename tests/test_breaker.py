@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import requests
+
+from utils import FakeClock, MockResponse
+
+
+class TestBreaker:
+
+    def test_states(self):
+        import breaker
+        from exceptions import EndpointError
+
+        clock = FakeClock()
+        fuse = breaker.CircuitBreaker(
+            failure_threshold=2, reset_timeout=10, clock=clock
+        )
+        error = EndpointError(HTTPStatus.BAD_GATEWAY)
+        assert not fuse.record_failure(error)
+        assert fuse.record_failure(error), (
+            'После failure_threshold сбоев предохранитель должен разомкнуться'
+        )
+        assert not fuse.allow(), 'Разомкнутый предохранитель пропускает опрос'
+        clock.now = 10
+        assert fuse.allow(), 'По истечении reset_timeout нужен пробный запрос'
+        assert not fuse.allow(), 'Пробный запрос должен быть единственным'
+        assert fuse.record_failure(error)
+        assert fuse.state == breaker.OPEN
+        clock.now = 20
+        assert fuse.allow()
+        fuse.record_success()
+        assert fuse.state == breaker.CLOSED and fuse.allow()
+
+    def test_client_errors_do_not_open(self):
+        import breaker
+        from exceptions import EndpointError
+
+        fuse = breaker.CircuitBreaker(failure_threshold=1)
+        assert not fuse.record_failure(EndpointError(HTTPStatus.UNAUTHORIZED))
+        assert fuse.state == breaker.CLOSED, (
+            'Ответ 401 одного подписчика не должен отключать опрос для всех'
+        )
+
+    def test_watchers_share_outage(self, monkeypatch):
+        import breaker
+        import homework
+        import templates
+
+        monkeypatch.setattr(breaker, '_breakers', {
+            homework.ENDPOINT: breaker.CircuitBreaker(failure_threshold=2),
+        })
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(kwargs)
+            return MockResponse(status_code=HTTPStatus.SERVICE_UNAVAILABLE)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        messages = set()
+        for token in range(10):
+            message, _, error = homework.check_updates(
+                1, homework.make_headers(f'token-{token}'), {}
+            )
+            messages.add(message)
+        assert len(calls) == 2, (
+            'После размыкания предохранителя запросы к API не отправляются'
+        )
+        assert templates.renderer().outage in messages
+        assert len(messages) == 2, (
+            'Пока API недоступен, все подписчики получают одно сообщение'
+        )
@@ -0,0 +1,114 @@
+import json
+from http import HTTPStatus
+
+import requests
+
+from utils import FakeClock, MockResponse
+
+
+def make_body(current_date, status='approved'):
+    return json.dumps({
+        'homeworks': [{'homework_name': 'hw', 'status': status}],
+        'current_date': current_date,
+    }).encode()
+
+
+class TestCache:
+
+    def test_lru_and_ttl(self):
+        import cache
+
+        clock = FakeClock()
+        lru = cache.LRUCache(max_entries=2, ttl=10, clock=clock)
+        lru.put('a', 1)
+        lru.put('b', 2)
+        assert lru.get('a') == 1
+        lru.put('c', 3)
+        assert lru.get('b') is None, (
+            'При переполнении должна вытесняться самая давняя запись'
+        )
+        assert len(lru) == 2
+        clock.now = 11
+        assert lru.get('a') is None, 'Устаревшая запись не должна выдаваться'
+
+    def test_same_body_is_not_decoded_again(self):
+        import cache
+        import homework
+
+        calls = []
+
+        def decode(raw):
+            calls.append(raw)
+            return homework.decode_response(raw)
+
+        response_cache = cache.ResponseCache()
+        records, current_date = response_cache.decode(make_body(100), decode)
+        assert current_date == 100
+        records, current_date = response_cache.decode(make_body(200), decode)
+        assert len(calls) == 1, (
+            'Тело, отличающееся только current_date, не должно разбираться '
+            'повторно'
+        )
+        assert current_date == 200
+        assert records[0].current_date == 200
+        response_cache.decode(make_body(200, 'rejected'), decode)
+        assert len(calls) == 2, 'Изменившееся тело должно разбираться заново'
+
+    def test_not_modified(self, monkeypatch):
+        import cache
+        import homework
+
+        monkeypatch.setattr(homework, 'response_cache', cache.ResponseCache())
+        sent = []
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            sent.append(dict(headers))
+            if 'If-None-Match' in headers:
+                return MockResponse(b'', HTTPStatus.NOT_MODIFIED)
+            return MockResponse(make_body(100), headers={'ETag': '"v1"'})
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        headers = homework.make_headers('token')
+        statuses = {}
+        message, current_date, error = homework.check_updates(
+            50, headers, statuses
+        )
+        assert error is None and current_date == 100
+        message, current_date, error = homework.check_updates(
+            50, headers, statuses
+        )
+        assert sent[1]['If-None-Match'] == '"v1"', (
+            'Повторный запрос должен быть условным'
+        )
+        assert error is None, 'Ответ 304 не является ошибкой'
+        assert current_date == 100
+        assert message == 'Изменений нет'
+
+    def test_consecutive_polls_are_conditional(self, monkeypatch):
+        import cache
+        import homework
+
+        monkeypatch.setattr(homework, 'response_cache', cache.ResponseCache())
+        sent = []
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            sent.append((params['from_date'], dict(headers)))
+            if headers.get('If-None-Match') == '"v1"':
+                return MockResponse(b'', HTTPStatus.NOT_MODIFIED)
+            return MockResponse(make_body(100), headers={'ETag': '"v1"'})
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        headers = homework.make_headers('token')
+        records, cursor = homework.fetch_records(50, headers)
+        assert cursor == 100
+        records, cursor = homework.fetch_records(cursor, headers)
+        assert sent[1][0] == 100 and sent[1][1].get('If-None-Match') == (
+            '"v1"'
+        ), 'Следующий опрос с новым курсором должен быть условным'
+        assert cursor == 100
+        assert [record.homework_name for record in records] == ['hw']
+        records, cursor = homework.fetch_records(cursor, headers)
+        assert len(sent) == 3 and cursor == 100, (
+            'Ответ 304 не должен сбивать курсор'
+        )
+
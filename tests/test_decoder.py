@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+PAYLOADS = [
+    [],
+    {},
+    {'homeworks': {'homework_name': 'hw', 'status': 'approved'}},
+    {'homeworks': [{'status': 'approved'}]},
+    {'homeworks': [{'homework_name': 'hw'}]},
+    {'homeworks': [{'homework_name': 'hw', 'status': 'unknown'}]},
+]
+
+
+def run_chain(homework, data):
+    return [
+        homework.parse_status(item)
+        for item in homework.check_response(data)
+    ]
+
+
+class TestDecoder:
+
+    def test_records(self):
+        import homework
+
+        raw = json.dumps({
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'approved', 'id': 1},
+                {'homework_name': 'hw2', 'status': 'reviewing'},
+            ],
+            'current_date': 100,
+        }).encode()
+        records, current_date = homework.decode_response(raw)
+        assert current_date == 100
+        assert records == [('hw1', 'approved', 100), ('hw2', 'reviewing', 100)]
+        assert records[0].homework_name == 'hw1'
+        dated, _ = homework.decode_response.dated(json.loads(raw))
+        assert dated == [(record, None) for record in records], (
+            'Работы без date_updated должны получать None'
+        )
+
+    @pytest.mark.parametrize('data', PAYLOADS)
+    def test_errors_match_chain(self, data):
+        import homework
+
+        with pytest.raises(Exception) as chain_error:
+            run_chain(homework, data)
+        with pytest.raises(Exception) as decoder_error:
+            homework.decode_response(json.dumps(data).encode())
+        assert decoder_error.type is chain_error.type, (
+            'Разбор ответа должен выбрасывать те же исключения, '
+            'что check_response и parse_status'
+        )
+        assert str(decoder_error.value) == str(chain_error.value)
+
+    def test_invalid_json(self, monkeypatch):
+        import decoder
+        import homework
+
+        for loads in (decoder.loads, json.loads):
+            monkeypatch.setattr(decoder, 'loads', loads)
+            with pytest.raises(json.JSONDecodeError):
+                homework.decode_response(b'<html>')
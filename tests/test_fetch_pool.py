@@ -0,0 +1,165 @@
+import threading
+import time
+
+
+class TestFetchPool:
+
+    def test_results_keep_task_order(self):
+        from fetch_pool import FetchExecutor
+
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fetch(cursor, headers):
+            with lock:
+                active.append(cursor)
+                peak.append(len(active))
+            time.sleep(0.01 * (5 - cursor))
+            with lock:
+                active.remove(cursor)
+            return [headers], cursor + 100, None
+
+        executor = FetchExecutor(fetch, workers=3, task_timeout=5)
+        try:
+            results = executor.map(
+                (cursor, f'h{cursor}') for cursor in range(6)
+            )
+        finally:
+            executor.shutdown()
+        assert [result[1] for result in results] == list(range(100, 106)), (
+            'Результаты должны возвращаться в порядке задач'
+        )
+        assert max(peak) <= 3, 'Пул не должен превышать заданное число потоков'
+
+    def test_timeout_and_errors(self):
+        from exceptions import FetchTimeoutError
+        from fetch_pool import FetchExecutor
+        from polling import is_transient
+
+        release = threading.Event()
+
+        def fetch(cursor, headers):
+            if cursor == 1:
+                release.wait(5)
+            if cursor == 2:
+                raise ValueError('сбой')
+            return [], cursor, None
+
+        executor = FetchExecutor(fetch, workers=3, task_timeout=0.05)
+        try:
+            results = executor.map([(0, {}), (1, {}), (2, {})])
+        finally:
+            release.set()
+            executor.shutdown()
+        assert results[0] == ([], 0, None)
+        records, cursor, error = results[1]
+        assert isinstance(error, FetchTimeoutError) and cursor == 1, (
+            'Зависшая задача должна завершаться FetchTimeoutError'
+        )
+        assert is_transient(error)
+        assert isinstance(results[2][2], ValueError)
+
+    def test_batch_shares_deadline_and_skips_busy(self):
+        from exceptions import FetchTimeoutError
+        from fetch_pool import FetchExecutor
+
+        release = threading.Event()
+        calls = []
+
+        def fetch(cursor, headers):
+            calls.append(cursor)
+            release.wait(5)
+            return [], cursor, None
+
+        executor = FetchExecutor(fetch, workers=4, task_timeout=0.2)
+        try:
+            started = time.monotonic()
+            results = executor.map(
+                [(cursor, {}) for cursor in range(3)], ['a', 'b', 'c']
+            )
+            elapsed = time.monotonic() - started
+            assert elapsed < 0.5, (
+                'Задачи пакета должны ждать общего срока, а не каждая своего'
+            )
+            assert all(
+                isinstance(error, FetchTimeoutError) for _, _, error in results
+            )
+            results = executor.map([(3, {}), (4, {})], ['a', 'd'])
+            assert isinstance(results[0][2], FetchTimeoutError), (
+                'Подписчик с незавершённым запросом не должен опрашиваться'
+            )
+            assert sorted(calls) == [0, 1, 2, 4]
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_shutdown_cancels_pending(self):
+        from fetch_pool import FetchExecutor
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch(cursor, headers):
+            calls.append(cursor)
+            started.set()
+            release.wait(5)
+            return [], cursor, None
+
+        executor = FetchExecutor(
+            fetch, workers=1, task_timeout=5, cancel_on_shutdown=True
+        )
+        futures = [
+            executor._executor.submit(fetch, cursor, {}) for cursor in range(3)
+        ]
+        started.wait(5)
+        executor.shutdown()
+        release.set()
+        assert futures[2].cancelled(), (
+            'Не начавшиеся задачи должны отменяться при остановке'
+        )
+        assert calls == [0]
+
+    def test_tenants_run_with_executor(self):
+        import state
+        import tenants
+        from fetch_pool import FetchExecutor
+
+        def poll_records(cursor, headers):
+            return [], cursor + 1, None
+
+        class OneShotScheduler(tenants.Scheduler):
+
+            def run_batches(self, dispatch, sleep=None, idle=1):
+                self.delays = dispatch(self.pop_due())
+
+        class FakeOutbox:
+            depth = 0
+
+            def put(self, chat_id, message, parse_mode=None):
+                self.sent.append((chat_id, message))
+
+        outbox = FakeOutbox()
+        outbox.sent = []
+        store = state.MemoryStateStore()
+        registry = tenants.TenantRegistry(
+            tenants.Tenant(f'token{chat}', chat, from_date=chat)
+            for chat in range(1, 5)
+        )
+        scheduler = OneShotScheduler()
+        executor = FetchExecutor(poll_records, workers=2)
+        try:
+            tenants.run(
+                registry, outbox, store, retry_time=0, scheduler=scheduler,
+                executor=executor,
+            )
+        finally:
+            executor.shutdown()
+        assert sorted(outbox.sent) == [
+            (chat, 'Изменений нет') for chat in range(1, 5)
+        ]
+        assert len(scheduler.delays) == 4
+        assert [tenant.from_date for tenant in registry] == [2, 3, 4, 5], (
+            'Курсоры подписчиков должны обновляться по результатам пула'
+        )
@@ -0,0 +1,108 @@
+import pytest
+
+from utils import FakeClock
+
+
+@pytest.fixture
+def log(tmp_path):
+    from history import HistoryLog
+
+    clock = FakeClock(1000.0)
+    log = HistoryLog(
+        str(tmp_path / 'history.db'), batch_size=3, flush_interval=10,
+        clock=clock,
+    )
+    log.clock_ = clock
+    yield log
+    log.close()
+
+
+def stored(log):
+    count, = log.connection.execute(
+        'SELECT COUNT(*) FROM status_event'
+    ).fetchone()
+    return count
+
+
+class TestHistory:
+
+    def test_batched_writes(self, log):
+        log.append('a', 'hw1', 'reviewing', 100)
+        log.append('a', 'hw2', 'reviewing', 100)
+        log.maybe_flush()
+        assert stored(log) == 0, 'Записи должны копиться до пачки'
+        log.append('b', 'hw1', 'reviewing', 100)
+        assert stored(log) == 3, 'Полная пачка пишется сразу'
+        log.append('b', 'hw1', 'approved', 200)
+        log.clock_.now += 10
+        log.maybe_flush()
+        assert stored(log) == 4, 'Очередь пишется по истечении интервала'
+
+    def test_queries(self, log):
+        clock = log.clock_
+        for tenant, name, status, when in (
+            ('a', 'hw1', 'reviewing', 1000),
+            ('a', 'hw1', 'rejected', 1600),
+            ('b', 'hw1', 'reviewing', 1700),
+            ('a', 'hw1', 'reviewing', 2000),
+            ('a', 'hw1', 'approved', 2300),
+            ('a', 'hw2', 'reviewing', 2400),
+        ):
+            clock.now = when
+            log.append(tenant, name, status, int(when) + 5)
+        assert [
+            (event.status, event.received_at)
+            for event in log.changes('a', since=1600, until=2300)
+        ] == [('rejected', 1600), ('reviewing', 2000)]
+        assert len(log.changes(since=1700)) == 4
+        assert log.latest('a') == {'hw1': 'approved', 'hw2': 'reviewing'}
+        assert log.latest('c') == {}
+        assert log.cursor('a') == 2405 and log.cursor('c') is None
+        assert sorted(log.review_durations()) == [
+            ('a', 'hw1', 'approved', 300), ('a', 'hw1', 'rejected', 600)
+        ]
+        assert log.review_durations(since=2000) == [
+            ('a', 'hw1', 'approved', 300)
+        ]
+
+    @pytest.mark.parametrize('query, parameters, index', [
+        ('SELECT * FROM status_event WHERE tenant = ? AND received_at >= ?',
+         ('a', 0), 'status_event_tenant_time'),
+        ('SELECT * FROM status_event WHERE received_at >= ?',
+         (0,), 'status_event_time'),
+    ])
+    def test_range_queries_use_index(self, log, query, parameters, index):
+        plan = ' '.join(
+            row[-1] for row in log.connection.execute(
+                'EXPLAIN QUERY PLAN ' + query, parameters
+            )
+        )
+        assert index in plan, 'Выборка по диапазону должна идти по индексу'
+
+    def test_restore_dedup_from_history(self, tmp_path):
+        import history
+        import state
+        import tenants
+
+        log = history.open_log(str(tmp_path / 'history.db'))
+        try:
+            tenant = tenants.Tenant('token', 42, from_date=1)
+            before = history.snapshot(tenant.statuses)
+            tenant.statuses.update({'hw1': 'approved', 'hw2': 'reviewing'})
+            history.record(tenant.key, before, tenant.statuses, 500)
+            before = history.snapshot(tenant.statuses)
+            history.record(tenant.key, before, tenant.statuses, 600)
+            assert len(log.changes(tenant.key)) == 2, (
+                'Неизменившиеся статусы не должны попадать в журнал'
+            )
+            restored = tenants.Tenant('token', 42, from_date=1)
+            restored.restore(state.MemoryStateStore())
+            assert restored.statuses == tenant.statuses, (
+                'Дедупликация должна восстанавливаться по журналу'
+            )
+            assert restored.from_date == 500
+        finally:
+            history.close()
+        assert history.snapshot({'hw': 'approved'}) is None, (
+            'Без журнала статусы не должны копироваться'
+        )
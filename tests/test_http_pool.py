@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class PracticumHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.handshakes += 1
+
+    def do_GET(self):
+        body = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def practicum_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PracticumHandler)
+    server.handshakes = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpPool:
+
+    def test_pool_reuses_connection(self, monkeypatch, practicum_server):
+        import homework
+        import http_pool
+
+        host, port = practicum_server.server_address
+        monkeypatch.setattr(homework, 'ENDPOINT', f'http://{host}:{port}/')
+        http_pool.configure(pool_size=2)
+        try:
+            for token in ('first', 'second', 'first', 'third'):
+                homework.request_api_answer(
+                    1, homework.make_headers(token)
+                )
+        finally:
+            http_pool.close()
+        assert practicum_server.handshakes == 1, (
+            'Запросы разных циклов и подписчиков должны '
+            'переиспользовать одно соединение из пула'
+        )
+
+    def test_without_pool_connects_every_time(self, monkeypatch,
+                                              practicum_server):
+        import homework
+        import http_pool
+
+        host, port = practicum_server.server_address
+        monkeypatch.setattr(homework, 'ENDPOINT', f'http://{host}:{port}/')
+        for _ in range(3):
+            homework.request_api_answer(1, homework.HEADERS)
+        assert http_pool._session is None
+        assert practicum_server.handshakes == 3
+
+    def test_timeout_is_passed(self, monkeypatch):
+        import http_pool
+        import requests
+
+        seen = {}
+
+        def mock_get(url, **kwargs):
+            seen.update(kwargs)
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        http_pool.get('http://example.invalid/')
+        assert seen['timeout'] == http_pool.timeout, (
+            'Запросы к API должны выполняться с таймаутом'
+        )
@@ -0,0 +1,138 @@
+import json
+import os
+import signal
+
+import telegram
+
+from utils import FakeClock
+
+
+class FakeBot:
+
+    instances = []
+
+    def __init__(self, token=None, **kwargs):
+        self.token = token
+        self.sent = []
+        FakeBot.instances.append(self)
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class TestLifecycle:
+
+    def test_flags(self):
+        from lifecycle import Lifecycle
+
+        clock = FakeClock()
+        lifecycle = Lifecycle(shutdown_timeout=10, clock=clock)
+        stopped = []
+        lifecycle.on_stop(lambda: stopped.append(True))
+        lifecycle.request_reload()
+        assert lifecycle.wait(60), 'Сигнал должен прерывать ожидание'
+        assert lifecycle.take_reload()
+        assert not lifecycle.take_reload(), (
+            'Перезагрузка выполняется один раз на сигнал'
+        )
+        clock.now = 4
+        lifecycle.request_stop()
+        lifecycle.request_stop()
+        assert stopped == [True]
+        assert lifecycle.wait(60) and lifecycle.wait(60), (
+            'После запроса остановки ожидание не должно блокировать'
+        )
+        clock.now = 7
+        assert lifecycle.remaining() == 7
+
+    def test_sigterm_drains_and_saves(self, monkeypatch):
+        import homework
+        import http_pool
+        import state
+
+        FakeBot.instances = []
+        store = state.MemoryStateStore()
+        monkeypatch.setattr(telegram, 'Bot', FakeBot)
+        monkeypatch.setattr(state, 'open_store', lambda: store)
+        monkeypatch.setattr(http_pool, 'configure', lambda: None)
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1:telegram')
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+
+        def check_updates(current_timestamp, headers, statuses):
+            os.kill(os.getpid(), signal.SIGTERM)
+            statuses['hw'] = 'approved'
+            return 'Статус изменился', 123, None
+
+        monkeypatch.setattr(homework, 'check_updates', check_updates)
+        handlers = {
+            signum: signal.getsignal(signum)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+        }
+        try:
+            homework.main()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        assert FakeBot.instances[0].sent == [(42, 'Статус изменился')], (
+            'Очередь отправки должна быть отправлена до завершения'
+        )
+        saved = store.get(state.tenant_key('token', 42))
+        assert saved.current_date == 123, (
+            'Курсор должен сохраняться при остановке по SIGTERM'
+        )
+        assert saved.statuses == {'hw': 'approved'}
+
+    def test_reload_settings(self, monkeypatch, tmp_path):
+        import homework
+        import templates
+
+        path = tmp_path / 'statuses.json'
+        path.write_text(
+            json.dumps({'approved': 'Принято!', 'revision': 'Доработать.'}),
+            encoding='utf-8',
+        )
+        original_statuses = dict(homework.HOMEWORK_STATUSES)
+        monkeypatch.setattr(
+            homework, 'HOMEWORK_STATUSES', dict(homework.HOMEWORK_STATUSES)
+        )
+        monkeypatch.setattr(
+            homework.decode_response, 'known_statuses',
+            homework.decode_response.known_statuses,
+        )
+        monkeypatch.setattr(homework, 'HEADERS', dict(homework.HEADERS))
+        monkeypatch.setattr(
+            homework, 'read_status_texts',
+            lambda: json.loads(path.read_text(encoding='utf-8')),
+        )
+        for name in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID'):
+            monkeypatch.setattr(homework, name, getattr(homework, name))
+        monkeypatch.setenv('PRACTICUM_TOKEN', 'new-token')
+        monkeypatch.setenv('TELEGRAM_TOKEN', '2:new')
+        monkeypatch.setenv('TELEGRAM_CHAT_ID', '7')
+        monkeypatch.setattr(telegram, 'Bot', FakeBot)
+        FakeBot.instances = []
+
+        class FakeOutbox:
+            bot = FakeBot('1:old')
+
+        outbox = FakeOutbox()
+        try:
+            homework.reload_settings(outbox)
+            records, _ = homework.decode_response.decode({
+                'homeworks': [{'homework_name': 'hw', 'status': 'revision'}],
+            })
+        finally:
+            templates.configure(original_statuses)
+        assert records[0].status == 'revision', (
+            'Статус, добавленный в файл вердиктов, должен приниматься '
+            'без перезапуска'
+        )
+        assert homework.HEADERS == {'Authorization': 'OAuth new-token'}
+        assert homework.TELEGRAM_CHAT_ID == '7'
+        assert outbox.bot.token == '2:new', (
+            'При смене TELEGRAM_TOKEN бот очереди отправки должен заменяться'
+        )
+        assert homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        ).endswith('Принято!')
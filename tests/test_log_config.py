@@ -0,0 +1,55 @@
+import logging
+import threading
+
+
+class SlowHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.records = []
+
+    def emit(self, record):
+        self.release.wait(5)
+        self.records.append(record.getMessage())
+
+
+class TestLogConfig:
+
+    def test_rotation(self, tmp_path):
+        import log_config
+
+        path = tmp_path / 'main.log'
+        log_config.setup_logging(
+            level='INFO', filename=str(path), max_bytes=200, backup_count=2
+        )
+        try:
+            logger = logging.getLogger('homework')
+            for index in range(20):
+                logger.info('Сообщение "%s" отправлено в Telegram', index)
+            logger.debug('Отладочное сообщение %s', 'скрыто')
+        finally:
+            log_config.stop_logging()
+        assert (tmp_path / 'main.log.1').exists(), (
+            'Файл журнала должен ротироваться по размеру'
+        )
+        assert not (tmp_path / 'main.log.3').exists()
+        text = path.read_text(encoding='utf-8')
+        assert 'Сообщение "19" отправлено в Telegram' in text
+        assert 'скрыто' not in text
+
+    def test_logging_does_not_block(self, tmp_path):
+        import log_config
+
+        log_config.setup_logging(filename=str(tmp_path / 'main.log'))
+        slow = SlowHandler()
+        log_config._listener.handlers += (slow,)
+        try:
+            logging.getLogger('homework').error('Сбой %s', 'сети')
+            assert slow.records == [], (
+                'Запись журнала не должна выполняться в вызывающем потоке'
+            )
+            slow.release.set()
+        finally:
+            log_config.stop_logging()
+        assert slow.records == ['Сбой сети']
@@ -0,0 +1,67 @@
+import time
+import timeit
+from urllib.request import urlopen
+
+import requests
+
+
+class TestMetrics:
+
+    def test_outcomes(self):
+        import metrics
+        from exceptions import EndpointError
+
+        assert metrics.practicum_outcome(None) == 'ok'
+        assert metrics.practicum_outcome(EndpointError(500)) == 'non_200'
+        assert metrics.practicum_outcome(
+            requests.exceptions.ConnectTimeout()
+        ) == 'timeout'
+        assert metrics.practicum_outcome(
+            requests.exceptions.ConnectionError()
+        ) == 'connection_error'
+        assert metrics.practicum_outcome(KeyError()) == 'invalid_response'
+
+    def test_endpoint(self, monkeypatch):
+        import metrics
+
+        monkeypatch.setattr(metrics, '_gauges', {})
+        metrics.register_gauge(
+            'homework_bot_outbox_depth', 'Очередь.', lambda: 3
+        )
+        server = metrics.start_server(port=0)
+        try:
+            metrics.record_practicum(time.perf_counter())
+            metrics.record_transition('approved')
+            host, port = server.server_address
+            with urlopen(f'http://{host}:{port}/metrics') as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+            monkeypatch.setattr(metrics, 'enabled', False)
+        assert (
+            'homework_bot_practicum_request_seconds_count{outcome="ok"}'
+            in text
+        )
+        assert (
+            'homework_bot_status_transitions_total{status="approved"}'
+            in text
+        )
+        assert 'homework_bot_outbox_depth 3' in text
+
+    def test_disabled_overhead(self, monkeypatch):
+        import metrics
+
+        monkeypatch.setattr(metrics, 'enabled', False)
+        number = 100_000
+        total = timeit.timeit(
+            'record_practicum(perf_counter(), None)',
+            globals={
+                'record_practicum': metrics.record_practicum,
+                'perf_counter': time.perf_counter,
+            },
+            number=number,
+        )
+        assert total / number < 1e-6, (
+            'Выключенные метрики должны стоить меньше микросекунды на опрос'
+        )
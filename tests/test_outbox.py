@@ -0,0 +1,94 @@
+from telegram import TelegramError
+from telegram.error import RetryAfter
+
+from utils import FakeClock
+
+
+class FakeBot:
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text))
+
+
+class TestOutbox:
+
+    def test_messages_for_chat_are_merged(self):
+        from outbox import Outbox
+
+        bot = FakeBot()
+        clock = FakeClock()
+        outbox = Outbox(bot, clock=clock)
+        outbox.put(1, 'первое')
+        outbox.put(1, 'второе')
+        outbox.put(2, 'третье')
+        assert outbox.depth == 3
+        while outbox.process_once() is not None:
+            clock.now += 1
+        assert bot.sent == [(1, 'первое\n\nвторое'), (2, 'третье')], (
+            'Сообщения одного чата должны объединяться в одно'
+        )
+        assert outbox.depth == 0
+
+    def test_same_messages_are_collapsed(self):
+        from outbox import Outbox
+
+        bot = FakeBot()
+        outbox = Outbox(bot, clock=FakeClock())
+        for _ in range(3):
+            outbox.put(1, 'API недоступен')
+        outbox.process_once()
+        assert bot.sent == [(1, 'API недоступен')], (
+            'Одинаковые сообщения одного чата должны схлопываться'
+        )
+
+    def test_chat_rate_limit(self):
+        from outbox import Outbox
+
+        bot = FakeBot()
+        clock = FakeClock()
+        outbox = Outbox(bot, chat_interval=1, clock=clock)
+        outbox.put(1, 'первое')
+        assert outbox.process_once() == 0
+        outbox.put(1, 'второе')
+        assert outbox.process_once() == 1, (
+            'Повторная отправка в тот же чат должна ждать chat_interval'
+        )
+        clock.now = 1
+        assert outbox.process_once() == 0
+        assert len(bot.sent) == 2
+
+    def test_retry_after(self):
+        from outbox import Outbox
+
+        bot = FakeBot(errors=[RetryAfter(5)])
+        clock = FakeClock()
+        outbox = Outbox(bot, clock=clock)
+        outbox.put(1, 'сообщение')
+        outbox.process_once()
+        assert outbox.depth == 1, (
+            'Сообщение после RetryAfter должно остаться в очереди'
+        )
+        assert outbox.process_once() == 5
+        clock.now = 5
+        outbox.process_once()
+        assert bot.sent == [(1, 'сообщение')]
+        assert outbox.stats()['retried'] == 1
+
+    def test_error_does_not_stop_worker(self):
+        from outbox import Outbox
+
+        bot = FakeBot(errors=[TelegramError('сбой')])
+        outbox = Outbox(bot, global_rate=1000, chat_interval=0)
+        outbox.start()
+        outbox.put(1, 'потеряно')
+        outbox.put(2, 'доставлено')
+        outbox.stop(timeout=5)
+        assert bot.sent == [(2, 'доставлено')]
+        stats = outbox.stats()
+        assert stats['failed'] == 1 and stats['sent'] == 1
@@ -0,0 +1,59 @@
+import requests
+
+from utils import FakeClock
+
+
+def make_interval(clock, **kwargs):
+    from polling import AdaptiveInterval
+
+    return AdaptiveInterval(
+        600, minimum=60, maximum=3600, reviewing=120, idle_after=1000,
+        clock=clock, random=lambda: 0.5, **kwargs
+    )
+
+
+class TestAdaptiveInterval:
+
+    def test_reviewing_tightens(self):
+        interval = make_interval(FakeClock())
+        assert interval.next_delay({'hw': 'reviewing'}) == 120, (
+            'Пока работа на ревью, API нужно опрашивать чаще'
+        )
+        assert interval.next_delay({'hw': 'approved'}) == 600
+
+    def test_backoff_on_transient_errors(self):
+        from exceptions import EndpointError
+
+        interval = make_interval(FakeClock())
+        delays = [
+            interval.next_delay({}, requests.exceptions.Timeout()),
+            interval.next_delay({}, EndpointError(503)),
+            interval.next_delay({}, requests.exceptions.ConnectionError()),
+        ]
+        assert delays == [1200, 2400, 3600], (
+            'После временных сбоев пауза должна расти экспоненциально '
+            'и не превышать максимум'
+        )
+        assert interval.next_delay({}, EndpointError(401)) == 600, (
+            'Постоянные ошибки не должны увеличивать паузу'
+        )
+
+    def test_idle_decay(self):
+        clock = FakeClock()
+        interval = make_interval(clock)
+        assert interval.next_delay({'hw': 'approved'}) == 600
+        clock.now = 1000
+        assert interval.next_delay({'hw': 'approved'}) == 900
+        clock.now = 2000
+        assert interval.next_delay({'hw': 'approved'}) == 1350
+        assert interval.next_delay({'hw': 'rejected'}) == 600, (
+            'Изменение статуса должно сбрасывать паузу простоя'
+        )
+
+    def test_jitter_bounds(self):
+        from polling import AdaptiveInterval
+
+        low = AdaptiveInterval(600, clock=FakeClock(), random=lambda: 0.0)
+        high = AdaptiveInterval(600, clock=FakeClock(), random=lambda: 1.0)
+        assert low.next_delay({}) == 540
+        assert high.next_delay({}) == 660
@@ -0,0 +1,218 @@
+import functools
+import http.client
+import json
+import time
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+
+class FakeOutbox:
+
+    def __init__(self):
+        self.sent = []
+
+    def put(self, chat_id, message, parse_mode=None):
+        self.sent.append((chat_id, message))
+
+
+def event(chat_id=None, status='approved', name='hw.zip'):
+    data = {'homeworks': [{'homework_name': name, 'status': status}]}
+    if chat_id is not None:
+        data['chat_id'] = chat_id
+    return json.dumps(data).encode()
+
+
+def post(server, body, secret=None, path='/events'):
+    host, port = server.server_address
+    request = urllib.request.Request(
+        f'http://{host}:{port}{path}', data=body, method='POST'
+    )
+    if secret is not None:
+        request.add_header('X-Push-Secret', secret)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except HTTPError as error:
+        return error.code
+
+
+@pytest.fixture
+def inbox():
+    import homework
+    import push
+
+    wakeups = []
+    inbox = push.Inbox(
+        homework.decode_response.decode, lambda: wakeups.append(True)
+    )
+    inbox.wakeups = wakeups
+    return inbox
+
+
+class TestPush:
+
+    def test_inbox_validates_events(self, inbox):
+        inbox.submit(event(42))
+        with pytest.raises(KeyError):
+            inbox.submit(b'{"chat_id": 42}')
+        with pytest.raises(ValueError):
+            inbox.submit(b'not json')
+        events = inbox.drain()
+        assert [item.chat_id for item in events] == [42]
+        assert events[0].records[0].status == 'approved'
+        assert inbox.wakeups == [True], (
+            'Принятое событие должно будить основной цикл'
+        )
+        assert inbox.drain() == []
+
+    def test_http_server(self, inbox):
+        import push
+
+        server = push.start_server(inbox, port=0, secret='s3cret')
+        try:
+            assert post(server, event(1), secret='s3cret') == 202
+            assert post(server, event(1), secret='wrong') == 403
+            assert post(server, event(1)) == 403
+            assert post(server, b'{}', secret='s3cret') == 400
+            assert post(server, event(1), 's3cret', path='/other') == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(inbox) == 1, (
+            'В очередь должны попадать только верные события'
+        )
+
+    @pytest.mark.parametrize('length', ['abc', '-1'])
+    def test_bad_content_length(self, inbox, length):
+        import push
+
+        server = push.start_server(inbox, port=0)
+        host, port = server.server_address
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        try:
+            connection.putrequest('POST', '/events')
+            connection.putheader('Content-Length', length)
+            connection.endheaders()
+            assert connection.getresponse().status == 400, (
+                'Неверный Content-Length должен отклоняться кодом 400'
+            )
+        finally:
+            connection.close()
+            server.shutdown()
+            server.server_close()
+        assert len(inbox) == 0
+
+    def test_file_follower_reads_appended_lines(self, inbox, tmp_path):
+        import push
+
+        path = tmp_path / 'events.jsonl'
+        path.write_bytes(event(1, name='old.zip') + b'\n')
+        follower = push.FileFollower(inbox, str(path))
+        follower.poll()
+        with open(path, 'ab') as file:
+            file.write(event(2) + b'\n' + b'{"broken"\n' + event(3)[:10])
+        follower.poll()
+        assert [item.chat_id for item in inbox.drain()] == [2], (
+            'Читаются только новые завершённые строки файла'
+        )
+        with open(path, 'ab') as file:
+            file.write(event(3)[10:] + b'\n')
+        follower.poll()
+        assert [item.chat_id for item in inbox.drain()] == [3]
+
+    def test_file_follower_waits_for_file(self, inbox, tmp_path):
+        import push
+
+        path = tmp_path / 'events.jsonl'
+        follower = push.FileFollower(inbox, str(path))
+        follower.poll()
+        path.write_bytes(event(1) + b'\n')
+        follower.poll()
+        assert [item.chat_id for item in inbox.drain()] == [1], (
+            'Файл, появившийся после запуска, читается с начала'
+        )
+
+    def test_single_chat_dedup(self, inbox, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '42')
+        outbox = FakeOutbox()
+        statuses = {}
+        for body in (event(42), event(), event(42), event(7, 'rejected')):
+            inbox.submit(body)
+        last = homework.apply_push(inbox.drain(), outbox, statuses, '')
+        assert outbox.sent == [('42', last)], (
+            'Повторное событие и событие чужого чата не должны отправляться'
+        )
+        assert statuses == {'hw.zip': 'approved'}
+        records, _ = homework.decode_response(event())
+        message = homework.build_message(records, statuses)
+        assert message == 'Изменений нет', (
+            'Опрос после push не должен повторять уведомление'
+        )
+
+    def test_tenants_route_by_chat(self, inbox):
+        import state
+        import tenants
+
+        registry = tenants.TenantRegistry(
+            tenants.Tenant(token, chat, from_date=1)
+            for token, chat in (('a', 1), ('b', 1), ('c', 2))
+        )
+        registry.remove('c', 2)
+        store = state.MemoryStateStore()
+        outbox = FakeOutbox()
+        for body in (event(1), event('1'), event(2), event()):
+            inbox.submit(body)
+        tenants.apply_push(registry, inbox.drain(), outbox, store)
+        assert [chat for chat, _ in outbox.sent] == [1, 1], (
+            'Событие должно доставляться всем подписчикам чата один раз'
+        )
+        assert store.get(state.tenant_key('a', 1)).statuses == {
+            'hw.zip': 'approved'
+        }
+        assert registry.for_chat(2) == []
+
+    def test_wait_for_events(self, inbox):
+        import push
+        from lifecycle import Lifecycle
+
+        lifecycle = Lifecycle()
+        inbox.wakeup = lifecycle.wake
+        handled = []
+
+        def handle(events):
+            handled.extend(events)
+            if len(handled) == 1:
+                inbox.submit(event(2))
+            else:
+                lifecycle.request_reload()
+
+        inbox.submit(event(1))
+        push.wait_for_events(lifecycle, inbox, 60, handle)
+        assert [item.chat_id for item in handled] == [1, 2], (
+            'События должны обрабатываться во время ожидания'
+        )
+        assert lifecycle.take_reload(), (
+            'Запрос перезагрузки должен прерывать ожидание'
+        )
+
+    def test_wait_for_events_virtual_clock(self, inbox):
+        import push
+        import transport
+        from lifecycle import Lifecycle
+
+        lifecycle = Lifecycle()
+        clock = transport.VirtualClock(0)
+        started = time.perf_counter()
+        push.wait_for_events(
+            lifecycle, inbox, 3600, lambda events: None,
+            clock=clock.monotonic,
+            wait=functools.partial(clock.wait, lifecycle),
+        )
+        assert clock.now == 3600, 'Пауза должна идти по переданным часам'
+        assert time.perf_counter() - started < 1, (
+            'На виртуальных часах пауза не должна ждать на самом деле'
+        )
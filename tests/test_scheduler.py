@@ -0,0 +1,56 @@
+from utils import FakeClock
+
+
+class TestScheduler:
+
+    def test_due_order_and_reschedule(self):
+        from scheduler import Scheduler
+
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock)
+        scheduler.schedule('a', 10)
+        scheduler.schedule('b', 5)
+        scheduler.schedule('c', 20)
+        scheduler.schedule('a', 30)
+        clock.now = 15
+        assert scheduler.pop_due() == ['b'], (
+            'Перенесённый подписчик не должен опрашиваться по старому сроку'
+        )
+        assert scheduler.time_until_next() == 5
+        scheduler.remove('c')
+        clock.now = 30
+        assert scheduler.pop_due() == ['a']
+        assert len(scheduler) == 0
+
+    def test_start_is_spread(self):
+        from scheduler import Scheduler
+
+        clock = FakeClock()
+        values = iter(i / 100 for i in range(100))
+        scheduler = Scheduler(clock=clock, random=lambda: next(values))
+        for watcher in range(100):
+            scheduler.add(watcher, 600)
+        clock.now = 5
+        assert len(scheduler.pop_due()) == 1, (
+            'Первые опросы подписчиков должны разноситься по времени'
+        )
+
+    def test_run_dispatches(self):
+        from scheduler import Scheduler
+
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock)
+        scheduler.schedule('a', 0)
+        calls = []
+
+        def dispatch(watcher):
+            calls.append((watcher, clock.now))
+            if len(calls) == 3:
+                scheduler.stop()
+            return 2
+
+        def sleep(seconds):
+            clock.now += seconds
+
+        scheduler.run(dispatch, sleep=sleep, idle=10)
+        assert calls == [('a', 0), ('a', 2), ('a', 4)]
@@ -0,0 +1,173 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from utils import FakeClock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = '''
+import sys, time
+import shard, state, tenants
+from scheduler import Scheduler
+
+table = shard.AssignmentTable(sys.argv[1])
+worker = shard.ShardWorker(
+    table, sys.argv[2], heartbeat=0,
+    load=lambda: tenants.load_registry(sys.argv[3]),
+)
+registry, scheduler = tenants.TenantRegistry(), Scheduler()
+store = state.MemoryStateStore()
+deadline = time.time() + 20
+while time.time() < deadline:
+    worker.sync(registry, scheduler, store)
+    if len(registry) and worker.pending is None:
+        break
+    time.sleep(0.05)
+print(' '.join(sorted(tenant.key for tenant in registry)))
+'''
+
+
+def make_registry(count):
+    import tenants
+
+    return tenants.TenantRegistry(
+        tenants.Tenant(f'token{chat}', chat, from_date=1)
+        for chat in range(count)
+    )
+
+
+class TestShard:
+
+    def test_ring_moves_few_keys(self):
+        from shard import HashRing
+
+        keys = [f'{chat}:key' for chat in range(3000)]
+        before = HashRing(['a', 'b', 'c'])
+        after = HashRing(['a', 'b', 'c', 'd'])
+        owners = [before.owner(key) for key in keys]
+        assert set(owners) == {'a', 'b', 'c'}
+        assert min(owners.count(owner) for owner in 'abc') > 600, (
+            'Подписчики должны распределяться примерно поровну'
+        )
+        moved = [
+            key for key, owner in zip(keys, owners)
+            if after.owner(key) != owner
+        ]
+        assert all(after.owner(key) == 'd' for key in moved), (
+            'При добавлении процесса подписчики переезжают только к нему'
+        )
+        assert len(moved) < len(keys) / 3
+        assert HashRing([]).owner('key') is None
+
+    def test_handoff_between_workers(self, tmp_path):
+        import state
+        from scheduler import Scheduler
+        from shard import AssignmentTable, Coordinator, ShardWorker
+
+        clock = FakeClock(1000.0)
+        table = AssignmentTable(str(tmp_path / 'shards.db'))
+        store_path = str(tmp_path / 'state.db')
+        registry = make_registry(40)
+        keys = {tenant.key for tenant in registry}
+        coordinator = Coordinator(
+            table, lambda: keys, ttl=30, vnodes=16, clock=clock
+        )
+        workers = {}
+        for name in ('a', 'b'):
+            worker = ShardWorker(
+                table, name, heartbeat=0, ttl=30, clock=clock,
+                load=lambda: make_registry(40),
+            )
+            worker.registry = make_registry(0)
+            worker.scheduler = Scheduler()
+            worker.store = state.SQLiteStateStore(store_path)
+            workers[name] = worker
+
+        def sync_all(names):
+            for _ in range(2):
+                for name in names:
+                    worker = workers[name]
+                    worker.sync(worker.registry, worker.scheduler,
+                                worker.store)
+
+        workers['a'].join()
+        coordinator.rebalance()
+        sync_all('a')
+        assert len(workers['a'].registry) == 40
+        for tenant in workers['a'].registry:
+            tenant.statuses = {'hw': 'approved'}
+            tenant.save(workers['a'].store)
+
+        workers['b'].join()
+        assert coordinator.rebalance() > 0
+        assert coordinator.rebalance() == 0, (
+            'Без изменений распределение не должно переписываться'
+        )
+        workers['b'].sync(
+            workers['b'].registry, workers['b'].scheduler,
+            workers['b'].store,
+        )
+        assert len(workers['b'].registry) == 0, (
+            'Новых подписчиков нельзя брать, пока прежний владелец '
+            'их не отпустил'
+        )
+        sync_all('ab')
+        owned = [
+            {tenant.key for tenant in workers[name].registry}
+            for name in 'ab'
+        ]
+        assert owned[0] | owned[1] == keys and not owned[0] & owned[1]
+        assert all(
+            tenant.statuses == {'hw': 'approved'}
+            for tenant in workers['b'].registry
+        ), 'Состояние переехавших подписчиков должно сохраняться'
+
+        workers['b'].leave()
+        coordinator.rebalance()
+        sync_all('a')
+        assert len(workers['a'].registry) == 40, (
+            'Подписчики ушедшего процесса должны вернуться оставшимся'
+        )
+        for worker in workers.values():
+            worker.store.close()
+        table.close()
+
+    def test_worker_processes(self, tmp_path):
+        from shard import AssignmentTable, Coordinator
+
+        registry_path = tmp_path / 'tenants.json'
+        registry_path.write_text(json.dumps([
+            {'practicum_token': f'token{chat}', 'chat_id': chat}
+            for chat in range(30)
+        ]))
+        db_path = str(tmp_path / 'shards.db')
+        table = AssignmentTable(db_path)
+        for name in ('w1', 'w2', 'w3'):
+            table.heartbeat(name, time.time())
+        coordinator = Coordinator(
+            table, lambda: {
+                tenant.key for tenant in make_registry(30)
+            },
+        )
+        coordinator.rebalance()
+        processes = [
+            subprocess.Popen(
+                [sys.executable, '-c', WORKER, db_path, name,
+                 str(registry_path)],
+                cwd=ROOT, stdout=subprocess.PIPE, text=True,
+            )
+            for name in ('w1', 'w2', 'w3')
+        ]
+        owned = [
+            set(process.communicate(timeout=60)[0].split())
+            for process in processes
+        ]
+        table.close()
+        assert all(owned), 'Каждый процесс должен получить подписчиков'
+        assert sum(len(keys) for keys in owned) == 30
+        assert set.union(*owned) == {
+            tenant.key for tenant in make_registry(30)
+        }, 'Процессы должны поделить подписчиков без пересечений'
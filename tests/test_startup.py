@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup:
+
+    def test_import_is_light(self, tmp_path):
+        code = (
+            'import sys, homework; '
+            'print(sorted(name for name in ("telegram", "requests", "dotenv")'
+            ' if name in sys.modules))'
+        )
+        env = dict(os.environ, LOG_FILE=str(tmp_path / 'main.log'))
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.strip() == '[]', (
+            'Импорт homework не должен загружать telegram, requests и dotenv'
+        )
+        assert not (tmp_path / 'main.log').exists(), (
+            'Журнал должен настраиваться в init(), а не при импорте'
+        )
+
+    def test_read_env(self, monkeypatch):
+        import homework
+
+        for name in ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID'):
+            monkeypatch.setattr(homework, name, getattr(homework, name))
+        monkeypatch.setattr(homework, 'HEADERS', dict(homework.HEADERS))
+        monkeypatch.setenv('PRACTICUM_TOKEN', 'from-env')
+        monkeypatch.setenv('TELEGRAM_TOKEN', '1:from-env')
+        monkeypatch.setenv('TELEGRAM_CHAT_ID', '5')
+        homework.read_env()
+        assert homework.check_tokens()
+        assert homework.HEADERS == {'Authorization': 'OAuth from-env'}, (
+            'init() должен перечитывать переменные окружения после .env'
+        )
+
+    def test_init_reads_dotenv(self, tmp_path):
+        (tmp_path / '.env').write_text(
+            'STATE_STORE=state.db\n'
+            'LOG_LEVEL=DEBUG\n'
+            'TELEGRAM_SENDER=direct\n'
+            'HISTORY_STORE=h.db\n'
+            f'LOG_FILE={tmp_path / "main.log"}\n'
+        )
+        code = (
+            'import logging, bot_api, history, homework, state; '
+            'homework.init(); '
+            'print(state.STATE_STORE, bot_api.TELEGRAM_SENDER, '
+            'history.HISTORY_STORE, '
+            'logging.getLevelName(logging.getLogger().level), '
+            'type(state.open_store()).__name__)'
+        )
+        env = {
+            name: value for name, value in os.environ.items()
+            if name not in (
+                'STATE_STORE', 'LOG_LEVEL', 'TELEGRAM_SENDER',
+                'HISTORY_STORE', 'LOG_FILE',
+            )
+        }
+        env['PYTHONPATH'] = ROOT
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=tmp_path, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.split() == [
+            'state.db', 'direct', 'h.db', 'DEBUG', 'SQLiteStateStore',
+        ], 'init() должен применять настройки из .env ко всем модулям'
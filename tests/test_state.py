@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from utils import FakeClock
+
+
+class TestState:
+
+    @pytest.mark.parametrize('name', ['state.json', 'state.sqlite'])
+    def test_state_survives_restart(self, tmp_path, name):
+        import state
+
+        location = str(tmp_path / name)
+        store = state.open_store(location)
+        store.update('1:abc', current_date=100, last_message='Изменений нет')
+        store.set_status('1:abc', 'hw', 'reviewing')
+        store.close()
+
+        restored = state.open_store(location).get('1:abc')
+        assert restored.current_date == 100, (
+            'Курсор `current_date` должен переживать перезапуск бота'
+        )
+        assert restored.last_message == 'Изменений нет'
+        assert restored.statuses == {'hw': 'reviewing'}
+
+    def test_removed_statuses_stay_removed(self, tmp_path):
+        import state
+
+        location = str(tmp_path / 'state.sqlite')
+        store = state.open_store(location)
+        store.set_status('1:abc', 'first', 'approved')
+        store.set_status('1:abc', 'second', 'reviewing')
+        store.flush()
+        store.update('1:abc', statuses={'first': 'approved'})
+        store.close()
+
+        assert state.open_store(location).get('1:abc').statuses == {
+            'first': 'approved',
+        }, 'Удалённый статус не должен возвращаться после перезапуска'
+
+    def test_writes_are_batched(self, tmp_path):
+        import state
+
+        path = tmp_path / 'state.json'
+        clock = FakeClock()
+        store = state.FileStateStore(
+            str(path), flush_interval=30, clock=clock
+        )
+        for current_date in range(10):
+            store.update('1:abc', current_date=current_date)
+            store.maybe_flush()
+        assert not path.exists(), (
+            'Состояние не должно записываться на диск в каждом цикле'
+        )
+        clock.now = 30
+        store.maybe_flush()
+        assert state.FileStateStore(str(path)).get('1:abc').current_date == 9
+        assert os.listdir(tmp_path) == ['state.json'], (
+            'После записи не должно оставаться временных файлов'
+        )
+
+    def test_tenant_key_hides_token(self):
+        import state
+
+        key = state.tenant_key('secret-token', 42)
+        assert key.startswith('42:')
+        assert 'secret-token' not in key
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from utils import MockResponse
+
+
+class FakeBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text, kwargs.get('parse_mode')))
+
+
+APPROVED = {
+    'homeworks': [{'homework_name': 'hw.zip', 'status': 'approved'}],
+    'current_date': 100,
+}
+
+
+def assert_sent_by_tenant(bot, outbox):
+    assert outbox.depth == 2
+    while outbox.process_once() is not None:
+        outbox._chat_ready_at.clear()
+    assert [parse_mode for _, _, parse_mode in bot.sent] == [
+        'HTML', None
+    ], 'Сообщения с разной разметкой не должны объединяться'
+    assert bot.sent[0][1].startswith(
+        'Изменился статус проверки работы <b>hw.zip</b>'
+    )
+    assert bot.sent[1][1].startswith('The review status of "hw.zip"')
+
+
+class TestTemplates:
+
+    def test_default_matches_parse_status(self):
+        import homework
+        import templates
+
+        renderer = templates.renderer('ru', 'plain')
+        for status in homework.HOMEWORK_STATUSES:
+            assert renderer.status('hw.zip', status) == homework.parse_status(
+                {'homework_name': 'hw.zip', 'status': status}
+            ), 'Русские уведомления без разметки не должны меняться'
+        assert renderer.no_changes == 'Изменений нет'
+        assert renderer.outage == (
+            'API Практикума недоступен, проверка статусов приостановлена '
+            'до его восстановления'
+        )
+        assert renderer.failure('ошибка') == 'Сбой в работе программы: ошибка'
+
+    @pytest.mark.parametrize('markup, parse_mode, expected', [
+        ('html', 'HTML',
+         'The review status of <b>a&lt;b&gt;_1.zip</b> has changed. '
+         'The reviewer liked everything. Hooray!'),
+        ('markdown', 'MarkdownV2',
+         'The review status of *a<b\\>\\_1\\.zip* has changed\\. '
+         'The reviewer liked everything\\. Hooray\\!'),
+    ])
+    def test_markup_escapes_values(self, markup, parse_mode, expected):
+        import templates
+
+        renderer = templates.renderer('en', markup)
+        assert renderer.parse_mode == parse_mode
+        assert renderer.status('a<b>_1.zip', 'approved') == expected
+
+    def test_fallback_and_cache(self):
+        import templates
+
+        renderer = templates.renderer('de', 'bbcode')
+        assert renderer.markup == 'plain', (
+            'Неизвестный формат должен заменяться обычным текстом'
+        )
+        assert renderer.no_changes == 'Изменений нет', (
+            'Неизвестный язык должен брать тексты из русского каталога'
+        )
+        first = renderer.status('hw.zip', 'reviewing')
+        assert renderer.status('hw.zip', 'reviewing') is first, (
+            'Повторный вывод должен браться из кэша'
+        )
+
+    def test_catalog_file(self, tmp_path, monkeypatch):
+        import homework
+        import templates
+
+        path = tmp_path / 'messages.json'
+        path.write_text(json.dumps({
+            'ru': {'no_changes': 'Без изменений'},
+            'uk': {
+                'status_changed': 'Статус роботи «{homework_name}»: {verdict}',
+                'verdicts': {'approved': 'прийнято'},
+            },
+        }), encoding='utf-8')
+        monkeypatch.setattr(
+            templates, 'CATALOGS', json.loads(json.dumps(templates.CATALOGS))
+        )
+        monkeypatch.setattr(
+            templates, 'read_catalogs',
+            lambda: json.loads(path.read_text(encoding='utf-8')),
+        )
+        try:
+            homework.load_status_texts()
+            assert templates.renderer('uk', 'plain').status(
+                'hw.zip', 'approved'
+            ) == 'Статус роботи «hw.zip»: прийнято'
+            assert templates.renderer().no_changes == 'Без изменений'
+        finally:
+            monkeypatch.undo()
+            templates.configure(homework.HOMEWORK_STATUSES)
+
+    def test_tenant_format_reaches_telegram(self, monkeypatch, tmp_path):
+        import requests
+
+        import state
+        import tenants
+        from outbox import Outbox
+
+        class OneShotScheduler(tenants.Scheduler):
+
+            def run(self, dispatch, sleep=None, idle=1):
+                for tenant in self.pop_due():
+                    dispatch(tenant)
+
+        monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: (
+            MockResponse(APPROVED)
+        ))
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'practicum_token': 'a', 'chat_id': 1, 'format': 'html'},
+            {'practicum_token': 'b', 'chat_id': 1, 'locale': 'en'},
+        ]))
+        registry = tenants.TenantRegistry.load(str(path))
+        bot = FakeBot()
+        outbox = Outbox(bot)
+        tenants.run(
+            registry, outbox, state.MemoryStateStore(), retry_time=0,
+            scheduler=OneShotScheduler(),
+        )
+        assert_sent_by_tenant(bot, outbox)
+
+    def test_tenant_format_in_async_mode(self, monkeypatch, tmp_path):
+        import asyncio
+
+        import requests
+
+        import async_bot
+        import tenants
+        from outbox import Outbox
+        from polling import AdaptiveInterval
+
+        monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: (
+            MockResponse(APPROVED)
+        ))
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'practicum_token': 'a', 'chat_id': 1, 'format': 'html'},
+            {'practicum_token': 'b', 'chat_id': 1, 'locale': 'en'},
+        ]))
+        registry = tenants.TenantRegistry.load(str(path))
+        bot = FakeBot()
+        outbox = Outbox(bot)
+
+        async def poll_all():
+            watcher = async_bot.AsyncBot(bot, outbox=outbox)
+            for tenant in registry:
+                await watcher.poll(tenant, AdaptiveInterval(600))
+
+        asyncio.run(poll_all())
+        assert_sent_by_tenant(bot, outbox)
@@ -0,0 +1,92 @@
+import requests
+
+from utils import MockResponse
+
+
+class TestTenants:
+
+    def test_tenants_state_is_separate(self, monkeypatch, random_timestamp):
+        statuses = {'OAuth first': 'approved', 'OAuth second': 'rejected'}
+        calls = []
+
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            calls.append((headers['Authorization'], params['from_date']))
+            status = statuses[headers['Authorization']]
+            return MockResponse({
+                'homeworks': [{'homework_name': 'hw', 'status': status}],
+                'current_date': random_timestamp,
+            })
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+
+        import tenants
+
+        first = tenants.Tenant('first', 1, from_date=10)
+        second = tenants.Tenant('second', 2, from_date=20)
+        registry = tenants.TenantRegistry([first, second])
+        messages = {
+            tenant.chat_id: tenants.poll_tenant(tenant)[0]
+            for tenant in registry
+        }
+        assert calls == [('OAuth first', 10), ('OAuth second', 20)], (
+            'Каждый подписчик должен опрашиваться со своим токеном и курсором'
+        )
+        assert messages[1].endswith('Ура!'), (
+            'Сообщение первого подписчика не должно зависеть от второго'
+        )
+        assert messages[2].endswith('есть замечания.'), (
+            'Сообщение второго подписчика не должно зависеть от первого'
+        )
+        assert first.from_date == second.from_date == random_timestamp, (
+            'Курсор подписчика должен обновляться из `current_date`'
+        )
+        assert tenants.poll_tenant(first)[0] == 'Изменений нет', (
+            'Уже отправленный статус работы не должен повторяться'
+        )
+        assert tenants.poll_tenant(first)[0] is None, (
+            'Повторное сообщение подписчику отправляться не должно'
+        )
+
+    def test_registry_load(self, tmp_path):
+        import tenants
+
+        path = tmp_path / 'tenants.json'
+        path.write_text(
+            '[{"practicum_token": "a", "chat_id": 1, "from_date": 5},'
+            ' {"practicum_token": "b", "chat_id": 2}]'
+        )
+        registry = tenants.TenantRegistry.load(str(path))
+        assert len(registry) == 2
+        loaded = {tenant.chat_id: tenant for tenant in registry}
+        assert loaded[1].from_date == 5
+        assert loaded[2].headers == {'Authorization': 'OAuth b'}
+
+    def test_all_homeworks_in_one_message(self, monkeypatch,
+                                          random_timestamp):
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'reviewing'},
+            {'homework_name': 'hw2', 'status': 'approved'},
+            {'homework_name': 'hw3', 'status': 'rejected'},
+        ]
+
+        def mock_response_get(*args, **kwargs):
+            return MockResponse({
+                'homeworks': homeworks, 'current_date': random_timestamp
+            })
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+
+        import tenants
+
+        tenant = tenants.Tenant('token', 1)
+        tenant.statuses = {'hw1': 'reviewing'}
+        message, _ = tenants.poll_tenant(tenant)
+        assert '"hw1"' not in message, (
+            'Работы с неизменившимся статусом не должны попадать в сообщение'
+        )
+        assert '"hw2"' in message and '"hw3"' in message, (
+            'Все изменившиеся работы должны попадать в одно сообщение'
+        )
+        assert tenant.statuses == {
+            'hw1': 'reviewing', 'hw2': 'approved', 'hw3': 'rejected'
+        }
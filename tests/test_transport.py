@@ -0,0 +1,191 @@
+import signal
+import time
+
+import pytest
+
+START = 1581604857
+DAY = 86400
+
+
+@pytest.fixture
+def simulation(monkeypatch):
+    import homework
+
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'token')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1:telegram')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', 42)
+    handlers = {
+        signum: signal.getsignal(signum)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+    }
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+def schedule(fetcher):
+    fetcher.set_status('hw1.zip', 'reviewing', at=START + 3600)
+    fetcher.set_status('hw1.zip', 'approved', at=START + 2 * DAY)
+    fetcher.fail(502, times=3, at=START + 3 * DAY)
+    fetcher.set_status('hw2.zip', 'rejected', at=START + 5 * DAY)
+
+
+def parts(deliverer):
+    return [
+        part for delivery in deliverer.sent
+        for part in delivery.text.split('\n\n')
+    ]
+
+
+def changes(deliverer):
+    return [
+        part for part in parts(deliverer)
+        if part.startswith('Изменился статус')
+    ]
+
+
+class TestTransport:
+
+    def test_memory_fetcher(self):
+        import transport
+
+        clock = transport.VirtualClock(START)
+        fetcher = transport.MemoryFetcher(clock)
+        schedule(fetcher)
+        assert fetcher.fetch('', {}, {'from_date': START}).json() == {
+            'homeworks': [], 'current_date': START,
+        }, 'Будущие изменения не должны попадать в ответ'
+        clock.advance(3 * DAY)
+        assert [
+            fetcher.fetch('', {}, {'from_date': START}).status_code
+            for _ in range(3)
+        ] == [502] * 3
+        clock.advance(DAY)
+        response = fetcher.fetch('', {}, {'from_date': START + DAY})
+        assert response.status_code == 200, (
+            'Сбой должен повторяться заданное число раз, а не дольше'
+        )
+        assert [
+            (item['homework_name'], item['status'])
+            for item in response.json()['homeworks']
+        ] == [('hw1.zip', 'approved')], (
+            'В ответ попадают последние статусы работ, изменённых '
+            'после from_date'
+        )
+
+    def test_week_in_seconds(self, simulation, monkeypatch):
+        import polling
+        import transport
+        from simulate import simulate
+
+        monkeypatch.setattr(polling, 'POLL_JITTER', 0)
+        clock = transport.VirtualClock(START, until=START + 7 * DAY)
+        fetcher = transport.MemoryFetcher(clock)
+        schedule(fetcher)
+        started = time.perf_counter()
+        deliverer = simulate(fetcher, transport.MemoryDeliverer(), clock)
+        assert time.perf_counter() - started < 30, (
+            'Неделя опроса на виртуальных часах должна проходить за секунды'
+        )
+        assert clock.now >= START + 7 * DAY
+        assert fetcher.requests > 100
+        assert changes(deliverer) == [
+            'Изменился статус проверки работы "hw1.zip". '
+            'Работа взята на проверку ревьюером.',
+            'Изменился статус проверки работы "hw1.zip". '
+            'Работа проверена: ревьюеру всё понравилось. Ура!',
+            'Изменился статус проверки работы "hw2.zip". '
+            'Работа проверена: у ревьюера есть замечания.',
+        ]
+        assert parts(deliverer).count(
+            'Сбой в работе программы: Эндпоинт недоступен: 502'
+        ) < 3, 'Повторы сбоя в пределах окна должны подавляться'
+        assert any(
+            part.startswith('Повторяющиеся сбои') for part in parts(deliverer)
+        ), 'О подавленных повторах должна приходить сводка'
+        assert {delivery.chat_id for delivery in deliverer.sent} == {42}
+        assert [delivery.at - START for delivery in deliverer.sent] == [
+            0, 3600, 3720, 2 * DAY, 2 * DAY + 600, 3 * DAY, 3 * DAY + 3600,
+            3 * DAY + 7200, 3 * DAY + 7200, 5 * DAY + 112.5,
+            5 * DAY + 712.5,
+        ], 'Сообщения должны доставляться сразу по виртуальным часам'
+        assert abs(transport.now() - time.time()) < 60, (
+            'После прогона должен вернуться рабочий транспорт'
+        )
+
+    def test_record_and_replay(self, simulation, tmp_path):
+        import transport
+        from simulate import simulate
+
+        recording = tmp_path / 'api.jsonl'
+        clock = transport.VirtualClock(START, until=START + 7 * DAY)
+        source = transport.MemoryFetcher(clock)
+        schedule(source)
+        original = simulate(
+            transport.RecordingFetcher(source, recording, clock),
+            transport.MemoryDeliverer(), clock,
+        )
+        clock = transport.VirtualClock()
+        fetcher = transport.ReplayFetcher(recording, clock)
+        clock.now, clock.until = fetcher.start, fetcher.end + 1
+        transcript = tmp_path / 'sent.jsonl'
+        replayed = simulate(
+            fetcher, transport.RecordingDeliverer(transcript, clock), clock
+        )
+        assert changes(replayed) == changes(original), (
+            'Проигрывание записи должно давать те же уведомления'
+        )
+        assert len(transcript.read_text(encoding='utf-8').splitlines()) == (
+            len(replayed.sent)
+        ), 'Каждое доставленное сообщение должно записываться в файл'
+
+    def test_simulation_leaves_no_traces(self, monkeypatch, tmp_path):
+        import functools
+
+        import history
+        import homework
+        import tenants
+        import transport
+        from simulate import simulate
+
+        path = str(tmp_path / 'history.db')
+        monkeypatch.setattr(
+            history, 'open_log', functools.partial(history.open_log, path)
+        )
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', None)
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', None)
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', None)
+        handlers = {
+            signum: signal.getsignal(signum)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+        }
+        clock = transport.VirtualClock(START, until=START + 3 * DAY)
+        fetcher = transport.MemoryFetcher(clock)
+        schedule(fetcher)
+        try:
+            simulate(fetcher, transport.MemoryDeliverer(), clock)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        assert (
+            homework.PRACTICUM_TOKEN, homework.TELEGRAM_TOKEN,
+            homework.TELEGRAM_CHAT_ID,
+        ) == (None, None, None), 'Прогон должен возвращать токены'
+        log = history.HistoryLog(path)
+        try:
+            events = log.changes()
+        finally:
+            log.close()
+        assert [event.status for event in events] == [
+            'reviewing', 'approved'
+        ]
+        assert all(
+            START <= event.received_at <= clock.now for event in events
+        ), 'Журнал должен вести время по виртуальным часам'
+        transport.configure(clock=clock)
+        try:
+            assert tenants.Tenant('token', 1).from_date == int(clock.now), (
+                'Курсор нового подписчика должен браться из часов транспорта'
+            )
+        finally:
+            transport.configure()
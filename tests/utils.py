@@ -1,3 +1,5 @@
+import json
+from http import HTTPStatus
 from inspect import signature
 from types import ModuleType
 
@@ -37,3 +39,32 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class FakeClock:
+    """Clock for tests: returns `now`, which the test moves by hand."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class MockResponse:
+    """
+    Response of requests.get for tests.
+    :param data: JSON-serializable body or raw bytes
+    :param status_code: HTTP status code
+    :param headers: response headers
+    """
+
+    def __init__(self, data=None, status_code=HTTPStatus.OK, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        if isinstance(data, bytes):
+            self.content = data
+        else:
+            self.content = json.dumps({} if data is None else data).encode()
+
+    def json(self):
+        return json.loads(self.content)
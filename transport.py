@@ -0,0 +1,382 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import NamedTuple
+
+import bot_api
+import http_pool
+import settings
+from outbox import Outbox
+
+
+@settings.register
+def read_env():
+    """Читает путь для записи ответов API из окружения."""
+    global TRANSPORT_RECORD
+    TRANSPORT_RECORD = os.getenv('TRANSPORT_RECORD', '')
+
+
+class Response:
+    """Ответ API, собранный без HTTP: код, тело и заголовки."""
+
+    def __init__(self, status_code, content=b'{}', headers=None):
+        """Запоминает код, тело и заголовки ответа."""
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @classmethod
+    def from_json(cls, data, status_code=200):
+        """Собирает ответ с телом data в формате JSON."""
+        return cls(status_code, json.dumps(data, ensure_ascii=False).encode())
+
+    def json(self):
+        """Разбирает тело ответа как JSON."""
+        return json.loads(self.content)
+
+
+class SystemClock:
+    """Настоящее время: паузы основного цикла ждут на самом деле."""
+
+    def time(self):
+        """Возвращает текущую временную метку."""
+        return time.time()
+
+    def monotonic(self):
+        """Возвращает показание монотонных часов."""
+        return time.monotonic()
+
+    def wait(self, lifecycle, delay):
+        """Ждёт delay секунд или сигнала lifecycle."""
+        return lifecycle.wait(delay)
+
+
+class VirtualClock:
+    """Виртуальное время для прогона main() на полной скорости.
+    Пауза не ждёт, а сдвигает часы на delay секунд; когда часы
+    доходят до until, у lifecycle запрашивается остановка.
+    """
+
+    def __init__(self, start=0.0, until=None):
+        """Ставит часы на start; until — момент остановки."""
+        self.now = float(start)
+        self.until = until
+        self._lock = threading.Lock()
+
+    def time(self):
+        """Возвращает виртуальную временную метку."""
+        return self.now
+
+    def monotonic(self):
+        """Виртуальные часы монотонны сами по себе."""
+        return self.now
+
+    def advance(self, delay):
+        """Сдвигает часы на delay секунд."""
+        with self._lock:
+            self.now += max(0.0, delay)
+
+    def wait(self, lifecycle, delay):
+        """Сдвигает часы вместо ожидания.
+        Накопившиеся сигналы lifecycle обрабатываются как обычно.
+        """
+        interrupted = lifecycle.wait(0)
+        self.advance(delay)
+        if self.until is not None and self.now >= self.until:
+            lifecycle.request_stop()
+        return interrupted
+
+
+class HttpFetcher:
+    """Получение статусов у API Практикума через общий пул соединений.
+    Получатель — любой объект с методом fetch(url, headers, params),
+    возвращающим ответ с полями status_code, content и headers.
+    """
+
+    def fetch(self, url, headers, params):
+        """Выполняет GET-запрос к API."""
+        return http_pool.get(url, headers=headers, params=params)
+
+
+class RecordingFetcher:
+    """Получатель, записывающий ответы другого получателя в файл.
+    Каждый ответ — строка JSON с временем, кодом и телом ответа;
+    файл потом проигрывается ReplayFetcher.
+    """
+
+    def __init__(self, fetcher, path, clock=None):
+        """Задаёт получатель, файл записи и часы."""
+        self.fetcher = fetcher
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def fetch(self, url, headers, params):
+        """Выполняет запрос и дописывает ответ в файл."""
+        response = self.fetcher.fetch(url, headers, params)
+        line = json.dumps({
+            'at': self.clock.time() if self.clock else now(),
+            'status': response.status_code,
+            'body': response.content.decode('utf-8', 'replace'),
+        }, ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+        return response
+
+
+class MemoryFetcher:
+    """API Практикума в памяти.
+    Смены статусов задаются set_status() с моментом, когда они
+    происходят, сбои — fail(). Ответ строится по часам clock так же,
+    как его строит API: в него попадают работы, статус которых
+    менялся с from_date до текущего момента.
+    """
+
+    def __init__(self, clock):
+        """Создаёт пустой API с часами clock."""
+        self.clock = clock
+        self.requests = 0
+        self._changes = []
+        self._failures = []
+
+    def set_status(self, homework_name, status, at=None):
+        """Меняет статус работы в момент at, по умолчанию сейчас."""
+        at = self.clock.time() if at is None else at
+        self._changes.append((at, homework_name, status))
+        self._changes.sort(key=lambda change: change[0])
+
+    def fail(self, status_code=500, times=1, at=None):
+        """Отвечает status_code на times запросов начиная с момента at."""
+        at = self.clock.time() if at is None else at
+        self._failures.append([at, status_code, times])
+        self._failures.sort(key=lambda failure: failure[0])
+
+    def fetch(self, url, headers, params):
+        """Отвечает так, как ответил бы API в текущий момент."""
+        self.requests += 1
+        now = self.clock.time()
+        for failure in self._failures:
+            if failure[0] <= now and failure[2] > 0:
+                failure[2] -= 1
+                return Response.from_json({}, failure[1])
+        from_date = int(params.get('from_date') or 0)
+        latest = {}
+        for at, homework_name, status in self._changes:
+            if at > now:
+                break
+            latest[homework_name] = (at, status)
+        homeworks = [
+            {
+                'homework_name': homework_name,
+                'status': status,
+                'date_updated': time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(at)
+                ),
+            }
+            for homework_name, (at, status) in latest.items()
+            if at >= from_date
+        ]
+        return Response.from_json(
+            {'homeworks': homeworks, 'current_date': int(now)}
+        )
+
+
+class ReplayFetcher:
+    """Проигрывание ответов, записанных RecordingFetcher.
+    Запрос получает записи, время которых уже наступило по часам
+    clock и которые ещё не отдавались. Если последняя из них —
+    сбой, возвращается он; иначе работы всех этих записей
+    объединяются в один ответ, так что реже опрашивающий бот
+    не теряет изменений. Пока новых записей нет, API отвечает,
+    что изменений нет.
+    """
+
+    def __init__(self, path, clock):
+        """Читает записанные ответы из файла path."""
+        self.clock = clock
+        with open(path, encoding='utf-8') as file:
+            self.entries = sorted(
+                (json.loads(line) for line in file if line.strip()),
+                key=lambda entry: entry['at'],
+            )
+        self.position = 0
+
+    @property
+    def start(self):
+        """Время первой записи или None для пустой записи."""
+        return self.entries[0]['at'] if self.entries else None
+
+    @property
+    def end(self):
+        """Время последней записи или None для пустой записи."""
+        return self.entries[-1]['at'] if self.entries else None
+
+    def fetch(self, url, headers, params):
+        """Отдаёт наступившие записи."""
+        now = self.clock.time()
+        due = []
+        while (
+            self.position < len(self.entries)
+            and self.entries[self.position]['at'] <= now
+        ):
+            due.append(self.entries[self.position])
+            self.position += 1
+        if due and due[-1]['status'] != 200:
+            return Response(due[-1]['status'], due[-1]['body'].encode())
+        homeworks = {}
+        for entry in due:
+            if entry['status'] != 200:
+                continue
+            for homework in json.loads(entry['body']).get('homeworks', []):
+                homeworks[homework.get('homework_name')] = homework
+        return Response.from_json({
+            'homeworks': list(homeworks.values()), 'current_date': int(now),
+        })
+
+
+class Delivery(NamedTuple):
+    """Сообщение, доставленное доставщиком в памяти."""
+
+    at: float
+    chat_id: object
+    text: str
+    parse_mode: object
+
+
+class MemoryDeliverer:
+    """Доставка сообщений в память вместо Telegram.
+    Доставщик — любой объект с методом send_message(chat_id, text,
+    parse_mode=None), как у telegram.Bot и bot_api.DirectBot.
+    Время доставки берётся из clock, по умолчанию — из настроенных
+    часов транспорта.
+    """
+
+    error_types = (bot_api.RetryAfter, bot_api.TelegramError)
+
+    def __init__(self, clock=None, token=None):
+        """Задаёт часы и токен доставщика."""
+        self.clock = clock
+        self.token = token
+        self.sent = []
+
+    def send_message(self, chat_id, text, parse_mode=None, **kwargs):
+        """Запоминает сообщение с моментом доставки."""
+        at = self.clock.time() if self.clock else now()
+        delivery = Delivery(at, chat_id, text, parse_mode)
+        self.sent.append(delivery)
+        return delivery
+
+
+class RecordingDeliverer(MemoryDeliverer):
+    """Доставщик в память, дописывающий сообщения в файл.
+    Каждое сообщение — строка JSON, поэтому записи двух прогонов
+    можно сравнить построчно.
+    """
+
+    def __init__(self, path, clock=None, token=None):
+        """Задаёт файл для записи сообщений."""
+        super().__init__(clock, token)
+        self.path = path
+
+    def send_message(self, chat_id, text, parse_mode=None, **kwargs):
+        """Запоминает сообщение и дописывает его в файл."""
+        delivery = super().send_message(chat_id, text, parse_mode)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(
+                json.dumps(delivery._asdict(), ensure_ascii=False) + '\n'
+            )
+        return delivery
+
+
+class SyncOutbox(Outbox):
+    """Очередь отправки без отдельного потока.
+    Сообщение доставляется прямо в put(), поэтому время доставки
+    совпадает с моментом постановки в очередь по настроенным часам
+    и не зависит от планировщика потоков.
+    """
+
+    def put(self, chat_id, message, parse_mode=None):
+        """Ставит сообщение в очередь и сразу отправляет очередь."""
+        super().put(chat_id, message, parse_mode)
+        while self.process_once() == 0:
+            pass
+
+    def start(self):
+        """Поток отправки не нужен: отправка идёт в put()."""
+
+
+def production_fetcher(record=None):
+    """Возвращает рабочий получатель.
+    Если задан TRANSPORT_RECORD, ответы API записываются в этот файл
+    для последующего проигрывания.
+    """
+    record = TRANSPORT_RECORD if record is None else record
+    fetcher = HttpFetcher()
+    return RecordingFetcher(fetcher, record) if record else fetcher
+
+
+_fetcher = production_fetcher()
+_deliverer = None
+_clock = SystemClock()
+
+
+def configure(fetcher=None, deliverer=None, clock=None):
+    """Подменяет получатель, доставщик и часы.
+    Без аргументов возвращает рабочий транспорт: API Практикума,
+    Telegram и настоящее время.
+    """
+    global _fetcher, _deliverer, _clock
+    _fetcher = fetcher or production_fetcher()
+    _deliverer = deliverer
+    _clock = clock or SystemClock()
+
+
+def fetch(url, headers, params):
+    """Запрашивает статусы через настроенный получатель."""
+    return _fetcher.fetch(url, headers, params)
+
+
+def over_http():
+    """Возвращает True, если статусы запрашиваются у API напрямую.
+    Записывающий и подменённые получатели должны видеть каждый
+    запрос, поэтому для них это False.
+    """
+    return isinstance(_fetcher, HttpFetcher)
+
+
+def now():
+    """Возвращает текущую временную метку настроенных часов."""
+    return _clock.time()
+
+
+def monotonic():
+    """Возвращает показание монотонных часов."""
+    return _clock.monotonic()
+
+
+def wait(lifecycle, delay):
+    """Ждёт delay секунд по настроенным часам."""
+    return _clock.wait(lifecycle, delay)
+
+
+def make_deliverer(token):
+    """Возвращает настроенный доставщик или отправителя Telegram."""
+    if _deliverer is None:
+        return bot_api.make_bot(token)
+    _deliverer.token = token
+    return _deliverer
+
+
+def make_outbox(token):
+    """Создаёт очередь отправки для настроенного доставщика.
+    Доставщики в памяти не ограничивают частоту сообщений, поэтому
+    очередь для них отправляет сразу, без пауз и без потока.
+    """
+    if _deliverer is None:
+        return Outbox(bot_api.make_bot(token))
+    return SyncOutbox(
+        make_deliverer(token), global_rate=math.inf, chat_interval=0,
+        clock=monotonic,
+    )